@@ -5,7 +5,8 @@ from flask_migrate import Migrate
 from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from .config import Config
+from sqlalchemy import event
+from .config import configs, engine_options
 
 
 db = SQLAlchemy()
@@ -16,21 +17,74 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stdout)]
 )
 
-def create_app(config_type="default"):
+def _configure_sqlite(app, engine):
+    """Apply the SQLITE_* pragmas of the config to every new SQLite connection of an engine"""
+    pragmas = {
+        "journal_mode": app.config.get('SQLITE_JOURNAL_MODE'),
+        "synchronous": app.config.get('SQLITE_SYNCHRONOUS'),
+        "busy_timeout": app.config.get('SQLITE_BUSY_TIMEOUT'),
+    }
+    pragmas = {name: value for name, value in pragmas.items() if value is not None}
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_app(config_type="default", config=None):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(configs[config_type])
+    if config:
+        app.config.update(config) # Overrides, e.g. a separate database for tests
+    app.config["CONFIG_TYPE"] = config_type
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"], app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    )
     
-    CORS(app)
+    # With credentials, so the frontend sends back the read-your-writes cookie (see replicas.py). Only for
+    # listed origins: flask-cors would echo any origin for "*", letting every site read credentialed responses
+    origins = app.config.get('CORS_ORIGINS')
+    if "*" in origins:
+        logging.warning("CORS_ORIGINS allows any origin: credentials are disabled, so reads after a write may use a replica")
+    CORS(app, origins=origins, supports_credentials="*" not in origins)
+
+    from app import http_client, media # Configure the process-wide HTTP client, validated-URL cache and validation threads
+    http_client.configure(app.config)
+    media.thumbnail_cache.ttl = app.config.get('THUMBNAIL_VALIDATION_TTL')
+    media.thumbnail_cache.max_entries = app.config.get('THUMBNAIL_VALIDATION_CACHE_SIZE')
+    media.validation_workers = int(app.config.get('VALIDATION_WORKERS'))
     
     db.init_app(app)
-    migrate.init_app(app, db)
+    with app.app_context():
+        _configure_sqlite(app, db.engine)
+    from app.replicas import init_replicas # Optional read replicas, configured like the primary
+    init_replicas(app, _configure_sqlite)
+    from app.metrics import init_metrics # Request timing and per-request SQL statement counts
+    with app.app_context():
+        init_metrics(app, [db.engine] + getattr(app.extensions.get('replicas'), 'engines', []))
+    from app.search import include_object # Import models and the search index kept in sync with them
+    migrate.init_app(app, db, include_object=include_object)
 
     with app.app_context():
         from app import models # Import models
 
-        from app.routes import main, messages # Import routes and register blueprints
+        from app.routes import main, messages, jobs, thumbnails # Import routes and register blueprints
         app.register_blueprint(main)
         app.register_blueprint(messages)
+        app.register_blueprint(jobs)
+        app.register_blueprint(thumbnails)
+
+        from app.jobs import transcription_worker_command # Register CLI commands
+        from app.search import search_reindex_command
+        from app.bulk import import_messages_command
+        app.cli.add_command(transcription_worker_command)
+        app.cli.add_command(search_reindex_command)
+        app.cli.add_command(import_messages_command)
 
     if config_type == "test":
         @app.after_request
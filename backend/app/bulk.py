@@ -0,0 +1,156 @@
+"""Bulk Message Import"""
+import click
+from flask import json, current_app
+from flask.cli import with_appcontext
+from app import db, logging
+from app.cache import bump_data_version
+from app.jobs import enqueue_transcription
+from app.models import Message, Tag
+from app.utils import is_valid_url
+
+
+def _parse_row(line):
+    """Validate one NDJSON line
+    Returns:
+        dict: Message fields, or raises ValueError with the reason
+    """
+    try:
+        data = json.loads(line)
+    except ValueError:
+        raise ValueError("Invalid JSON")
+    if not isinstance(data, dict):
+        raise ValueError("Each line must be a JSON object")
+    if not data.get('title'):
+        raise ValueError("Title is required")
+    if not isinstance(data['title'], str):
+        raise ValueError("Title must be a string")
+    if len(data['title']) > Message.title.type.length:
+        raise ValueError(f"Title must be at most {Message.title.type.length} characters")
+    if not data.get('description'):
+        raise ValueError("Description is required")
+    if not isinstance(data['description'], str):
+        raise ValueError("Description must be a string")
+    for field in ('thumbnail', 'video'):
+        if data.get(field) and not isinstance(data[field], str):
+            raise ValueError(f"{field.capitalize()} must be a string")
+    tags = data.get('tags') or []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError("Tags must be a list of strings or a comma-separated string")
+    if any(len(tag.strip()) > Tag.name.type.length for tag in tags):
+        raise ValueError(f"Tags must be at most {Tag.name.type.length} characters")
+    return {
+        'title': data['title'],
+        'description': data['description'],
+        'thumbnail': data['thumbnail'] if data.get('thumbnail') and is_valid_url(data['thumbnail']) else None,
+        'video': data['video'] if data.get('video') and is_valid_url(data['video']) else None,
+        'tags': [tag.strip() for tag in tags if tag.strip()],
+        'gen_transcript': bool(data.get('gen_transcript', False)),
+    }
+
+
+def _insert_rows(db_session, rows):
+    """Insert parsed rows with a single commit (raises if any row fails)"""
+    # All tags of the rows in one query, creating the missing ones
+    tags = {tag.name: tag for tag in Tag.resolve(db_session, [name for _, row in rows for name in row['tags']])}
+    messages = []
+    for _, row in rows:
+        message = Message(title=row['title'], description=row['description'], thumbnail=row['thumbnail'])
+        message.video = row['video']
+        message.tags = [tags[name] for name in dict.fromkeys(row['tags'])]
+        messages.append((message, row))
+    db_session.add_all(message for message, _ in messages)
+    db_session.flush()
+    for message, row in messages:
+        if row['gen_transcript'] and message.video:
+            enqueue_transcription(db_session, message)
+    bump_data_version(db_session)
+    db_session.commit()
+
+
+def _import_batch(db_session, batch, report):
+    """Insert one batch of parsed rows with a single commit
+    If the batch fails (e.g. a title inserted concurrently), its rows are retried one by one,
+    so only the failing rows are reported.
+    Args:
+        db_session (Session): DB Session
+        batch (list): (line number, row) pairs
+        report (dict): Import report, updated in place
+    """
+    # Duplicate titles, against the database and within the batch, in one query
+    titles = [row['title'] for _, row in batch]
+    taken = {title for (title,) in db_session.query(Message.title).filter(Message.title.in_(titles))}
+    rows = []
+    for line_number, row in batch:
+        if row['title'] in taken:
+            _add_error(report, line_number, "A message with this title already exists")
+            continue
+        taken.add(row['title'])
+        rows.append((line_number, row))
+    if not rows:
+        return
+
+    try:
+        _insert_rows(db_session, rows)
+        report['imported'] += len(rows)
+        return
+    except Exception as e:
+        logging.warning(f"Error importing batch, retrying its rows one by one: {str(e)}")
+        db_session.rollback()
+    for line_number, row in rows:
+        try:
+            _insert_rows(db_session, [(line_number, row)])
+            report['imported'] += 1
+        except Exception as e:
+            logging.exception(f"Error importing line {line_number}: {str(e)}")
+            db_session.rollback()
+            _add_error(report, line_number, "Error importing this row")
+
+
+def _add_error(report, line_number, msg):
+    report['failed'] += 1
+    if len(report['errors']) < current_app.config.get('BULK_IMPORT_MAX_ERRORS'):
+        report['errors'].append({"line": line_number, "msg": msg})
+
+
+def import_messages(db_session, lines, batch_size):
+    """Import messages from NDJSON lines in batches
+    Rows are validated and inserted batch by batch as the lines are read, so the input is
+    never held in memory. Invalid rows are reported and skipped without aborting the import.
+    Thumbnail and video URLs are checked for format only; nothing is downloaded.
+    Args:
+        db_session (Session): DB Session
+        lines (iterable): NDJSON lines (str or bytes), one message per line
+        batch_size (int): Messages inserted per commit
+    Returns:
+        dict: Report with the "imported" and "failed" counts and per-line "errors"
+    """
+    report = {"imported": 0, "failed": 0, "errors": []}
+    batch = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            batch.append((line_number, _parse_row(line)))
+        except ValueError as e:
+            _add_error(report, line_number, str(e))
+        if len(batch) >= batch_size:
+            _import_batch(db_session, batch, report)
+            batch = []
+    if batch:
+        _import_batch(db_session, batch, report)
+    logging.info(f"Messages imported: {report['imported']}, failed: {report['failed']}")
+    return report
+
+
+@click.command("import-messages")
+@click.argument("file", type=click.File("rb"))
+@click.option("--batch-size", type=int, default=None, help="Messages per commit (BULK_IMPORT_BATCH_SIZE by default)")
+@with_appcontext
+def import_messages_command(file, batch_size):
+    """Import messages from an NDJSON FILE ('-' for stdin)."""
+    report = import_messages(db.session, file, batch_size or int(current_app.config.get('BULK_IMPORT_BATCH_SIZE')))
+    for error in report['errors']:
+        click.echo(f"line {error['line']}: {error['msg']}", err=True)
+    click.echo(f"Imported: {report['imported']}, failed: {report['failed']}")
@@ -0,0 +1,125 @@
+"""Response Cache and HTTP Conditional Requests"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import make_response, request, current_app as app
+from sqlalchemy import update
+from app.models import DataVersion, utcnow
+from app.utils import get_db_session, get_stream_format
+
+
+def bump_data_version(db_session):
+    """Invalidate cached listings
+    Runs in the caller's transaction, so the new version becomes visible with the write itself.
+    Args:
+        db_session (Session): DB Session
+    """
+    bumped = db_session.execute(
+        update(DataVersion).where(DataVersion.id == 1)
+        .values(version=DataVersion.version + 1, updated_at=utcnow())
+    ).rowcount
+    if not bumped:
+        db_session.add(DataVersion(id=1, version=1, updated_at=utcnow()))
+
+
+def get_data_version(db_session):
+    """Current data version
+    Args:
+        db_session (Session): DB Session
+    Returns:
+        tuple: (version, updated_at)
+    """
+    row = db_session.get(DataVersion, 1, populate_existing=True)
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+class ResponseCache:
+    """Process-local LRU cache of serialized responses, tagged with the data version they were built from"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, key, version, body):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _cache_key():
+    """Path plus query string with parameters sorted, so equivalent requests share an entry"""
+    args = sorted((key, value) for key in request.args for value in request.args.getlist(key))
+    return request.path + "?" + "&".join(f"{key}={value}" for key, value in args)
+
+
+def _is_streamed():
+    try:
+        return get_stream_format(request.args, request.accept_mimetypes) is not None
+    except ValueError:
+        return True # invalid stream value, answered by the view
+
+
+def _vary_on_accept(response):
+    response.vary.add("Accept")
+    return response
+
+
+def cached_response(view):
+    """Serve a read endpoint from the response cache, with ETag revalidation
+    The ETag is derived from the data version and the request, so a matching If-None-Match
+    is answered with 304 Not Modified before the view runs. There is no Last-Modified: it only
+    has a precision of one second while the data version may change several times within one,
+    so If-Modified-Since could confirm a stale copy. Streamed listings (selected by
+    `stream` or by `Accept: application/x-ndjson`) are never cached nor revalidated, and
+    responses vary on Accept.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not app.config.get('RESPONSE_CACHE_ENABLED') or _is_streamed():
+            return _vary_on_accept(make_response(view(*args, **kwargs)))
+        cache = app.extensions.setdefault('response_cache', ResponseCache(int(app.config.get('RESPONSE_CACHE_SIZE'))))
+
+        version, _ = get_data_version(get_db_session(read_only=True)) # same session as the view
+        key = _cache_key()
+        etag = f"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+        def conditional(response):
+            _vary_on_accept(response)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache' # always revalidate, usually with a 304
+            return response
+
+        if request.if_none_match.contains(etag):
+            return conditional(make_response("", 304))
+
+        body = cache.get(key, version)
+        if body is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            cache.set(key, version, body)
+        response = make_response(body, 200)
+        response.mimetype = 'application/json'
+        return conditional(response)
+    return wrapper
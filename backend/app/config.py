@@ -1,5 +1,7 @@
 """Application Server Configurations"""
 import os
+from urllib.parse import quote_plus
+from sqlalchemy.engine import make_url
 
 
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -7,7 +9,113 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 class Config:
     SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(basedir, '../app.db')}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_pre_ping": True,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 280)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+    }
+    SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if uri.strip()] # read replicas, round-robin
+    REPLICA_RETRY_SECONDS = int(os.getenv("REPLICA_RETRY_SECONDS", 30)) # a failing replica is skipped this long
+    READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5)) # reads after a write stay on the primary
+    CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "http://localhost:4000").split(",") if origin.strip()] # frontend origins, "*" for any (then without credentials)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1" # request, SQL and outbound HTTP metrics at /metrics
     SECRET_KEY = os.getenv("SECRET_KEY", "secret")
     MAX_IMAGE_SIZE_MB = os.getenv("VITE_MAX_IMAGE_SIZE_MB", 5)
     ALLOWED_IMAGE_FORMATS = os.getenv("VITE_ALLOWED_IMAGE_FORMATS", "").split(",")
     ALLOWED_VIDEO_FORMATS = os.getenv("VITE_ALLOWED_VIDEO_FORMATS", "").split(",")
+    THUMBNAIL_VALIDATION_TTL = int(os.getenv("THUMBNAIL_VALIDATION_TTL", 3600)) # seconds a validated thumbnail URL is trusted
+    THUMBNAIL_VALIDATION_CACHE_SIZE = int(os.getenv("THUMBNAIL_VALIDATION_CACHE_SIZE", 1024))
+    THUMBNAIL_STORE_ENABLED = os.getenv("THUMBNAIL_STORE_ENABLED", "1") == "1" # keep local resized copies of thumbnails
+    THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", os.path.join(basedir, "../thumbnails"))
+    THUMBNAIL_SIZES = os.getenv("THUMBNAIL_SIZES", "small:320,medium:640,large:1280") # name:max width/height in pixels
+    TRANSCRIPT_STORE = os.getenv("TRANSCRIPT_STORE", "file") # where transcripts live; rows keep a reference
+    TRANSCRIPT_DIR = os.getenv("TRANSCRIPT_DIR", os.path.join(basedir, "../transcripts"))
+    TRANSCRIPT_CODEC = os.getenv("TRANSCRIPT_CODEC", "zlib") # "zlib" or "zstd" (needs the zstandard package)
+    TRANSCRIPT_COMPRESSION_LEVEL = int(os.getenv("TRANSCRIPT_COMPRESSION_LEVEL", 6))
+    VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", 8)) # threads validating thumbnail and video URLs concurrently
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05)) # seconds
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10)) # seconds between bytes, not for the whole download
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2)) # connection errors and 502/503/504, GET and HEAD only
+    HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", 0.3))
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 10)) # hosts with pooled connections
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 10)) # connections per host
+    MESSAGES_DEFAULT_PAGE_SIZE = int(os.getenv("MESSAGES_DEFAULT_PAGE_SIZE", 50))
+    MESSAGES_MAX_PAGE_SIZE = int(os.getenv("MESSAGES_MAX_PAGE_SIZE", 200))
+    BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", 500))
+    BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", 1000)) # errors listed in an import report
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256)) # cached responses per process
+    TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", 2))
+    TRANSCRIPTION_POLL_INTERVAL = float(os.getenv("TRANSCRIPTION_POLL_INTERVAL", 2))
+    TRANSCRIPTION_JOB_TIMEOUT = int(os.getenv("TRANSCRIPTION_JOB_TIMEOUT", 3600)) # seconds before a running job is requeued
+    TRANSCRIPTION_SUPERVISE_INTERVAL = float(os.getenv("TRANSCRIPTION_SUPERVISE_INTERVAL", 10)) # seconds between worker pool checks
+    TRANSCRIPTION_MAX_ATTEMPTS = int(os.getenv("TRANSCRIPTION_MAX_ATTEMPTS", 3))
+    VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", os.path.join(basedir, "toolkit/vosk-model-en-us-0.22"))
+    VOSK_PREWARM = os.getenv("VOSK_PREWARM", "1") == "1" # load the model when a worker starts
+    TRANSCRIPTION_MODE = os.getenv("TRANSCRIPTION_MODE", "stream") # "stream" (no temporary files), "parallel" or "file"
+    TRANSCRIPTION_STREAM_SOURCE = os.getenv("TRANSCRIPTION_STREAM_SOURCE", "url") # "url" (ffmpeg fetches) or "pipe" (stdin)
+    TRANSCRIPTION_PARALLELISM = int(os.getenv("TRANSCRIPTION_PARALLELISM", os.cpu_count() or 1)) # processes per transcription in "parallel" mode
+    TRANSCRIPTION_SEGMENT_SECONDS = float(os.getenv("TRANSCRIPTION_SEGMENT_SECONDS", 60))
+    TRANSCRIPTION_SEGMENT_OVERLAP_SECONDS = float(os.getenv("TRANSCRIPTION_SEGMENT_OVERLAP_SECONDS", 2))
+
+
+class SQLiteConfig(Config):
+    """Local SQLite database (app.db), tuned for concurrent readers and a single writer"""
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL") # readers no longer block on the writer
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL") # durable in WAL mode, without an fsync per commit
+    SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)) # milliseconds a writer waits for the lock
+
+
+def mysql_uri():
+    """MySQL URI from the MYSQL_* environment variables (DATABASE_URL takes precedence)"""
+    if os.getenv("DATABASE_URL"):
+        return os.getenv("DATABASE_URL")
+    return (
+        f"mysql+pymysql://{quote_plus(os.getenv('MYSQL_USER', ''))}:{quote_plus(os.getenv('MYSQL_PASSWORD', ''))}"
+        f"@{os.getenv('MYSQL_HOST', 'localhost')}:{os.getenv('MYSQL_PORT', '3306')}/{os.getenv('MYSQL_DATABASE', '')}"
+        "?charset=utf8mb4"
+    )
+
+
+class ProductionConfig(Config):
+    """MySQL database configured from the environment"""
+    SQLALCHEMY_DATABASE_URI = mysql_uri()
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_pre_ping": True,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)), # per process: size it for web threads + worker threads
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 280)), # below MySQL's wait_timeout
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+    }
+
+
+QUEUE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+
+def engine_options(uri, options):
+    """Engine options for a database URI
+    In-memory SQLite databases use a StaticPool (one shared connection), which rejects the QueuePool sizing options.
+    Args:
+        uri (str): Database URI
+        options (dict): SQLALCHEMY_ENGINE_OPTIONS
+    Returns:
+        dict: The options the engine of the URI accepts
+    """
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {name: value for name, value in options.items() if name not in QUEUE_POOL_OPTIONS}
+    return options
+
+
+class TestConfig(Config):
+    """Tests: SQLite without the connection tuning, so each test controls its own database file"""
+
+
+configs = {
+    "default": SQLiteConfig,
+    "sqlite": SQLiteConfig,
+    "production": ProductionConfig,
+    "test": TestConfig,
+}
@@ -0,0 +1,104 @@
+"""Shared Outbound HTTP Client"""
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.metrics import observe_outbound
+
+
+# Defaults, overridden from the app config by configure()
+settings = {
+    "connect_timeout": 3.05,
+    "read_timeout": 10,
+    "retries": 2,
+    "backoff": 0.3,
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+}
+
+_session = None
+_lock = threading.Lock()
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies the default (connect, read) timeout to every request
+    and records its latency (see `app.metrics`)
+    """
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (settings["connect_timeout"], settings["read_timeout"]))
+        started = time.perf_counter()
+        status = None
+        try:
+            response = super().request(method, url, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            observe_outbound(method, status, time.perf_counter() - started)
+
+
+def _create_session():
+    # pool_maxsize caps the open connections per host; pool_block makes extra callers
+    # wait for a free connection instead of opening (and discarding) new ones
+    retry = Retry(
+        total=settings["retries"],
+        backoff_factor=settings["backoff"],
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings["pool_connections"],
+        pool_maxsize=settings["pool_maxsize"],
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = TimeoutSession()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """Process-wide pooled HTTP session
+    Returns:
+        TimeoutSession: Keep-alive session with timeouts, retries and per-host connection limits
+    """
+    global _session #pylint:disable=global-statement
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def reset():
+    """Drop the shared session, so the next call builds a new one (with the current settings)"""
+    global _session #pylint:disable=global-statement
+    with _lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def configure(config):
+    """Apply the HTTP_* settings of the app config
+    Args:
+        config (dict): App config
+    """
+    settings.update(
+        connect_timeout=float(config.get("HTTP_CONNECT_TIMEOUT")),
+        read_timeout=float(config.get("HTTP_READ_TIMEOUT")),
+        retries=int(config.get("HTTP_RETRIES")),
+        backoff=float(config.get("HTTP_RETRY_BACKOFF")),
+        pool_connections=int(config.get("HTTP_POOL_CONNECTIONS")),
+        pool_maxsize=int(config.get("HTTP_POOL_MAXSIZE")),
+    )
+    reset()
+
+
+# Pooled sockets must not be shared with forked children (worker processes, segment pools)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: globals().update(_session=None, _lock=threading.Lock()))
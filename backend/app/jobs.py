@@ -0,0 +1,277 @@
+"""Transcription Job Queue"""
+import multiprocessing
+import time
+from datetime import timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import or_, update
+from app import logging
+from app import transcription
+from app.cache import bump_data_version
+from app.models import (
+    JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING,
+    Message, TranscriptionJob, utcnow
+)
+
+
+def enqueue_transcription(db_session, message):
+    """Queue a transcription job for a message video
+    The job is added to the caller's session and persisted with the caller's commit,
+    so a message and its job are written atomically.
+    Args:
+        db_session (Session): DB Session
+        message (Message): Message with a flushed id and a video URL
+    Returns:
+        TranscriptionJob: Queued job
+    """
+    job = TranscriptionJob(message_id=message.id, video=message.video)
+    db_session.add(job)
+    return job
+
+
+def claim_next_job(db_session):
+    """Claim the oldest queued job
+    The status is switched with a conditional UPDATE, so concurrent workers never
+    claim the same job.
+    Args:
+        db_session (Session): DB Session
+    Returns:
+        TranscriptionJob: Claimed job, or None if the queue is empty
+    """
+    while True:
+        job_id = (
+            db_session.query(TranscriptionJob.id)
+            .filter(TranscriptionJob.status == JOB_QUEUED)
+            .order_by(TranscriptionJob.id)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            db_session.rollback()
+            return None
+        claimed = db_session.execute(
+            update(TranscriptionJob)
+            .where(TranscriptionJob.id == job_id, TranscriptionJob.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, started_at=utcnow(), finished_at=None,
+                    attempts=TranscriptionJob.attempts + 1)
+        ).rowcount
+        db_session.commit()
+        if claimed:
+            return db_session.get(TranscriptionJob, job_id)
+
+
+def requeue_stale_jobs(db_session, timeout, max_attempts, job_ids=(), busy_ids=()):
+    """Recover jobs left running by a worker that died
+    Args:
+        db_session (Session): DB Session
+        timeout (int): Seconds after which a running job is considered abandoned
+        max_attempts (int): Jobs that already ran this many times are failed instead
+        job_ids (iterable): Running jobs known to be abandoned whatever their age (their worker exited)
+        busy_ids (iterable): Running jobs held by a live worker, never requeued for their age
+    Returns:
+        int: Number of jobs recovered
+    """
+    stale_before = utcnow() - timedelta(seconds=timeout)
+    abandoned = TranscriptionJob.started_at < stale_before
+    if busy_ids:
+        abandoned = abandoned & TranscriptionJob.id.not_in(list(busy_ids))
+    if job_ids:
+        abandoned = or_(abandoned, TranscriptionJob.id.in_(list(job_ids)))
+    stale = TranscriptionJob.status == JOB_RUNNING, abandoned
+    db_session.execute(
+        update(TranscriptionJob)
+        .where(*stale, TranscriptionJob.attempts >= max_attempts)
+        .values(status=JOB_FAILED, finished_at=utcnow(), error="Worker did not finish the job")
+    )
+    requeued = db_session.execute(
+        update(TranscriptionJob).where(*stale).values(status=JOB_QUEUED, started_at=None)
+    ).rowcount
+    db_session.commit()
+    return requeued
+
+
+def _finish_job(db_session, job_id, attempts, profile, status, error=None):
+    """Record the outcome of a job, unless the worker lost its claim on it
+    The UPDATE only matches the job while it is still running the claimed attempt, so a worker
+    whose job was requeued (and maybe claimed again, or failed) meanwhile can't overwrite it.
+    Returns:
+        bool: Whether the outcome was recorded
+    """
+    values = {field: profile.get(field) for field in TranscriptionJob.PROFILE_FIELDS}
+    return db_session.execute(
+        update(TranscriptionJob)
+        .where(TranscriptionJob.id == job_id, TranscriptionJob.status == JOB_RUNNING, TranscriptionJob.attempts == attempts)
+        .values(status=status, error=error, finished_at=utcnow(), **values)
+    ).rowcount > 0
+
+
+def process_job(db_session, job):
+    """Transcribe the job video and store the transcript on its message
+    The per-stage profile of the transcription is stored on the job, whatever its outcome.
+    Nothing is written if the job was requeued while it ran (see `requeue_stale_jobs`).
+    Args:
+        db_session (Session): DB Session
+        job (TranscriptionJob): Claimed job
+    """
+    job_id, attempts = job.id, job.attempts
+    logging.info(f"Transcribing message {job.message_id} (job {job_id})")
+    profile = {}
+    try:
+        transcript = transcription.transcribe_video(job.video, profile=profile)
+        message = db_session.get(Message, job.message_id)
+        error = None
+        if transcript is None:
+            error = "Failed to transcribe video"
+        elif not message or message.video != job.video:
+            error = "Message video changed before the transcript was ready"
+        status = JOB_FAILED if error else JOB_DONE
+        if not _finish_job(db_session, job_id, attempts, profile, status, error):
+            db_session.rollback()
+            logging.warning(f"Transcription job {job_id} was requeued while running, its result is discarded")
+            return
+        if status == JOB_DONE:
+            message.transcript = transcript
+            bump_data_version(db_session)
+        db_session.commit()
+        logging.info(f"Transcription job {job_id} finished: {status}")
+    except Exception as e:
+        logging.exception(f"Error processing transcription job {job_id}: {str(e)}")
+        db_session.rollback()
+        if not _finish_job(db_session, job_id, attempts, profile, JOB_FAILED, str(e)):
+            logging.warning(f"Transcription job {job_id} was requeued while running, its error is discarded")
+        db_session.commit()
+
+
+def run_worker(config_type="default", config=None, max_jobs=None, current_job=None):
+    """Worker loop: claim and process jobs until stopped
+    Each worker builds its own app (and engine) so no connections are shared across processes.
+    Args:
+        config_type (str): Configuration type passed to `create_app`
+        config (dict): Configuration overrides passed to `create_app`
+        max_jobs (int): Stop after processing this many jobs (None runs forever)
+        current_job (Value): Shared integer set to the id of the job being processed (0 when idle),
+            so the supervisor can requeue it at once if this worker dies
+    """
+    from app import create_app, db
+
+    app = create_app(config_type, config)
+    with app.app_context():
+        if app.config.get('VOSK_PREWARM'):
+            try:
+                transcription.get_model(app.config.get('VOSK_MODEL_PATH'))
+            except Exception as e:
+                logging.exception(f"Error pre-warming Vosk model: {str(e)}")
+        poll_interval = float(app.config.get('TRANSCRIPTION_POLL_INTERVAL'))
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job = claim_next_job(db.session)
+            if not job:
+                db.session.remove()
+                time.sleep(poll_interval)
+                continue
+            if current_job is not None:
+                current_job.value = job.id
+            process_job(db.session, job)
+            if current_job is not None:
+                current_job.value = 0
+            db.session.remove()
+            processed += 1
+
+
+def _recover_jobs(app, job_ids=(), busy_ids=()):
+    from app import db
+    with app.app_context():
+        recovered = requeue_stale_jobs(
+            db.session,
+            int(app.config.get('TRANSCRIPTION_JOB_TIMEOUT')),
+            int(app.config.get('TRANSCRIPTION_MAX_ATTEMPTS')),
+            job_ids,
+            busy_ids
+        )
+        db.session.remove()
+    if recovered:
+        logging.info(f"Requeued stale transcription jobs: {recovered}")
+
+
+def start_worker_pool(app, workers, max_checks=None):
+    """Start transcription worker processes and supervise them
+    Every TRANSCRIPTION_SUPERVISE_INTERVAL seconds, workers that exited (e.g. killed when out of
+    memory) are replaced, the job a dead worker was processing is requeued right away, and jobs
+    running for longer than TRANSCRIPTION_JOB_TIMEOUT that no live worker of the pool holds are
+    requeued (or failed after TRANSCRIPTION_MAX_ATTEMPTS), so the pool keeps its size and no job
+    stays running forever. A long job of a live worker is left to finish.
+    Args:
+        app (Flask): Application whose configuration the workers inherit
+        workers (int): Number of worker processes
+        max_checks (int): Stop after this many supervision rounds (None runs until interrupted)
+    """
+    _recover_jobs(app)
+    context = multiprocessing.get_context("spawn")
+    config = {"SQLALCHEMY_DATABASE_URI": app.config.get('SQLALCHEMY_DATABASE_URI')}
+    interval = float(app.config.get('TRANSCRIPTION_SUPERVISE_INTERVAL'))
+
+    def start(i):
+        current_job = context.Value("i", 0)
+        process = start_worker_process(
+            run_worker, (app.config.get('CONFIG_TYPE'), config, None, current_job), f"transcription-worker-{i}"
+        )
+        return process, current_job
+
+    slots = [start(i) for i in range(workers)]
+    logging.info(f"Transcription workers started: {workers}")
+    checks = 0
+    try:
+        while max_checks is None or checks < max_checks:
+            time.sleep(interval)
+            abandoned, busy = [], []
+            for i, (process, current_job) in enumerate(slots):
+                if process.is_alive():
+                    if current_job.value:
+                        busy.append(current_job.value)
+                    continue
+                logging.warning(f"Transcription worker {process.name} exited with code {process.exitcode}, restarting it")
+                if current_job.value:
+                    abandoned.append(current_job.value)
+                slots[i] = start(i)
+            _recover_jobs(app, abandoned, busy)
+            checks += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_worker_processes([process for process, _ in slots])
+
+
+def start_worker_process(target, args, name):
+    """Start a transcription worker process
+    Workers are not daemonic: daemonic processes may not have children, and the parallel
+    transcription mode runs its segments on a process pool. They are stopped explicitly
+    by `stop_worker_processes` instead.
+    Args:
+        target (callable): Worker function
+        args (tuple): Worker function arguments
+        name (str): Process name
+    Returns:
+        Process: Started process
+    """
+    process = multiprocessing.get_context("spawn").Process(target=target, args=args, name=name, daemon=False)
+    process.start()
+    return process
+
+
+def stop_worker_processes(processes, timeout=10):
+    """Terminate the worker processes still running and wait for them"""
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout)
+
+
+@click.command("transcription-worker")
+@click.option("--workers", type=int, default=None, help="Number of worker processes (TRANSCRIPTION_WORKERS by default)")
+@with_appcontext
+def transcription_worker_command(workers):
+    """Run a pool of transcription workers draining the job queue."""
+    app = current_app._get_current_object()
+    start_worker_pool(app, workers or int(app.config.get('TRANSCRIPTION_WORKERS')))
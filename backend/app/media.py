@@ -0,0 +1,216 @@
+"""Thumbnail and Video URL Validation"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from PIL import Image, UnidentifiedImageError
+from app import logging, thumbnails
+from app.http_client import get_session
+
+
+class ValidationCache:
+    """Thread-safe LRU of validated URLs that expire after a TTL"""
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Returns:
+            tuple: (content type, size in bytes, validated_at, stored image digest or None),
+                or None if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and time.time() - entry[2] < self.ttl:
+                self._entries.move_to_end(url)
+                return entry
+            self._entries.pop(url, None)
+            return None
+
+    def set(self, url, content_type, size, digest=None):
+        with self._lock:
+            self._entries[url] = (content_type, size, time.time(), digest)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+thumbnail_cache = ValidationCache(ttl=3600)
+validation_workers = 8
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor #pylint:disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=validation_workers, thread_name_prefix="validate")
+        return _executor
+
+
+# Threads do not survive a fork, so a forked child starts its own pool
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: globals().update(_executor=None, _executor_lock=threading.Lock()))
+
+
+def _check_image(content_type, size, allowed_formats, max_size_mb):
+    if content_type not in allowed_formats:
+        return f"Only {allowed_formats} formats are allowed."
+    if size > int(max_size_mb) * 1024 * 1024: # Convert MB to bytes
+        return f"Image size must be less than {max_size_mb} MB."
+    return None
+
+
+def validate_thumbnail(url, allowed_formats, max_size_mb):
+    """Check that a thumbnail URL serves an allowed image format within the size limit
+    A declared Content-Length is trusted, so oversized images are rejected without reading
+    their body; otherwise at most limit + 1 bytes are read. Valid URLs are cached, so repeat
+    URLs skip the network until the cache entry expires.
+    Args:
+        url (str): Thumbnail URL
+        allowed_formats (list): Allowed Content-Type values
+        max_size_mb (int): Maximum image size in MB
+    Returns:
+        str: Validation error message, or None if the thumbnail is valid
+    """
+    cached = thumbnail_cache.get(url)
+    if cached:
+        return _check_image(cached[0], cached[1], allowed_formats, max_size_mb)
+
+    max_bytes = int(max_size_mb) * 1024 * 1024
+    try:
+        with get_session().get(url, stream=True) as response:
+            if response.status_code != 200:
+                return "Failed to fetch thumbnail image from URL"
+            content_type = response.headers.get('Content-Type')
+            if content_type not in allowed_formats:
+                return _check_image(content_type, 0, allowed_formats, max_size_mb)
+
+            content_length = response.headers.get('Content-Length')
+            if content_length and content_length.isdigit():
+                size = int(content_length)
+            else:
+                size = 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        break # enough to reject, the rest is never downloaded
+    except requests.RequestException as e:
+        logging.warning(f"Error fetching thumbnail {url}: {str(e)}")
+        return "Failed to fetch thumbnail image from URL"
+
+    error = _check_image(content_type, size, allowed_formats, max_size_mb)
+    if not error:
+        thumbnail_cache.set(url, content_type, size)
+    return error
+
+
+def store_thumbnail(url, allowed_formats, max_size_mb, root, sizes):
+    """Validate a thumbnail URL and store the image locally with its resized variants
+    The body is read once, at most limit + 1 bytes, and used both to check the size and to
+    store the image. URLs already stored are cached and not fetched again until the entry expires.
+    Args:
+        url (str): Thumbnail URL
+        allowed_formats (list): Allowed Content-Type values
+        max_size_mb (int): Maximum image size in MB
+        root (str): Thumbnail directory
+        sizes (dict): Variant name -> maximum width and height in pixels
+    Returns:
+        tuple: (validation error message or None, stored image digest or None)
+    """
+    cached = thumbnail_cache.get(url)
+    if cached and cached[3] and thumbnails.has_image(root, cached[3]):
+        error = _check_image(cached[0], cached[1], allowed_formats, max_size_mb)
+        return error, None if error else cached[3]
+
+    max_bytes = int(max_size_mb) * 1024 * 1024
+    try:
+        with get_session().get(url, stream=True) as response:
+            if response.status_code != 200:
+                return "Failed to fetch thumbnail image from URL", None
+            content_type = response.headers.get('Content-Type')
+            content_length = response.headers.get('Content-Length')
+            declared = int(content_length) if content_length and content_length.isdigit() else 0
+            error = _check_image(content_type, declared, allowed_formats, max_size_mb)
+            if error:
+                return error, None
+            data = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                data += chunk
+                if len(data) > max_bytes:
+                    break # enough to reject, the rest is never downloaded
+    except requests.RequestException as e:
+        logging.warning(f"Error fetching thumbnail {url}: {str(e)}")
+        return "Failed to fetch thumbnail image from URL", None
+
+    error = _check_image(content_type, len(data), allowed_formats, max_size_mb)
+    if error:
+        return error, None
+    try:
+        digest = thumbnails.store_image(root, bytes(data), sizes)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        logging.warning(f"Error storing thumbnail {url}: {str(e)}")
+        return "Thumbnail image could not be processed", None
+    thumbnail_cache.set(url, content_type, len(data), digest)
+    return None, digest
+
+
+def validate_video(url, allowed_formats):
+    """Check that a video URL is reachable and serves an allowed video format
+    Args:
+        url (str): Video URL
+        allowed_formats (list): Allowed Content-Type values
+    Returns:
+        str: Validation error message, or None if the video is valid
+    """
+    try:
+        response = get_session().head(url)
+    except requests.RequestException as e:
+        logging.warning(f"Error fetching video {url}: {str(e)}")
+        return "Failed to fetch video from URL"
+    if response.status_code != 200:
+        return "Failed to fetch video from URL"
+    video_format = response.headers.get('Content-Type')
+    if not video_format or video_format not in allowed_formats:
+        return f"Only {allowed_formats} formats are allowed."
+    return None
+
+
+def validate_media(thumbnail, video, config):
+    """Validate a thumbnail and a video URL concurrently
+    Both checks run on the shared validation threads, so a request waits for the slower one
+    rather than for both in turn. Either URL may be None to skip its check. With
+    THUMBNAIL_STORE_ENABLED the thumbnail is also stored locally (see `store_thumbnail`).
+    Args:
+        thumbnail (str): Thumbnail URL, or None
+        video (str): Video URL, or None
+        config (dict): App config (read here, as the validation threads have no app context)
+    Returns:
+        tuple: (the first validation error (thumbnail before video) or None, stored thumbnail digest or None)
+    """
+    executor = _get_executor()
+    thumbnail_check = video_check = None
+    if thumbnail and config.get('THUMBNAIL_STORE_ENABLED'):
+        thumbnail_check = executor.submit(
+            store_thumbnail, thumbnail, config.get('ALLOWED_IMAGE_FORMATS'), config.get('MAX_IMAGE_SIZE_MB'),
+            config.get('THUMBNAIL_DIR'), thumbnails.parse_sizes(config.get('THUMBNAIL_SIZES'))
+        )
+    elif thumbnail:
+        thumbnail_check = executor.submit(
+            lambda: (validate_thumbnail(thumbnail, config.get('ALLOWED_IMAGE_FORMATS'), config.get('MAX_IMAGE_SIZE_MB')), None)
+        )
+    if video:
+        video_check = executor.submit(validate_video, video, config.get('ALLOWED_VIDEO_FORMATS'))
+    error, digest = thumbnail_check.result() if thumbnail_check else (None, None)
+    video_error = video_check.result() if video_check else None
+    return error or video_error, digest
@@ -0,0 +1,191 @@
+"""Request, SQL and Outbound HTTP Metrics in the Prometheus Text Format"""
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+
+# Upper bounds in seconds (statement counts for db_statements_per_request)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative histogram of one label set"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class Registry:
+    """Process-local counters and histograms, keyed by metric name and label values
+    Every process (e.g. each gunicorn worker) exposes its own values; Prometheus sums them per instance.
+    """
+
+    def __init__(self):
+        self._metrics = {} # name -> (type, help, buckets, {labels: value or Histogram})
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text):
+        self._metrics.setdefault(name, ("counter", help_text, None, {}))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self._metrics.setdefault(name, ("histogram", help_text, buckets, {}))
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            values = self._metrics[name][3]
+            key = _key(labels)
+            values[key] = values.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            _, _, buckets, values = self._metrics[name]
+            key = _key(labels)
+            if key not in values:
+                values[key] = Histogram(buckets)
+            values[key].observe(value)
+
+    def value(self, name, labels):
+        """Current counter value, or histogram observation count"""
+        with self._lock:
+            value = self._metrics[name][3].get(_key(labels), 0)
+            return value.count if isinstance(value, Histogram) else value
+
+    def clear(self):
+        with self._lock:
+            for _, _, _, values in self._metrics.values():
+                values.clear()
+
+    def render(self):
+        """Returns:
+            str: All metrics in the Prometheus text exposition format (version 0.0.4)
+        """
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, _, values) in self._metrics.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(values.items()):
+                    if kind == "counter":
+                        lines.append(f"{name}{_labels(key)} {_number(value)}")
+                        continue
+                    for bound, count in zip(value.buckets, value.counts):
+                        lines.append(f"{name}_bucket{_labels(key + (('le', _number(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {value.count}")
+                    lines.append(f"{name}_sum{_labels(key)} {_number(value.sum)}")
+                    lines.append(f"{name}_count{_labels(key)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _key(labels):
+    # Label values are strings in the exposition format; keeping them so also keeps the keys sortable
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _labels(key):
+    if not key:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+        for name, value in key
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+registry.counter("http_requests_total", "Requests handled, by endpoint, method and status code")
+registry.histogram("http_request_duration_seconds", "Request latency until the response is returned, by endpoint and method")
+registry.counter("db_statements_total", "SQL statements executed while handling requests, by endpoint")
+registry.counter("db_statement_seconds_total", "Time spent in SQL statements while handling requests, by endpoint")
+registry.histogram("db_statements_per_request", "SQL statements per request, by endpoint", COUNT_BUCKETS)
+registry.histogram("db_seconds_per_request", "Time spent in SQL statements per request, by endpoint")
+registry.histogram("http_client_request_duration_seconds", "Outbound HTTP request latency until the headers are received, by method and status class")
+
+
+def _endpoint():
+    # The URL rule, not the path, so ids don't multiply the label values
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.db_statements = 0
+    g.db_seconds = 0.0
+
+
+def _record_request(response):
+    if 'metrics_started' not in g:
+        return response
+    endpoint = _endpoint()
+    registry.inc("http_requests_total", {"endpoint": endpoint, "method": request.method, "status": response.status_code})
+    registry.observe("http_request_duration_seconds", {"endpoint": endpoint, "method": request.method},
+                     time.perf_counter() - g.metrics_started)
+    registry.inc("db_statements_total", {"endpoint": endpoint}, g.db_statements)
+    registry.inc("db_statement_seconds_total", {"endpoint": endpoint}, g.db_seconds)
+    registry.observe("db_statements_per_request", {"endpoint": endpoint}, g.db_statements)
+    registry.observe("db_seconds_per_request", {"endpoint": endpoint}, g.db_seconds)
+    return response
+
+
+def _before_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    # Statements outside a request (CLI commands, the transcription worker) are not attributed
+    if has_request_context() and 'metrics_started' in g:
+        g.db_statements += 1
+        g.db_seconds += elapsed
+
+
+def _failed_statement(exception_context):
+    if exception_context.connection is not None and exception_context.connection.info.get("metrics_started"):
+        exception_context.connection.info["metrics_started"].pop()
+
+
+def observe_outbound(method, status, seconds):
+    """Record an outbound HTTP request
+    The URLs come from users (thumbnails, videos), so neither the host nor the exact status is a label:
+    every new value would add series that are never evicted.
+    Args:
+        method (str): HTTP method
+        status (int): Response status code, or None if no response was received
+        seconds (float): Time until the response headers were received (or the request failed)
+    """
+    registry.observe("http_client_request_duration_seconds",
+                     {"method": method.upper(), "status": f"{status // 100}xx" if status else "error"}, seconds)
+
+
+def init_metrics(app, engines):
+    """Record the requests of an app and the SQL statements of its engines
+    Args:
+        app (Flask): App
+        engines (list): Database engines (the primary and any read replicas)
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    app.before_request(_start_request)
+    app.after_request(_record_request)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_statement)
+        event.listen(engine, "after_cursor_execute", _after_statement)
+        event.listen(engine, "handle_error", _failed_statement)
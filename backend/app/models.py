@@ -1,17 +1,88 @@
 """Application Server Models"""
 from app import db
-from sqlalchemy import ForeignKey, Table, Text, Column, Integer, String
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, Table, Text, Column, Integer, String, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.mysql import LONGTEXT
+from app.transcripts import get_transcript_store
 
 
 # Association table for many-to-many relationship
 message_tags = Table('message_tags', db.Model.metadata,
     Column('message_id', Integer, ForeignKey('message.id'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tag.id'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tag.id'), primary_key=True),
+    # The primary key serves message-first lookups; tag-first joins, tag counts and tag facets need this one
+    Index('ix_message_tags_tag_id_message_id', 'tag_id', 'message_id')
 )
 
 
+def _insert_ignoring_conflicts(db_session, target, index_elements):
+    """INSERT statement that skips rows conflicting with a unique key, e.g. rows inserted concurrently by another writer
+    Args:
+        db_session (Session): DB Session
+        target (Table or model): Table to insert into
+        index_elements (list): Columns of the unique key (SQLite and PostgreSQL)
+    Returns:
+        Insert: Statement (a plain INSERT on other databases)
+    """
+    dialect = db_session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(target).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == "postgresql":
+        return postgresql_insert(target).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == "mysql":
+        return insert(target).prefix_with("IGNORE")
+    return insert(target)
+
+
+def link_message_tags(db_session, message_ids, tag_ids):
+    """Link every message to every tag, skipping existing links
+    Existing pairs are found with one query and the missing ones inserted with one executemany
+    that skips pairs linked concurrently by another writer, so the primary key never fails.
+    Args:
+        db_session (Session): DB Session
+        message_ids (list): Message IDs
+        tag_ids (list): Tag IDs
+    Returns:
+        int: Number of links created (by this call, not by a concurrent writer)
+    """
+    existing = {
+        (message_id, tag_id)
+        for message_id, tag_id in db_session.execute(
+            select(message_tags.c.message_id, message_tags.c.tag_id)
+            .where(message_tags.c.message_id.in_(message_ids), message_tags.c.tag_id.in_(tag_ids))
+        )
+    }
+    missing = [
+        {"message_id": message_id, "tag_id": tag_id}
+        for message_id in message_ids
+        for tag_id in tag_ids
+        if (message_id, tag_id) not in existing
+    ]
+    if not missing:
+        return 0
+    return db_session.execute(
+        _insert_ignoring_conflicts(db_session, message_tags, ['message_id', 'tag_id']), missing
+    ).rowcount
+
+
+def unlink_message_tags(db_session, message_ids, tag_ids):
+    """Remove the links between the messages and the tags with one statement
+    Args:
+        db_session (Session): DB Session
+        message_ids (list): Message IDs
+        tag_ids (list): Tag IDs
+    Returns:
+        int: Number of links removed
+    """
+    return db_session.execute(
+        message_tags.delete()
+        .where(message_tags.c.message_id.in_(message_ids), message_tags.c.tag_id.in_(tag_ids))
+    ).rowcount
+
+
 class Tag(db.Model):
     id = Column(Integer, primary_key=True)
     name = Column(String(80), unique=True, nullable=False)
@@ -19,12 +90,39 @@ class Tag(db.Model):
 
     def __init__(self, name):
         self.name = name
+
+    @classmethod
+    def resolve(cls, db_session, names):
+        """Get tags by name, creating the missing ones
+        Existing tags are fetched with one IN query and the missing ones inserted with one
+        statement that skips names inserted concurrently by another writer, so the unique
+        constraint on the name never fails.
+        Args:
+            db_session (Session): DB Session
+            names (iterable): Tag names (stripped, blanks and duplicates ignored)
+        Returns:
+            list: Tags in the order of the names
+        """
+        names = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+        if not names:
+            return []
+        tags = {tag.name: tag for tag in db_session.query(cls).filter(cls.name.in_(names))}
+        missing = [name for name in names if name not in tags]
+        if missing:
+            db_session.execute(_insert_ignoring_conflicts(db_session, cls, ['name']), [{"name": name} for name in missing])
+            # Locking read, so rows committed by a concurrent writer are visible under REPEATABLE READ
+            tags.update({
+                tag.name: tag
+                for tag in db_session.query(cls).filter(cls.name.in_(missing)).with_for_update(read=True)
+            })
+        return [tags[name] for name in names]
     
-    def to_dict(self):
+    def to_dict(self, message_count=0):
+        # The count comes from a grouped aggregate, so the messages relationship is never loaded
         return {
             'id': self.id,
             'name': self.name,
-            'messages': [message.title for message in self.messages]
+            'message_count': message_count
         }
 
     def __repr__(self):
@@ -34,10 +132,13 @@ class Tag(db.Model):
 class Message(db.Model):
     id = Column(Integer, primary_key=True)
     title = Column(String(80), unique=True, nullable=False)
-    description = Column(Text, nullable=False)
+    description = Column(Text().with_variant(LONGTEXT, "mysql"), nullable=False) # MySQL TEXT stops at 64 KB
     thumbnail = Column(Text, nullable=True) # image URL
+    thumbnail_hash = Column(String(64), nullable=True) # SHA-256 of the locally stored copy, served by /thumbnails
     video = Column(Text, nullable=True) # video URL
-    transcript = Column(Text, nullable=True) # LONGTEXT for MySQL, TEXT for other databases, S3 for larger files
+    transcript_ref = Column(String(80), nullable=True) # "<codec>:<sha256>" in the transcript store, the text is not kept in the row
+    transcript_length = Column(Integer, nullable=True) # characters, 0 while a transcript is pending
+    transcript_hash = Column(String(64), nullable=True) # SHA-256 of the transcript text
     tags = relationship('Tag', secondary=message_tags, back_populates='messages')
 
     def __init__(self, title, description, thumbnail=None, video=None, tags=None):
@@ -48,21 +149,141 @@ class Message(db.Model):
             self.video = video
             self.transcript = ""
         if tags:
-            self.tags = [
-                Tag.query.filter_by(name=tag.strip()).first() # Retrieve
-                or Tag(name=tag.strip()) # OR Create New
-            for tag in tags.split(",")]
+            self.tags = Tag.resolve(db.session, tags.split(",")) # Retrieve OR Create New
+
+    @property
+    def transcript(self):
+        """Transcript text from the transcript store ("" while pending, None if there is none)"""
+        if self.transcript_ref is None:
+            return None if self.transcript_length is None else ""
+        cached = self.__dict__.get('_transcript')
+        if cached and cached[0] == self.transcript_ref:
+            return cached[1]
+        text = get_transcript_store().get(self.transcript_ref)
+        self._transcript = (self.transcript_ref, text)
+        return text
+
+    @transcript.setter
+    def transcript(self, text):
+        if not text:
+            self.transcript_ref = self.transcript_hash = None
+            self.transcript_length = None if text is None else 0
+        else:
+            self.transcript_ref, self.transcript_length, self.transcript_hash = get_transcript_store().put(text)
+            self._transcript = (self.transcript_ref, text)
+
+    FIELDS = ('id', 'title', 'description', 'thumbnail', 'thumbnail_hash', 'video', 'transcript_length', 'transcript', 'tags')
+    DEFAULT_FIELDS = tuple(field for field in FIELDS if field != 'transcript') # transcripts are opt-in
+
+    @classmethod
+    def columns(cls, fields):
+        """Columns to load for the given fields (the id is always loaded, tags are a relationship)"""
+        columns = []
+        for field in fields:
+            if field == 'transcript':
+                columns += [cls.transcript_ref, cls.transcript_length]
+            elif field not in ('id', 'tags'):
+                columns.append(getattr(cls, field))
+        return columns
+
+    def to_dict(self, fields=DEFAULT_FIELDS):
+        # Only the requested fields are read, so deferred columns are never lazily loaded
+        serializers = {
+            'id': lambda: self.id,
+            'title': lambda: self.title,
+            'description': lambda: self.description,
+            'thumbnail': lambda: self.thumbnail,
+            'thumbnail_hash': lambda: self.thumbnail_hash,
+            'video': lambda: self.video,
+            'transcript_length': lambda: self.transcript_length,
+            'transcript': lambda: self.transcript,
+            'tags': lambda: [tag.name for tag in self.tags]
+        }
+        return {field: serializers[field]() for field in fields}
+
+    def __repr__(self):
+        return f"<Message {self.title}>"
+
+
+# Transcription job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class TranscriptionJob(db.Model):
+    __tablename__ = 'transcription_job'
+    id = Column(Integer, primary_key=True)
+    message_id = Column(Integer, ForeignKey('message.id'), nullable=False)
+    video = Column(Text, nullable=False) # video URL at the time the job was queued
+    status = Column(String(16), nullable=False, default=JOB_QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Profile of the last attempt (see `transcription.transcribe_video`), for capacity planning
+    mode = Column(String(16), nullable=True)
+    bytes_downloaded = Column(BigInteger, nullable=True)
+    audio_seconds = Column(Float, nullable=True)
+    download_seconds = Column(Float, nullable=True)
+    extract_seconds = Column(Float, nullable=True) # None in stream mode, where extraction overlaps the other stages
+    recognize_seconds = Column(Float, nullable=True)
+    transcribe_seconds = Column(Float, nullable=True)
+    real_time_factor = Column(Float, nullable=True) # transcribe_seconds / audio_seconds, below 1 is faster than real time
+
+    PROFILE_FIELDS = (
+        'mode', 'bytes_downloaded', 'audio_seconds', 'download_seconds', 'extract_seconds',
+        'recognize_seconds', 'transcribe_seconds', 'real_time_factor',
+    )
+
+    __table_args__ = (
+        Index('ix_transcription_job_status_id', 'status', 'id'), # oldest queued job first
+        Index('ix_transcription_job_message_id', 'message_id'),
+    )
+
+    def __init__(self, message_id, video):
+        self.message_id = message_id
+        self.video = video
+        self.status = JOB_QUEUED
+        self.attempts = 0
+        self.created_at = utcnow()
 
     def to_dict(self):
+        queued_until = self.started_at or self.finished_at or utcnow()
         return {
             'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'thumbnail': self.thumbnail,
+            'message_id': self.message_id,
             'video': self.video,
-            'transcript': self.transcript,
-            'tags': [tag.name for tag in self.tags]
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'queued_seconds': (queued_until - self.created_at).total_seconds() if self.created_at else None,
+            'run_seconds': (
+                ((self.finished_at or utcnow()) - self.started_at).total_seconds()
+                if self.started_at else None
+            ),
+            'profile': {field: getattr(self, field) for field in self.PROFILE_FIELDS} if self.mode else None,
         }
 
     def __repr__(self):
-        return f"<Message {self.title}>"
+        return f"<TranscriptionJob {self.id} {self.status}>"
+
+
+class DataVersion(db.Model):
+    """Single row counter bumped by every write that changes message or tag listings"""
+    __tablename__ = 'data_version'
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=utcnow)
+
+    def __repr__(self):
+        return f"<DataVersion {self.version}>"
@@ -0,0 +1,104 @@
+"""Read Replica Routing"""
+import itertools
+import threading
+import time
+from flask import current_app, g, request
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from app import db, logging
+from app.config import engine_options
+
+
+# Set on successful writes; reads from the same client go to the primary until it expires
+READ_YOUR_WRITES_COOKIE = "cms_primary_until"
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class ReplicaRouter:
+    """Round-robin over read replica engines, skipping replicas that failed recently"""
+
+    def __init__(self, engines, retry_after):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._turns = itertools.cycle(range(len(engines)))
+        self._down_until = [0.0] * len(engines)
+        self._lock = threading.Lock()
+
+    def candidates(self):
+        """Returns:
+            list: (index, engine) of the available replicas, starting with the next one in turn
+        """
+        with self._lock:
+            start = next(self._turns)
+        now = time.monotonic()
+        order = [(start + i) % len(self.engines) for i in range(len(self.engines))]
+        return [(index, self.engines[index]) for index in order if self._down_until[index] <= now]
+
+    def mark_down(self, index):
+        self._down_until[index] = time.monotonic() + self.retry_after
+
+
+def init_replicas(app, configure_engine):
+    """Create the replica engines of SQLALCHEMY_REPLICA_URIS, if any
+    Args:
+        app (Flask): App
+        configure_engine (callable): Applies per-connection settings to an engine, as for the primary
+    """
+    uris = app.config.get('SQLALCHEMY_REPLICA_URIS')
+    if not uris:
+        return
+    engines = [create_engine(uri, **engine_options(uri, app.config.get('SQLALCHEMY_ENGINE_OPTIONS'))) for uri in uris]
+    for engine in engines:
+        configure_engine(app, engine)
+    app.extensions['replicas'] = ReplicaRouter(engines, int(app.config.get('REPLICA_RETRY_SECONDS')))
+    app.after_request(_remember_write)
+    app.teardown_appcontext(_close_read_session)
+
+
+def _recently_wrote():
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _remember_write(response):
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        window = int(current_app.config.get('READ_YOUR_WRITES_SECONDS'))
+        response.set_cookie(READ_YOUR_WRITES_COOKIE, str(time.time() + window), max_age=window, httponly=True, samesite="Lax")
+    return response
+
+
+def _close_read_session(exception=None):
+    session = g.pop('read_session', None)
+    if session is not None and session is not db.session:
+        session.close()
+
+
+def get_read_session():
+    """Session for a read-only request
+    Bound to the next available replica in turn. A replica that can't be connected to is skipped
+    for REPLICA_RETRY_SECONDS. The primary is used when no replica is configured or available,
+    and for clients that wrote within READ_YOUR_WRITES_SECONDS (so they see their own writes).
+    The same session is returned for the rest of the request.
+    Returns:
+        Session: Replica session, or the request-scoped primary session
+    """
+    if 'read_session' in g:
+        return g.read_session
+    router = current_app.extensions.get('replicas')
+    session = None
+    if router and not _recently_wrote():
+        for index, engine in router.candidates():
+            candidate = Session(bind=engine)
+            try:
+                candidate.connection() # checked out now, so a failing replica is detected before any query
+                session = candidate
+                break
+            except DBAPIError as e:
+                candidate.close()
+                router.mark_down(index)
+                logging.warning(f"Read replica {index} unavailable, skipped for {router.retry_after}s: {str(e)}")
+    g.read_session = session or db.session
+    return g.read_session
@@ -1,15 +1,25 @@
 """Application Server Routes"""
-from flask import Blueprint, json, render_template, request, make_response, current_app as app
-import requests
-from sqlalchemy import or_
+from flask import Blueprint, Response, json, render_template, request, make_response, send_file, stream_with_context, current_app as app
+from datetime import timedelta
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import load_only, selectinload
 from app import logging
-from app.utils import create_db_session, transcribe_video
-from app.models import Message, Tag, message_tags
-from urllib.parse import urlparse
+from app.bulk import import_messages
+from app.cache import bump_data_version, cached_response
+from app.jobs import enqueue_transcription
+from app.media import validate_media
+from app.metrics import registry as metrics_registry
+from app.search import search_messages
+from app.thumbnails import FORMATS, parse_sizes, variant_path
+from app.transcripts import get_transcript_store
+from app.utils import get_db_session, get_stream_format, is_valid_url, stream_query
+from app.models import JOB_DONE, Message, Tag, TranscriptionJob, message_tags, link_message_tags, unlink_message_tags, utcnow
 
 
 main = Blueprint("main", __name__)
 messages = Blueprint("messages", __name__)
+jobs = Blueprint("jobs", __name__)
+thumbnails = Blueprint("thumbnails", __name__)
 
 @main.route("/")
 def home():
@@ -35,10 +45,56 @@ def home():
     return render_template('index.html', routes=routes)
 
 
+@main.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Exposes the metrics of this process in the Prometheus text format.
+
+    Recorded for every request when METRICS_ENABLED is set: counts by endpoint, method and status,
+    latency histograms, and the SQL statements executed and the time spent in them per request.
+    Outbound HTTP calls (thumbnail and video validation, transcription downloads) are recorded
+    with their latency by method and status class (not by host: the URLs come from users).
+    Each process keeps its own values, so every worker is scraped (or summed) separately.
+
+    Returns:
+    - 200: The metrics, as text/plain; version=0.0.4.
+    - 404: If metrics are disabled.
+
+    Example:
+    GET /metrics
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return make_response({"msg": "Metrics are disabled"}, 404)
+    return Response(metrics_registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+def _tag_facets(db_session, filters):
+    """Messages per tag over every message matching the filters, in one grouped query on message_tags
+    Args:
+        db_session (Session): DB Session
+        filters (list): Message filter conditions (no cursor, so the counts cover all pages)
+    Returns:
+        list: {"id", "name", "count"} of every tag with matching messages, most used first
+    """
+    counts = select(message_tags.c.tag_id, func.count().label("count")).group_by(message_tags.c.tag_id)
+    if filters:
+        # Driven by the matching messages, so only their links are read (message_tags primary key)
+        matching = select(Message.id).where(*filters).subquery()
+        counts = counts.select_from(matching).join(message_tags, message_tags.c.message_id == matching.c.id)
+    counts = counts.subquery()
+    qry = (
+        select(Tag.id, Tag.name, counts.c.count)
+        .join(counts, counts.c.tag_id == Tag.id)
+        .order_by(counts.c.count.desc(), Tag.name)
+    )
+    return [{"id": row.id, "name": row.name, "count": row.count} for row in db_session.execute(qry)]
+
+
 @messages.route("/messages", methods=["GET"])
+@cached_response
 def get_messages():
     """
-    Fetches messages from the database with optional filtering by message ID, title, or tags.
+    Fetches a page of messages from the database with optional filtering by message ID, title, or tags.
 
     This route handles GET requests to fetch messages, allowing users to filter results by:
     - Message IDs (comma-separated)
@@ -46,31 +102,58 @@ def get_messages():
     - Tags (comma-separated)
 
     The function connects to the database, constructs a query with the appropriate filters based on the request parameters, 
-    and returns the filtered messages in the response.
+    and returns one page of the filtered messages ordered by ID. Pages are fetched with keyset pagination: 
+    pass the "next_cursor" of a response as "after" to get the following page.
 
     Query Parameters:
     - id (optional): A comma-separated list of message IDs to filter by.
     - title (optional): A comma-separated list of titles to filter by.
     - tag (optional): A comma-separated list of tags to filter by.
+    - limit (optional): The page size, capped at MESSAGES_MAX_PAGE_SIZE (MESSAGES_DEFAULT_PAGE_SIZE by default).
+    - after (optional): Only return messages with an ID greater than this cursor.
+    - fields (optional): A comma-separated list of fields to return (id, title, description, thumbnail, 
+      thumbnail_hash, video, transcript_length, transcript, tags). Only the requested columns are selected; all fields 
+      but the transcript are returned by default. Requesting "transcript" reads every transcript of the page from 
+      the transcript store, prefer `GET /messages/<id>/transcript`.
+    - stream (optional): "json" or "ndjson" to stream every matching message instead of one page (see Streaming).
+    - facets (optional): "tags" to also return the number of matching messages per tag, counted over all pages 
+      (the cursor is ignored), e.g. to render a tag filter sidebar. Cannot be combined with stream.
 
     Returns:
-    - JSON response with the list of messages in the "data" key if successful, or an error message if an exception occurs.
+    - JSON response with the page of messages in the "data" key and the cursor of the next page in the "next_cursor" key 
+      (null on the last page) if successful, or an error message if an exception occurs.
+    - With facets=tags, a "facets" key with {"tags": [{"id", "name", "count"}, ...]}, most used tags first.
 
     HTTP Status Codes:
     - 200: If the messages are fetched successfully.
+    - 304: If the client's cached copy (ETag) is still current.
+    - 400: If limit or after is not a valid integer, if fields contains an unknown field, if stream is invalid, 
+      or if facets is not "tags" (or is combined with stream).
     - 500: If there is an error while fetching the messages.
 
+    Streaming:
+    - With stream=json (a chunked {"data": [...]} body) or stream=ndjson / Accept: application/x-ndjson 
+      (one message per line), rows are fetched in batches and written as they are produced, so worker memory 
+      stays flat for export-sized reads. limit is optional and not capped, and no next_cursor is returned.
+
     Logs:
     - Logs the URL of the request.
     - Logs the number of messages fetched successfully.
     - Logs any exceptions that occur during the process.
 
     Database:
-    - Connects to the database using the URI from the app configuration.
+    - Uses the application-scoped engine (pooled connections) configured once in `create_app`,
+      or a read replica when `DATABASE_REPLICA_URLS` is set (see `get_read_session`).
     - Performs filtering based on the request parameters (id, title, tags).
+    - Defers the columns that are not requested and loads the tags of the whole page in one batched query.
+    - Tag facets are counted with one aggregate query grouped by tag over `message_tags`.
+
+    Caching:
+    - Responses are cached per normalized query string until the next write bumps the data version.
+    - Responses carry an ETag header; a matching If-None-Match returns 304.
 
     Example:
-    GET /messages?id=1,2&title=Hello,World&tag=urgent,important
+    GET /messages?id=1,2&title=Hello,World&tag=urgent,important&limit=20&after=100&fields=id,title,tags
 
     Returns a JSON response with the filtered messages based on the specified IDs, titles, and tags.
 
@@ -78,39 +161,139 @@ def get_messages():
     - Any errors during database operations are caught and logged, with a 500 error returned to the user.
 
     Finally:
-    - The database session is always closed, regardless of whether the operation was successful or an error occurred.
+    - The request-scoped database session is always closed, regardless of whether the operation was successful or an error occurred.
+      A streamed response closes it when the stream ends instead.
     """
+    db_session = get_db_session(read_only=True)
+    streamed = False
     try:
         logging.info(request.url)
 
-        db_session = create_db_session(app.config.get('SQLALCHEMY_DATABASE_URI'))
-        qry = db_session.query(Message)
+        try:
+            stream = get_stream_format(request.args, request.accept_mimetypes)
+        except ValueError as e:
+            return make_response({"msg": str(e)}, 400)
+
+        try:
+            limit = request.args.get("limit")
+            limit = int(limit) if limit else None
+            after = int(request.args.get("after", 0))
+        except ValueError:
+            return make_response({"msg": "limit and after must be integers"}, 400)
+        if not stream:
+            limit = max(1, min(limit or int(app.config.get('MESSAGES_DEFAULT_PAGE_SIZE')), int(app.config.get('MESSAGES_MAX_PAGE_SIZE'))))
+
+        fields = Message.DEFAULT_FIELDS
+        if request.args.get("fields"):
+            fields = [field.strip() for field in request.args.get("fields").split(",")]
+            unknown = set(fields) - set(Message.FIELDS)
+            if unknown:
+                return make_response({"msg": f"Unknown fields: {', '.join(sorted(unknown))}"}, 400)
+
+        facets = [facet.strip() for facet in request.args.get("facets", "").split(",") if facet.strip()]
+        if set(facets) - {"tags"}:
+            return make_response({"msg": "facets must be tags"}, 400)
+
+        # Select only the requested columns, and the tags of the whole page in one query
+        qry = db_session.query(Message).options(load_only(Message.id, *Message.columns(fields)))
+        if 'tags' in fields:
+            qry = qry.options(selectinload(Message.tags))
 
         # Filter messages by ids if provided
+        filters = []
         ids = request.args.get("id")
         if ids:
             id_list = [id for id in ids.split(",")]
-            qry = qry.filter(Message.id.in_(id_list))
+            filters.append(Message.id.in_(id_list))
 
         # Filter messages by titles if provided
         titles = request.args.get("title")
         if titles:
             title_list = [title for title in titles.split(",")]
-            qry = qry.filter(Message.title.in_(title_list))
+            filters.append(Message.title.in_(title_list))
 
         # Filter messages by tags if provided
         tags = request.args.get("tag")
         if tags:
             tag_list = [tag.strip() for tag in tags.split(",")]
-            qry = qry.join(message_tags).join(Tag).filter(Tag.name.in_(tag_list))
-        
-        result = qry.all()
-        data = [record.to_dict() for record in result]
+            filters.append(Message.id.in_(
+                select(message_tags.c.message_id).join(Tag, Tag.id == message_tags.c.tag_id).where(Tag.name.in_(tag_list))
+            ))
+
+        qry = qry.filter(*filters, Message.id > after).order_by(Message.id)
+
+        # Streaming: every matching row (up to limit, if given), written as it is fetched
+        if stream:
+            if facets:
+                return make_response({"msg": "facets cannot be combined with stream"}, 400)
+            if limit:
+                qry = qry.limit(limit)
+            logging.info(f"Streaming messages as {stream}")
+            streamed = True # the stream closes the session when it ends
+            return stream_query(db_session, qry, lambda record: record.to_dict(fields), stream)
+
+        # Keyset pagination: one row more than the page tells whether there is a next page
+        result = qry.limit(limit + 1).all()
+        next_cursor = result[limit - 1].id if len(result) > limit else None
+        data = [record.to_dict(fields) for record in result[:limit]]
+        response = {"data": data, "next_cursor": next_cursor}
+        if 'tags' in facets:
+            response["facets"] = {"tags": _tag_facets(db_session, filters)}
         logging.info(f"Messages fetched successfully: {len(data)}")
-        return make_response({"data": data}, 200)
+        return make_response(response, 200)
     except Exception as e:
         logging.exception(f"Error fetching messages: {str(e)}")
         return make_response({"msg": "Error fetching messages"}, 500)
+    finally:
+        if db_session and not streamed:
+            db_session.close()
+
+
+@messages.route("/messages/search", methods=["GET"])
+@cached_response
+def search():
+    """
+    Searches messages by content using the full-text search index.
+
+    This route handles GET requests to search message titles, descriptions and transcripts. 
+    Every search term must match. Results are ranked by relevance (BM25 on SQLite FTS5, 
+    FULLTEXT relevance on MySQL) and include a snippet of the matching text.
+
+    Query Parameters:
+    - q (required): The search terms.
+    - limit (optional): The maximum number of results, capped at MESSAGES_MAX_PAGE_SIZE (MESSAGES_DEFAULT_PAGE_SIZE by default).
+
+    Returns:
+    - 200: The matching messages, best first, in the "data" key. Each message has its "score" and a "snippet" 
+      with the matching terms wrapped in <b></b>. Transcripts are not included.
+    - 400: If q is missing or limit is not a valid integer.
+    - 500: If there is an error while searching.
+
+    Example:
+    GET /messages/search?q=bunny+forest&limit=10
+    """
+    db_session = get_db_session(read_only=True)
+    try:
+        logging.info(request.url)
+
+        q = request.args.get("q", "").strip()
+        if not q:
+            return make_response({"msg": "q is required"}, 400)
+        try:
+            limit = int(request.args.get("limit", app.config.get('MESSAGES_DEFAULT_PAGE_SIZE')))
+        except ValueError:
+            return make_response({"msg": "limit must be an integer"}, 400)
+        limit = max(1, min(limit, int(app.config.get('MESSAGES_MAX_PAGE_SIZE'))))
+
+        data = [
+            {**message.to_dict(Message.DEFAULT_FIELDS), "score": score, "snippet": snippet}
+            for message, score, snippet in search_messages(db_session, q, limit)
+        ]
+        logging.info(f"Messages found: {len(data)}")
+        return make_response({"data": data}, 200)
+    except Exception as e:
+        logging.exception(f"Error searching messages: {str(e)}")
+        return make_response({"msg": "Error searching messages"}, 500)
     finally:
         if db_session:
             db_session.close()
@@ -133,10 +316,10 @@ def add_message():
     - thumbnail (optional): A URL to the thumbnail image for the message.
     - video (optional): A URL to the video associated with the message.
     - tags (optional): A list of tags associated with the message.
-    - gen_transcript (optional): A boolean indicating whether a transcript should be generated for the video.
+    - gen_transcript (optional): A boolean indicating whether a transcription job should be queued for the video.
 
     Returns:
-    - 201: If the message is added successfully.
+    - 201: If the message is added successfully. Includes the "job_id" of the queued transcription job, if any.
     - 400: If required fields are missing, if the title already exists, or if thumbnail/video validation fails.
     - 500: If there is an error during the process.
 
@@ -148,6 +331,9 @@ def add_message():
     Database:
     - Checks if a message with the same title already exists.
     - Validates the thumbnail and video URLs, ensuring they meet format and size requirements.
+      The thumbnail image is stored locally with resized variants (see `GET /thumbnails/<hash>/<size>`).
+      Both URLs are fetched concurrently through the shared pooled HTTP client, with connect/read
+      timeouts, so a slow or unreachable host fails the validation instead of holding the worker.
     - Validates and associates tags with the message, creating new tags if necessary.
 
     Example:
@@ -169,9 +355,9 @@ def add_message():
     - Any unexpected errors are caught, logged, and a 500 error is returned to the user.
 
     Finally:
-    - The database session is always closed, regardless of whether the operation was successful or an error occurred.
+    - The request-scoped database session is always closed, regardless of whether the operation was successful or an error occurred.
     """
-
+    db_session = get_db_session()
     try:
         logging.info(request.url)
 
@@ -185,49 +371,25 @@ def add_message():
         description = data.get('description')
         if not description:
             return make_response({"msg": "Description is required"}, 400)
-        
-        db_session = create_db_session(app.config.get('SQLALCHEMY_DATABASE_URI'))
-        
+
         # Check if title already exists
         existing_message = db_session.query(Message).filter_by(title=title).first()
         if existing_message:
             return make_response({"msg": "A message with this title already exists"}, 400)
         
         thumbnail = data.get('thumbnail', None)
-        if thumbnail:
-            # Validate if the thumbnail is a valid URL
-            parsed_url = urlparse(thumbnail)
-            if all([parsed_url.scheme, parsed_url.netloc]):
-                # Download the image from the URL
-                response = requests.get(thumbnail, stream=True)
-                if response.status_code != 200:
-                    return make_response({"msg": "Failed to fetch thumbnail image from URL"}, 400)
-                # Precautionary server-side validation for thumbnail image
-                image_format = response.headers.get('Content-Type')
-                if image_format not in app.config.get('ALLOWED_IMAGE_FORMATS'):
-                    return make_response({"msg": f"Only {app.config.get('ALLOWED_IMAGE_FORMATS')} formats are allowed."}, 400)
-                image_size = len(response.content)
-                if image_size > int(app.config.get('MAX_IMAGE_SIZE_MB')) * 1024 * 1024: # Convert MB to bytes
-                    return make_response({"msg": f"Image size must be less than {app.config.get('MAX_IMAGE_SIZE_MB')} MB."}, 400)
-            else:
-                thumbnail = None
+        if thumbnail and not is_valid_url(thumbnail):
+            thumbnail = None
         
         video = data.get('video', None)
-        transcript = None
-        if video:
-            # Validate if the video is a valid URL
-            parsed_url = urlparse(video)
-            if all([parsed_url.scheme, parsed_url.netloc]):
-                # Download the video from the URL
-                response = requests.head(video)
-                if response.status_code != 200:
-                    return make_response({"msg": "Failed to fetch video from URL"}, 400)
-                # Precautionary server-side validation for thumbnail image
-                video_format = response.headers.get('Content-Type')
-                if not video_format or video_format not in app.config.get('ALLOWED_VIDEO_FORMATS'):
-                    return make_response({"msg": f"Only {app.config.get('ALLOWED_VIDEO_FORMATS')} formats are allowed."}, 400)
-                if data.get('gen_transcript', False):
-                    transcript = transcribe_video(video)
+        video_url = video if video and is_valid_url(video) else None
+
+        # Precautionary server-side validation for thumbnail image (format and bounded size) and video (format),
+        # fetched concurrently
+        error, thumbnail_hash = validate_media(thumbnail, video_url, app.config)
+        if error:
+            return make_response({"msg": error}, 400)
+        gen_transcript = bool(video_url) and data.get('gen_transcript', False)
 
         tags = data.get('tags', [])
 
@@ -237,27 +399,25 @@ def add_message():
         )
         if thumbnail:
             new_message.thumbnail = thumbnail
+            new_message.thumbnail_hash = thumbnail_hash
         if video:
             new_message.video = video
-            new_message.transcript = transcript
         if tags:
-            tags_list = []
-            for tag in tags:
-                tag = tag.strip()
-                existing_tag = db_session.query(Tag).filter_by(name=tag).first()
-                if existing_tag:
-                    tags_list.append(existing_tag)
-                else:
-                    new_tag = Tag(name=tag)
-                    db_session.add(new_tag)
-                    tags_list.append(new_tag)
-            new_message.tags = tags_list
+            new_message.tags = Tag.resolve(db_session, tags)
 
         db_session.add(new_message)
+        job = None
+        if gen_transcript:
+            db_session.flush() # Assign the message id
+            job = enqueue_transcription(db_session, new_message)
+        bump_data_version(db_session)
         db_session.commit()
         
         logging.info(f"Message added successfully: {new_message.title}")
-        return make_response({"msg": f"Message added successfully: {new_message.title}"}, 201)
+        result = {"msg": f"Message added successfully: {new_message.title}"}
+        if job:
+            result["job_id"] = job.id
+        return make_response(result, 201)
     except Exception as e:
         logging.exception(f"Error adding message: {str(e)}")
         db_session.rollback()
@@ -267,6 +427,57 @@ def add_message():
             db_session.close()
 
 
+@messages.route("/messages/bulk", methods=["POST"])
+def add_messages_bulk():
+    """
+    Imports messages in bulk from a newline-delimited JSON (NDJSON) request body.
+
+    This route handles POST requests with one message per line, using the same fields as `POST /messages`. 
+    The body is read as a stream and inserted in batches, with all tags of a batch resolved in one query 
+    and a single commit per batch. Invalid rows are reported with their line number and skipped; 
+    they do not abort the import. Thumbnail and video URLs are checked for format only, and transcription 
+    jobs are queued for rows with a video and "gen_transcript".
+
+    Query Parameters:
+    - batch_size (optional): The number of messages per commit (BULK_IMPORT_BATCH_SIZE by default).
+
+    Request Body (NDJSON):
+    {"title": "First", "description": "First message", "tags": ["tag1", "tag2"]}
+    {"title": "Second", "description": "Second message", "video": "http://example.com/video.mp4", "gen_transcript": true}
+
+    Returns:
+    - 200: The import report with the "imported" and "failed" counts and the per-line "errors".
+    - 400: If batch_size is not a positive integer.
+    - 500: If there is an error during the import.
+
+    Example:
+    POST /messages/bulk?batch_size=1000
+    Content-Type: application/x-ndjson
+
+    The same import is available from the command line: `flask import-messages messages.ndjson`
+    """
+    db_session = get_db_session()
+    try:
+        logging.info(request.url)
+
+        try:
+            batch_size = int(request.args.get("batch_size", app.config.get('BULK_IMPORT_BATCH_SIZE')))
+        except ValueError:
+            batch_size = 0
+        if batch_size < 1:
+            return make_response({"msg": "batch_size must be a positive integer"}, 400)
+
+        report = import_messages(db_session, iter(request.stream.readline, b""), batch_size)
+        return make_response({"msg": f"Messages imported successfully: {report['imported']}", **report}, 200)
+    except Exception as e:
+        logging.exception(f"Error importing messages: {str(e)}")
+        db_session.rollback()
+        return make_response({"msg": "Error importing messages"}, 500)
+    finally:
+        if db_session:
+            db_session.close()
+
+
 @messages.route("/messages", methods=["PUT"])
 def update_message():
     """
@@ -283,13 +494,13 @@ def update_message():
     - thumbnail (optional): The URL of the new thumbnail image.
     - video (optional): The URL of the new video associated with the message.
     - tags (optional): A list of tags to associate with the message.
-    - gen_transcript (optional): A boolean indicating whether a transcript should be generated for the video.
+    - gen_transcript (optional): A boolean indicating whether a transcription job should be queued for the video.
 
     Query Parameters:
     - id (required): The ID of the message to be updated.
 
     Returns:
-    - 200: If the message is updated successfully.
+    - 200: If the message is updated successfully. Includes the "job_id" of the queued transcription job, if any.
     - 400: If required fields are missing or if thumbnail/video validation fails.
     - 404: If the message with the specified ID is not found.
     - 500: If there is an error during the process.
@@ -302,6 +513,8 @@ def update_message():
     Database:
     - Fetches the message to be updated by ID.
     - Validates and updates the description, thumbnail, video, and tags based on the request data.
+      Changed thumbnail and video URLs are fetched concurrently, with connect/read timeouts.
+      A changed thumbnail image is stored locally with resized variants.
     - Updates the tags, creating new ones if necessary.
 
     Example:
@@ -323,9 +536,9 @@ def update_message():
     - Any unexpected errors are caught, logged, and a 500 error is returned to the user.
 
     Finally:
-    - The database session is always closed, regardless of whether the operation was successful or an error occurred.
+    - The request-scoped database session is always closed, regardless of whether the operation was successful or an error occurred.
     """
-
+    db_session = get_db_session()
     try:
         logging.info(request.url)
 
@@ -335,8 +548,6 @@ def update_message():
         id = request.args.get('id')
         if not id:
             return make_response({"msg": "Id is required"}, 400)
-        
-        db_session = create_db_session(app.config.get('SQLALCHEMY_DATABASE_URI'))
 
         message = db_session.query(Message).filter_by(id=id).first()
         if not message:
@@ -349,45 +560,33 @@ def update_message():
             message.description = description
 
         thumbnail = data.get('thumbnail', None)
+        video = data.get('video', None)
+        # Only changed URLs with a valid format are fetched
+        changed_thumbnail = thumbnail if thumbnail and message.thumbnail != thumbnail and is_valid_url(thumbnail) else None
+        changed_video = video if video and message.video != video and is_valid_url(video) else None
+
+        # Precautionary server-side validation for thumbnail image (format and bounded size) and video (format),
+        # fetched concurrently
+        error, thumbnail_hash = validate_media(changed_thumbnail, changed_video, app.config)
+        if error:
+            return make_response({"msg": error}, 400)
+
         if thumbnail:
             if message.thumbnail != thumbnail:
-                # Validate if the thumbnail is a valid URL
-                parsed_url = urlparse(thumbnail)
-                if all([parsed_url.scheme, parsed_url.netloc]):
-                    # Download the image from the URL
-                    response = requests.get(thumbnail, stream=True)
-                    if response.status_code != 200:
-                        return make_response({"msg": "Failed to fetch thumbnail image from URL"}, 400)
-                    # Precautionary server-side validation for thumbnail image
-                    image_format = response.headers.get('Content-Type')
-                    if image_format not in app.config.get('ALLOWED_IMAGE_FORMATS'):
-                        return make_response({"msg": f"Only {app.config.get('ALLOWED_IMAGE_FORMATS')} formats are allowed."}, 400)
-                    image_size = len(response.content)
-                    if image_size > int(app.config.get('MAX_IMAGE_SIZE_MB')) * 1024 * 1024: # Convert MB to bytes
-                        return make_response({"msg": f"Image size must be less than {app.config.get('MAX_IMAGE_SIZE_MB')} MB."}, 400)
-                    message.thumbnail = thumbnail
-                else: 
-                    message.thumbnail = None
+                message.thumbnail = changed_thumbnail
+                message.thumbnail_hash = thumbnail_hash
         else:
             message.thumbnail = None
+            message.thumbnail_hash = None
 
-        video = data.get('video', None)
+        job = None
         if video:
             if message.video != video:
-                # Validate if the video is a valid URL
-                parsed_url = urlparse(video)
-                if all([parsed_url.scheme, parsed_url.netloc]):
-                    # Download the video from the URL
-                    response = requests.head(video)
-                    if response.status_code != 200:
-                        return make_response({"msg": "Failed to fetch video from URL"}, 400)
-                    # Precautionary server-side validation for thumbnail image
-                    video_format = response.headers.get('Content-Type')
-                    if not video_format or video_format not in app.config.get('ALLOWED_VIDEO_FORMATS'):
-                        return make_response({"msg": f"Only {app.config.get('ALLOWED_VIDEO_FORMATS')} formats are allowed."}, 400)
+                if changed_video:
                     message.video = video
                     if data.get('gen_transcript', False):
-                        message.transcript = transcribe_video(video)
+                        message.transcript = None
+                        job = enqueue_transcription(db_session, message)
                 else:
                     message.video = None
                     message.transcript = None
@@ -397,22 +596,16 @@ def update_message():
 
         tags = data.get('tags', [])
         if tags:
-            tags_list = []
-            for tag in tags:
-                tag = tag.strip()
-                existing_tag = db_session.query(Tag).filter_by(name=tag).first()
-                if existing_tag:
-                    tags_list.append(existing_tag)
-                else:
-                    new_tag = Tag(name=tag)
-                    db_session.add(new_tag)
-                    tags_list.append(new_tag)
-            message.tags = tags_list
+            message.tags = Tag.resolve(db_session, tags)
         
+        bump_data_version(db_session)
         db_session.commit()
         
         logging.info(f"Message updated successfully: {message.title}")
-        return make_response({"msg": f"Message updated successfully: {message.title}"}, 200)
+        result = {"msg": f"Message updated successfully: {message.title}"}
+        if job:
+            result["job_id"] = job.id
+        return make_response(result, 200)
     except Exception as e:
         logging.exception(f"Error updating message: {str(e)}")
         db_session.rollback()
@@ -422,22 +615,104 @@ def update_message():
             db_session.close()
 
 
+@messages.route("/messages/<int:message_id>/transcript", methods=["GET"])
+def get_transcript(message_id):
+    """
+    Streams the transcript of a message.
+
+    Transcripts are kept out of the message rows, compressed in the transcript store 
+    (TRANSCRIPT_STORE); the row only holds a reference, the length and the hash of the text. 
+    This route decompresses the transcript as it is sent, so it is never held in memory whole.
+
+    Path Parameters:
+    - message_id (required): The ID of the message.
+
+    Returns:
+    - 200: The transcript as text/plain, with the transcript hash as ETag.
+    - 304: If If-None-Match matches the transcript hash.
+    - 404: If the message is not found or has no transcript (yet).
+    - 500: If there is an error while reading the transcript.
+
+    Example:
+    GET /messages/1/transcript
+    """
+    db_session = get_db_session(read_only=True)
+    try:
+        logging.info(request.url)
+
+        message = db_session.query(Message).options(
+            load_only(Message.id, Message.transcript_ref, Message.transcript_hash)
+        ).filter_by(id=message_id).first()
+        if not message or not message.transcript_ref:
+            return make_response({"msg": "Transcript not found"}, 404)
+
+        if request.if_none_match.contains(message.transcript_hash):
+            response = make_response("", 304)
+        else:
+            response = Response(
+                stream_with_context(get_transcript_store().iter_text(message.transcript_ref)),
+                mimetype="text/plain"
+            )
+        response.set_etag(message.transcript_hash) # content-addressed, so the hash identifies the text
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        logging.exception(f"Error fetching transcript: {str(e)}")
+        return make_response({"msg": "Error fetching transcript"}, 500)
+    finally:
+        if db_session:
+            db_session.close()
+
+
+def _tag_messages_preview(db_session, tag_ids, limit):
+    """First messages of each tag, by message ID, in one windowed query
+    Returns:
+        dict: Tag ID -> list of (message ID, title), at most limit + 1 per tag to detect a next page
+    """
+    position = func.row_number().over(
+        partition_by=message_tags.c.tag_id, order_by=message_tags.c.message_id
+    ).label("position")
+    ranked = (
+        select(message_tags.c.tag_id, Message.id, Message.title, position)
+        .join(Message, Message.id == message_tags.c.message_id)
+        .where(message_tags.c.tag_id.in_(tag_ids))
+        .subquery()
+    )
+    preview = {tag_id: [] for tag_id in tag_ids}
+    for tag_id, message_id, title in db_session.execute(
+        select(ranked.c.tag_id, ranked.c.id, ranked.c.title)
+        .where(ranked.c.position <= limit + 1)
+        .order_by(ranked.c.tag_id, ranked.c.id)
+    ):
+        preview[tag_id].append((message_id, title))
+    return preview
+
+
 @messages.route("/tags", methods=["GET"])
+@cached_response
 def get_tags():
     """
     Fetches tags from the database, with optional filters.
 
     This route handles GET requests to retrieve tags from the database, allowing filtering 
     by tag ID, name, or associated message titles. It supports filtering by multiple criteria 
-    using query parameters. If no filters are provided, it returns all tags.
+    using query parameters. If no filters are provided, it returns all tags. Each tag includes 
+    the number of messages it is assigned to; the titles of those messages are opt-in.
 
     Query Parameters:
     - id (optional): A comma-separated list of tag IDs to filter by.
     - name (optional): A comma-separated list of tag names to filter by.
     - message (optional): A comma-separated list of message titles to filter tags by.
+    - messages (optional): Include the titles of up to this many messages per tag (capped at MESSAGES_MAX_PAGE_SIZE), 
+      with a "messages_next_cursor" to continue with `GET /tags/<id>/messages?after=<cursor>`.
+    - stream (optional): "json" (a chunked {"data": [...]} body) or "ndjson" (one tag per line) to write tags 
+      as they are fetched instead of building the whole response in memory. Accept: application/x-ndjson 
+      selects "ndjson" as well. Cannot be combined with messages.
 
     Returns:
-    - 200: A list of tags that match the specified filters.
+    - 200: A list of tags that match the specified filters, each with its "message_count".
+    - 304: If the client's cached copy (ETag) is still current.
+    - 400: If messages is not a valid integer, or is combined with stream.
     - 500: If there is an error while fetching the tags.
 
     Logs:
@@ -446,22 +721,52 @@ def get_tags():
     - Logs any exceptions that occur during the process.
 
     Database:
-    - Filters tags based on the provided filters and returns distinct results.
+    - Filters tags based on the provided filters.
+    - Counts the messages of every returned tag in the same query, with an aggregate over the `message_tags` 
+      tag_id index; no message rows are loaded for the counts.
+    - With messages, the first messages of every returned tag are fetched with one windowed query.
+
+    Caching:
+    - Responses are cached per normalized query string until the next write bumps the data version.
+    - Responses carry an ETag header; a matching If-None-Match returns 304.
 
     Example:
-    GET /tags?id=1,2,name=tag1,tag2,message=message1, message2
+    GET /tags?id=1,2,name=tag1,tag2,message=message1, message2&messages=10
 
     Returns a JSON response with a list of filtered tags.
 
     Exceptions:
     - Any errors that occur during the fetching of tags are logged and returned as a 500 error.
     """
-
+    db_session = get_db_session(read_only=True)
+    streamed = False
     try:
         logging.info(request.url)
 
-        db_session = create_db_session(app.config.get('SQLALCHEMY_DATABASE_URI'))
-        qry = db_session.query(Tag)
+        try:
+            stream = get_stream_format(request.args, request.accept_mimetypes)
+        except ValueError as e:
+            return make_response({"msg": str(e)}, 400)
+
+        try:
+            messages_limit = request.args.get("messages")
+            messages_limit = int(messages_limit) if messages_limit else None
+        except ValueError:
+            return make_response({"msg": "messages must be an integer"}, 400)
+        if messages_limit is not None:
+            if stream:
+                return make_response({"msg": "messages cannot be combined with stream"}, 400)
+            messages_limit = max(1, min(messages_limit, int(app.config.get('MESSAGES_MAX_PAGE_SIZE'))))
+
+        # Messages per tag, counted in the same query instead of loading the messages of every tag. Correlated,
+        # so only the links of the returned tags are counted (a range of the message_tags tag_id index each)
+        message_count = (
+            select(func.count()).select_from(message_tags)
+            .where(message_tags.c.tag_id == Tag.id)
+            .correlate(Tag)
+            .scalar_subquery()
+        )
+        qry = db_session.query(Tag, message_count)
 
         # Filter tags by id if provided
         ids = request.args.get("id")
@@ -479,16 +784,87 @@ def get_tags():
         message_titles = request.args.get("message")
         if message_titles:
             message_title_list = [title.strip() for title in message_titles.split(",")]
-            title_filters = [Message.name.ilike(f"%{title}%") for title in message_title_list]
-            qry = qry.join(message_tags).join(Message).filter(or_(*title_filters))
+            title_filters = [Message.title.ilike(f"%{title}%") for title in message_title_list]
+            qry = qry.filter(Tag.id.in_(
+                select(message_tags.c.tag_id).join(Message, Message.id == message_tags.c.message_id).where(or_(*title_filters))
+            ))
 
-        result = qry.distinct().all()
-        data = [record.to_dict() for record in result]
+        qry = qry.order_by(Tag.id)
+        if stream:
+            logging.info(f"Streaming tags as {stream}")
+            streamed = True # the stream closes the session when it ends
+            return stream_query(db_session, qry, lambda record: record[0].to_dict(record[1]), stream)
+
+        result = qry.all()
+        data = [tag.to_dict(message_count) for tag, message_count in result]
+        if messages_limit is not None and result:
+            preview = _tag_messages_preview(db_session, [tag.id for tag, _ in result], messages_limit)
+            for record in data:
+                page = preview[record['id']]
+                record['messages'] = [title for _, title in page[:messages_limit]]
+                record['messages_next_cursor'] = page[messages_limit - 1][0] if len(page) > messages_limit else None
         logging.info(f"Tags fetched successfully: {len(data)}")
         return make_response({"data": data}, 200)
     except Exception as e:
         logging.exception(f"Error fetching tags: {str(e)}")
         return make_response({"msg": "Error fetching tags"}, 500)
+    finally:
+        if db_session and not streamed:
+            db_session.close()
+
+
+@messages.route("/tags/<int:tag_id>/messages", methods=["GET"])
+@cached_response
+def get_tag_messages(tag_id):
+    """
+    Fetches the messages of a tag, one page at a time.
+
+    Path Parameters:
+    - tag_id (required): The ID of the tag.
+
+    Query Parameters:
+    - limit (optional): The page size, capped at MESSAGES_MAX_PAGE_SIZE (MESSAGES_DEFAULT_PAGE_SIZE by default).
+    - after (optional): Only return messages with an ID greater than this cursor.
+
+    Returns:
+    - 200: The page of messages (id and title) in the "data" key and the cursor of the next page in 
+      the "next_cursor" key (null on the last page).
+    - 304: If the client's cached copy (ETag) is still current.
+    - 400: If limit or after is not a valid integer.
+    - 404: If the tag is not found.
+    - 500: If there is an error while fetching the messages.
+
+    Example:
+    GET /tags/1/messages?limit=20&after=100
+    """
+    db_session = get_db_session(read_only=True)
+    try:
+        logging.info(request.url)
+
+        try:
+            limit = int(request.args.get("limit", app.config.get('MESSAGES_DEFAULT_PAGE_SIZE')))
+            after = int(request.args.get("after", 0))
+        except ValueError:
+            return make_response({"msg": "limit and after must be integers"}, 400)
+        limit = max(1, min(limit, int(app.config.get('MESSAGES_MAX_PAGE_SIZE'))))
+
+        if not db_session.get(Tag, tag_id):
+            return make_response({"msg": "Tag not found"}, 404)
+
+        result = db_session.execute(
+            select(Message.id, Message.title)
+            .join(message_tags, message_tags.c.message_id == Message.id)
+            .where(message_tags.c.tag_id == tag_id, message_tags.c.message_id > after)
+            .order_by(message_tags.c.message_id) # the order of the tag_id index, no sort
+            .limit(limit + 1) # one extra row tells whether there is a next page
+        ).all()
+        next_cursor = result[limit - 1].id if len(result) > limit else None
+        data = [{"id": row.id, "title": row.title} for row in result[:limit]]
+        logging.info(f"Tag messages fetched successfully: {len(data)}")
+        return make_response({"data": data, "next_cursor": next_cursor}, 200)
+    except Exception as e:
+        logging.exception(f"Error fetching tag messages: {str(e)}")
+        return make_response({"msg": "Error fetching tag messages"}, 500)
     finally:
         if db_session:
             db_session.close()
@@ -500,7 +876,7 @@ def add_tag():
     Adds new tags to the database.
 
     This route handles POST requests to add new tags to the database. It checks whether 
-    the tags already exist (case-insensitive) and only adds those that do not already exist. 
+    the tags already exist and only adds those that do not already exist. 
     The request body must contain a list of tag names.
 
     Request Body (JSON):
@@ -517,7 +893,8 @@ def add_tag():
     - Logs any exceptions that occur during the process.
 
     Database:
-    - Checks if each tag exists and adds only those that are not present.
+    - Fetches the existing tags with one query and inserts the missing ones with one statement that 
+      tolerates tags inserted concurrently by other requests.
 
     Example:
     POST /tags
@@ -531,7 +908,7 @@ def add_tag():
     - If the 'tags' field is not a list or is empty, a 400 error is returned.
     - Any errors that occur during the process are logged and returned as a 500 error.
     """
-
+    db_session = get_db_session()
     try:
         data = json.loads(request.data)
         tags = data.get("tags", [])
@@ -539,16 +916,10 @@ def add_tag():
         if not tags or not isinstance(tags, list):
             return make_response({"msg": "A list of tags is required"}, 400)
 
-        db_session = create_db_session(app.config.get('SQLALCHEMY_DATABASE_URI'))
-
-        for name in tags:
-            name = name.strip()
-            # Check if tag already exists (case-insensitive check)
-            existing_tag = db_session.query(Tag).filter(Tag.name == name).first()
-            if not existing_tag:
-                new_tag = Tag(name=name)
-                db_session.add(new_tag)
+        # Fetch existing tags and insert the missing ones in one statement
+        Tag.resolve(db_session, tags)
 
+        bump_data_version(db_session)
         db_session.commit()
 
         logging.info(f"Tags added successfully: {tags}")
@@ -562,6 +933,27 @@ def add_tag():
             db_session.close()
 
 
+def _message_tag_ids(data):
+    """Validate and de-duplicate the message and tag IDs of a /message_tags request body
+    Returns:
+        tuple: (message_ids, tag_ids, error response or None)
+    """
+    message_ids = data.get("message_ids", [])
+    if not message_ids:
+        return None, None, make_response({"msg": "message_ids is required and cannot be empty"}, 400)
+
+    tag_ids = data.get("tag_ids", [])
+    if not tag_ids:
+        return None, None, make_response({"msg": "tag_ids is required and cannot be empty"}, 400)
+
+    try:
+        message_ids = list(dict.fromkeys(int(id) for id in message_ids))
+        tag_ids = list(dict.fromkeys(int(id) for id in tag_ids))
+    except (TypeError, ValueError):
+        return None, None, make_response({"msg": "message_ids and tag_ids must be lists of integers"}, 400)
+    return message_ids, tag_ids, None
+
+
 @messages.route("/message_tags", methods=["POST"])
 def add_message_tags():
     """
@@ -578,7 +970,7 @@ def add_message_tags():
 
     Returns:
     - 201: If the message-tag associations are created successfully.
-    - 400: If the 'message_ids' or 'tag_ids' are missing or empty.
+    - 400: If the 'message_ids' or 'tag_ids' are missing, empty or not integers.
     - 500: If there is an error while assigning the message tags.
 
     Logs:
@@ -587,7 +979,8 @@ def add_message_tags():
     - Logs any exceptions that occur during the process.
 
     Database:
-    - Checks for existing message-tag associations and adds only those that are new.
+    - Finds the existing message-tag associations with one query and inserts all the new ones 
+      with a single multi-row insert, whatever the number of messages and tags.
 
     Example:
     POST /message_tags
@@ -602,33 +995,20 @@ def add_message_tags():
     - If 'message_ids' or 'tag_ids' are missing or empty, a 400 error is returned.
     - Any errors during the process are logged and returned as a 500 error.
     """
+    db_session = get_db_session()
     try:
         logging.info(request.url)
 
         data = json.loads(request.data) # deserialize
         logging.info(data)
 
-        message_ids = data.get("message_ids", [])
-        if not message_ids:
-            return make_response({"msg": "message_ids is required and cannot be empty"}, 400)
-        
-        tag_ids = data.get("tag_ids", [])
-        if not tag_ids:
-            return make_response({"msg": "tag_ids is required and cannot be empty"}, 400)
-        
-        db_session = create_db_session(app.config.get('SQLALCHEMY_DATABASE_URI'))
-
-        # Track how many new links were added
-        new_mappings_count = 0
-
-        for message_id in message_ids:
-            for tag_id in tag_ids:
-                # Check if the mapping already exists
-                exists = db_session.query(message_tags).filter_by(message_id=message_id, tag_id=tag_id).first()
-                if not exists:
-                    db_session.execute(message_tags.insert().values(message_id=message_id, tag_id=tag_id))
-                    new_mappings_count += 1
+        message_ids, tag_ids, error = _message_tag_ids(data)
+        if error:
+            return error
+
+        new_mappings_count = link_message_tags(db_session, message_ids, tag_ids)
         
+        bump_data_version(db_session)
         db_session.commit()
 
         logging.info(f"Message Tags assigned successfully: {new_mappings_count}")
@@ -636,7 +1016,260 @@ def add_message_tags():
 
     except Exception as e:
         logging.exception(f"Error assigning message tags: {str(e)}")
+        db_session.rollback()
         return make_response({"msg": "Error assigning message tags"}, 500)
     finally:
         if db_session:
             db_session.close()
+
+
+@messages.route("/message_tags", methods=["DELETE"])
+def delete_message_tags():
+    """
+    Removes tags from messages by deleting the links between message IDs and tag IDs.
+
+    This route handles DELETE requests to unassign tags from multiple messages. It expects 
+    a list of message IDs and a list of tag IDs in the request body, and removes every 
+    association between the provided messages and tags with a single statement.
+
+    Request Body (JSON):
+    - message_ids (required): A list of message IDs from which tags will be removed.
+    - tag_ids (required): A list of tag IDs to be removed from the messages.
+
+    Returns:
+    - 200: If the message-tag associations are removed successfully.
+    - 400: If the 'message_ids' or 'tag_ids' are missing, empty or not integers.
+    - 500: If there is an error while removing the message tags.
+
+    Example:
+    DELETE /message_tags
+    {
+        "message_ids": [1, 2],
+        "tag_ids": [1, 2]
+    }
+
+    Returns a JSON response with the number of associations removed.
+    """
+    db_session = get_db_session()
+    try:
+        logging.info(request.url)
+
+        data = json.loads(request.data) # deserialize
+        logging.info(data)
+
+        message_ids, tag_ids, error = _message_tag_ids(data)
+        if error:
+            return error
+
+        removed_mappings_count = unlink_message_tags(db_session, message_ids, tag_ids)
+
+        bump_data_version(db_session)
+        db_session.commit()
+
+        logging.info(f"Message Tags removed successfully: {removed_mappings_count}")
+        return make_response({"msg": f"Message Tags removed successfully: {removed_mappings_count}"}, 200)
+
+    except Exception as e:
+        logging.exception(f"Error removing message tags: {str(e)}")
+        db_session.rollback()
+        return make_response({"msg": "Error removing message tags"}, 500)
+    finally:
+        if db_session:
+            db_session.close()
+
+
+@jobs.route("/jobs/stats", methods=["GET"])
+def get_job_stats():
+    """
+    Aggregates the transcription profiles of finished jobs, per transcription mode.
+
+    Every transcription records the wall time of its stages (download, audio extraction, speech 
+    recognition), the bytes downloaded and the audio duration on its job. These totals show whether 
+    transcriptions are network, ffmpeg or ASR bound, and the real-time factor (worker seconds per 
+    second of audio) sizes the transcription worker pool.
+
+    Stream mode is reported per source. With "stream:url" (the default TRANSCRIPTION_STREAM_SOURCE) 
+    ffmpeg downloads and decodes the video itself, so there are no download bytes or seconds and 
+    the whole pipeline is counted as recognition; only the real-time factor is comparable. Use the 
+    "pipe" source (or the "file" mode) to tell network from ASR time.
+
+    Query Parameters:
+    - days (optional): Only jobs finished in the last N days (all jobs by default).
+
+    Returns:
+    - 200: Per mode in the "data" key: job counts ("jobs", "done"), totals of bytes and audio and 
+      transcription seconds, average and maximum seconds of each stage, and the real-time factor 
+      (total transcription seconds / total audio seconds, and the maximum of a single job).
+    - 400: If days is not a positive integer.
+    - 500: If there is an error while aggregating the jobs.
+
+    Database:
+    - One aggregate query grouped by mode over the profiled jobs; may be served by a read replica.
+
+    Example:
+    GET /jobs/stats?days=7
+    """
+    db_session = get_db_session(read_only=True)
+    try:
+        logging.info(request.url)
+
+        filters = [TranscriptionJob.transcribe_seconds.isnot(None)]
+        if request.args.get("days"):
+            try:
+                days = int(request.args.get("days"))
+            except ValueError:
+                days = 0
+            if days < 1:
+                return make_response({"msg": "days must be a positive integer"}, 400)
+            filters.append(TranscriptionJob.finished_at >= utcnow() - timedelta(days=days))
+
+        stages = ("download", "extract", "recognize", "transcribe")
+        columns = [
+            TranscriptionJob.mode,
+            func.count().label("jobs"),
+            func.sum(case((TranscriptionJob.status == JOB_DONE, 1), else_=0)).label("done"),
+            func.sum(TranscriptionJob.bytes_downloaded).label("bytes_downloaded"),
+            func.sum(TranscriptionJob.audio_seconds).label("audio_seconds"),
+            func.sum(TranscriptionJob.transcribe_seconds).label("transcribe_seconds"),
+            func.max(TranscriptionJob.real_time_factor).label("max_real_time_factor"),
+        ]
+        for stage in stages:
+            column = getattr(TranscriptionJob, f"{stage}_seconds")
+            columns += [func.avg(column).label(f"avg_{stage}_seconds"), func.max(column).label(f"max_{stage}_seconds")]
+        rows = db_session.execute(
+            select(*columns).where(*filters).group_by(TranscriptionJob.mode).order_by(TranscriptionJob.mode)
+        ).all()
+
+        data = []
+        for row in rows:
+            stats = dict(row._mapping)
+            stats["real_time_factor"] = (
+                round(stats["transcribe_seconds"] / stats["audio_seconds"], 3) if stats["audio_seconds"] else None
+            )
+            data.append({
+                key: round(value, 3) if isinstance(value, float) else value
+                for key, value in stats.items()
+            })
+        return make_response({"data": data}, 200)
+    except Exception as e:
+        logging.exception(f"Error aggregating job stats: {str(e)}")
+        return make_response({"msg": "Error aggregating job stats"}, 500)
+    finally:
+        if db_session:
+            db_session.close()
+
+
+@jobs.route("/jobs/<int:job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    Fetches the status of a transcription job.
+
+    This route handles GET requests to report the progress of a transcription job queued by 
+    `POST /messages` or `PUT /messages` with `gen_transcript`. Jobs are processed by the 
+    transcription worker pool (`flask transcription-worker`), not by the web server.
+
+    Path Parameters:
+    - job_id (required): The ID of the transcription job.
+
+    Returns:
+    - 200: The job with its status (queued, running, done or failed) and timings in the "data" key.
+    - 404: If the job is not found.
+    - 500: If there is an error while fetching the job.
+
+    Example:
+    GET /jobs/1
+    """
+    db_session = get_db_session()
+    try:
+        logging.info(request.url)
+
+        job = db_session.get(TranscriptionJob, job_id)
+        if not job:
+            return make_response({"msg": "Job not found"}, 404)
+
+        return make_response({"data": job.to_dict()}, 200)
+    except Exception as e:
+        logging.exception(f"Error fetching job: {str(e)}")
+        return make_response({"msg": "Error fetching job"}, 500)
+    finally:
+        if db_session:
+            db_session.close()
+
+
+@jobs.route("/messages/<int:message_id>/transcript/status", methods=["GET"])
+def get_transcript_status(message_id):
+    """
+    Fetches the status of the latest transcription job of a message.
+
+    Path Parameters:
+    - message_id (required): The ID of the message.
+
+    Returns:
+    - 200: The latest job with its status (queued, running, done or failed) and timings in the "data" key.
+    - 404: If the message is not found or no transcription was ever requested for it.
+    - 500: If there is an error while fetching the job.
+
+    Example:
+    GET /messages/1/transcript/status
+    """
+    db_session = get_db_session()
+    try:
+        logging.info(request.url)
+
+        if not db_session.get(Message, message_id):
+            return make_response({"msg": "Message not found"}, 404)
+
+        job = (
+            db_session.query(TranscriptionJob)
+            .filter_by(message_id=message_id)
+            .order_by(TranscriptionJob.id.desc())
+            .first()
+        )
+        if not job:
+            return make_response({"msg": "No transcription job found for this message"}, 404)
+
+        return make_response({"data": job.to_dict()}, 200)
+    except Exception as e:
+        logging.exception(f"Error fetching transcript status: {str(e)}")
+        return make_response({"msg": "Error fetching transcript status"}, 500)
+    finally:
+        if db_session:
+            db_session.close()
+
+
+@thumbnails.route("/thumbnails/<digest>/<size>", methods=["GET"])
+def get_thumbnail(digest, size):
+    """
+    Serves a resized variant of a locally stored thumbnail image.
+
+    Thumbnails are fetched once when a message is created or its thumbnail URL changes, stored 
+    by content hash (the message's "thumbnail_hash") and resized to the THUMBNAIL_SIZES variants. 
+    WebP is served to clients that accept it, JPEG otherwise. As the content of a hash never 
+    changes, responses are cacheable indefinitely.
+
+    Path Parameters:
+    - digest (required): The thumbnail hash of the message.
+    - size (required): The variant name (small, medium or large by default).
+
+    Returns:
+    - 200: The image, with long-lived immutable cache headers.
+    - 404: If the image or the size is unknown.
+    - 500: If there is an error while reading or resizing the image.
+
+    Example:
+    GET /thumbnails/9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08/small
+    """
+    try:
+        fmt = "webp" if request.accept_mimetypes["image/webp"] else "jpeg"
+        path = variant_path(app.config.get('THUMBNAIL_DIR'), digest, size, parse_sizes(app.config.get('THUMBNAIL_SIZES')), fmt)
+        if not path:
+            return make_response({"msg": "Thumbnail not found"}, 404)
+
+        response = send_file(path, mimetype=FORMATS[fmt][1], max_age=31536000)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add("Accept")
+        return response
+    except Exception as e:
+        logging.exception(f"Error serving thumbnail: {str(e)}")
+        return make_response({"msg": "Error serving thumbnail"}, 500)
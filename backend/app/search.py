@@ -0,0 +1,219 @@
+"""Full-Text Search over Messages"""
+import re
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import DDL, event, inspect, select, text
+from sqlalchemy.orm import load_only, selectinload
+from app import db, logging
+from app.models import Message
+from app.transcripts import get_transcript_store
+
+
+# SQLite: contentless FTS5 virtual table whose rowid is the message id; it keeps only the index, so
+# transcripts stay compressed in the transcript store and snippets are built from the message
+# MySQL: InnoDB table with a FULLTEXT index, keyed by the message id (InnoDB indexes stored text only,
+# so this table does hold a copy of every transcript)
+SEARCH_TABLE = "message_fts"
+SEARCH_DDL = "CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5(title, description, transcript, content='')"
+
+event.listen(Message.__table__, "after_create", DDL(SEARCH_DDL).execute_if(dialect="sqlite"))
+event.listen(Message.__table__, "after_create", DDL(
+    "CREATE TABLE IF NOT EXISTS message_fts ("
+    "rowid INTEGER NOT NULL PRIMARY KEY, title VARCHAR(80), description LONGTEXT, transcript LONGTEXT, "
+    "FULLTEXT INDEX ix_message_fts_fulltext (title, description, transcript)"
+    ") ENGINE=InnoDB"
+).execute_if(dialect="mysql"))
+event.listen(Message.__table__, "before_drop", DDL("DROP TABLE IF EXISTS message_fts"))
+
+
+def include_object(object, name, type_, reflected, compare_to): #pylint:disable=redefined-builtin
+    """Keep the search table (and the FTS5 shadow tables) out of Alembic autogenerate"""
+    return not (type_ == "table" and reflected and compare_to is None and name.startswith(SEARCH_TABLE))
+
+
+# The transcript text lives in the transcript store; Message.transcript reads it back (the text just
+# written is kept on the instance, so indexing a new transcript doesn't read the store)
+
+@event.listens_for(Message, "after_insert")
+def _index_new_message(mapper, connection, target):
+    connection.execute(
+        text("INSERT INTO message_fts (rowid, title, description, transcript) "
+             "VALUES (:id, :title, :description, :transcript)"),
+        {"id": target.id, "title": target.title, "description": target.description, "transcript": target.transcript}
+    )
+
+
+def _indexed_values(connection, message_id):
+    """Values of a message as currently indexed (the stored row, before a flush changes it)"""
+    row = connection.execute(
+        text("SELECT title, description, transcript_ref FROM message WHERE id = :id"), {"id": message_id}
+    ).one()
+    transcript = get_transcript_store().get(row.transcript_ref) if row.transcript_ref else None
+    return {"title": row.title, "description": row.description, "transcript": transcript}
+
+
+def _unindex_fts5(connection, message_id, indexed):
+    # A contentless FTS5 row can only be removed with the 'delete' command and the values it was indexed with
+    connection.execute(
+        text("INSERT INTO message_fts (message_fts, rowid, title, description, transcript) "
+             "VALUES ('delete', :id, :title, :description, :transcript)"),
+        {"id": message_id, **indexed}
+    )
+
+
+@event.listens_for(Message, "before_update")
+def _reindex_message(mapper, connection, target):
+    # Only changed columns are read from the instance, so deferred columns (and stored transcripts) are never loaded here
+    state = inspect(target)
+    changed = {
+        column: getattr(target, column)
+        for column in ("title", "description")
+        if state.attrs[column].history.has_changes()
+    }
+    if state.attrs.transcript_ref.history.has_changes():
+        changed["transcript"] = target.transcript
+    if not changed:
+        return
+    if connection.dialect.name == "mysql":
+        assignments = ", ".join(f"{column} = :{column}" for column in changed)
+        connection.execute(text(f"UPDATE message_fts SET {assignments} WHERE rowid = :id"), {"id": target.id, **changed})
+        return
+    # Before the update, while the message row still holds the indexed values
+    indexed = _indexed_values(connection, target.id)
+    _unindex_fts5(connection, target.id, indexed)
+    connection.execute(
+        text("INSERT INTO message_fts (rowid, title, description, transcript) "
+             "VALUES (:id, :title, :description, :transcript)"),
+        {"id": target.id, **indexed, **changed}
+    )
+
+
+@event.listens_for(Message, "before_delete")
+def _unindex_message(mapper, connection, target):
+    if connection.dialect.name == "mysql":
+        connection.execute(text("DELETE FROM message_fts WHERE rowid = :id"), {"id": target.id})
+    else:
+        _unindex_fts5(connection, target.id, _indexed_values(connection, target.id))
+
+
+def rebuild_index(db_session, batch_size=500):
+    """Rebuild the search table from the message table and the transcript store
+    Args:
+        db_session (Session): DB Session
+        batch_size (int): Messages read and indexed at a time
+    Returns:
+        int: Number of messages indexed
+    """
+    if db_session.get_bind().dialect.name == "mysql":
+        db_session.execute(text("DELETE FROM message_fts"))
+    else:
+        db_session.execute(text("INSERT INTO message_fts (message_fts) VALUES ('delete-all')"))
+    messages = db_session.scalars(
+        select(Message).options(load_only(
+            Message.id, Message.title, Message.description, Message.transcript_ref, Message.transcript_length
+        )).order_by(Message.id).execution_options(yield_per=batch_size)
+    )
+    indexed = 0
+    for batch in messages.partitions():
+        db_session.execute(
+            text("INSERT INTO message_fts (rowid, title, description, transcript) "
+                 "VALUES (:id, :title, :description, :transcript)"),
+            [
+                {"id": message.id, "title": message.title, "description": message.description, "transcript": message.transcript}
+                for message in batch
+            ]
+        )
+        indexed += len(batch)
+    db_session.commit()
+    return indexed
+
+
+@click.command("search-reindex")
+@with_appcontext
+def search_reindex_command():
+    """Rebuild the full-text search index from the message table, and remove orphan transcript files."""
+    logging.info(f"Messages indexed for search: {rebuild_index(db.session)}")
+    refs = {ref for (ref,) in db.session.query(Message.transcript_ref).filter(Message.transcript_ref.isnot(None)).distinct()}
+    logging.info(f"Orphan transcript files removed: {get_transcript_store().sweep(refs)}")
+
+
+def _terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def _snippet(content, terms, words=12, start_mark="<b>", end_mark="</b>"):
+    """Words around the first matching term, with matching terms highlighted"""
+    tokens = (content or "").split()
+    first = next(
+        (i for i, token in enumerate(tokens) if any(term in _terms(token) for term in terms)),
+        None
+    )
+    if first is None:
+        return None
+    start = max(first - words // 2, 0)
+    window = [
+        f"{start_mark}{token}{end_mark}" if any(term in _terms(token) for term in terms) else token
+        for token in tokens[start:start + words]
+    ]
+    return ("…" if start else "") + " ".join(window) + ("…" if start + words < len(tokens) else "")
+
+
+def _load_messages(db_session, message_ids):
+    # The listing fields and tags of the hits, plus the transcript reference for snippets
+    fields = Message.DEFAULT_FIELDS
+    return {
+        message.id: message
+        for message in db_session.scalars(
+            select(Message)
+            .options(load_only(Message.id, Message.transcript_ref, *Message.columns(fields)), selectinload(Message.tags))
+            .where(Message.id.in_(message_ids))
+        )
+    }
+
+
+def _message_snippet(message, terms, transcript=None):
+    """Snippet of the first matching field, in the same order on every backend
+    The transcript is only read from the store when neither the title nor the description matches.
+    """
+    return (
+        _snippet(message.description, terms) or _snippet(message.title, terms)
+        or _snippet(transcript if transcript is not None else message.transcript, terms)
+    )
+
+
+def search_messages(db_session, query, limit):
+    """Ranked full-text search over message titles, descriptions and transcripts
+    Args:
+        db_session (Session): DB Session
+        query (str): Search terms (all terms must match)
+        limit (int): Maximum number of results
+    Returns:
+        list: (message, score, snippet) ordered by relevance, best first. The messages have their
+            DEFAULT_FIELDS and tags loaded.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    if db_session.get_bind().dialect.name == "mysql":
+        rows = db_session.execute(text(
+            "SELECT rowid, MATCH(title, description, transcript) AGAINST (:q IN BOOLEAN MODE) AS score, "
+            "transcript FROM message_fts "
+            "WHERE MATCH(title, description, transcript) AGAINST (:q IN BOOLEAN MODE) "
+            "ORDER BY score DESC LIMIT :limit"
+        ), {"q": " ".join(f"+{term}" for term in terms), "limit": limit}).all()
+        transcripts = {row.rowid: row.transcript for row in rows} # the search table's copy, no store read
+    else:
+        # FTS5: quote every term so user input can't inject query syntax; bm25() is lower for better matches.
+        # The table is contentless, so snippet() has nothing to read: snippets come from the messages instead
+        rows = db_session.execute(text(
+            "SELECT rowid, -bm25(message_fts) AS score "
+            "FROM message_fts WHERE message_fts MATCH :q ORDER BY bm25(message_fts) LIMIT :limit"
+        ), {"q": " ".join(f'"{term}"' for term in terms), "limit": limit}).all()
+        transcripts = {}
+    messages = _load_messages(db_session, [row.rowid for row in rows])
+    return [
+        (messages[row.rowid], float(row.score), _message_snippet(messages[row.rowid], terms, transcripts.get(row.rowid)))
+        for row in rows
+        if row.rowid in messages
+    ]
@@ -0,0 +1,132 @@
+"""Local Thumbnail Store"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+import warnings
+from PIL import Image, ImageOps
+
+
+# Variant formats: name -> (Pillow format, Content-Type, file extension)
+FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+ORIGINAL = "original"
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+# Largest image decoded, in pixels (about 8000 x 5000). Pillow only warns up to twice its own limit,
+# so larger images are rejected from their header below, before anything is decoded.
+MAX_PIXELS = 40_000_000
+Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+
+def parse_sizes(value):
+    """Parse variant sizes
+    Args:
+        value (str): Comma-separated "name:width" pairs, e.g. "small:320,medium:640"
+    Returns:
+        dict: Variant name -> maximum width and height in pixels
+    """
+    sizes = {}
+    for pair in value.split(","):
+        if pair.strip():
+            name, width = pair.split(":")
+            sizes[name.strip()] = int(width)
+    return sizes
+
+
+def is_digest(value):
+    return bool(_DIGEST.match(value))
+
+
+def _image_dir(root, digest):
+    # Two-level fan-out keeps directories small
+    return os.path.join(root, digest[:2], digest)
+
+
+def _write_atomic(path, data):
+    """Write through a temporary file and rename, so readers never see a partial file"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def has_image(root, digest):
+    return os.path.exists(os.path.join(_image_dir(root, digest), ORIGINAL))
+
+
+def _render_variant(original, width, fmt):
+    pil_format = FORMATS[fmt][0]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", Image.DecompressionBombWarning) # rejected just below
+        image = Image.open(io.BytesIO(original)) # reads the header only
+    with image:
+        if image.width * image.height > MAX_PIXELS:
+            raise Image.DecompressionBombError(f"Image of {image.width}x{image.height} pixels exceeds {MAX_PIXELS} pixels")
+        image.draft("RGB", (width, width)) # JPEG sources are decoded at a reduced scale
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        image.thumbnail((width, width), Image.Resampling.LANCZOS) # keeps the aspect ratio, never upscales
+        output = io.BytesIO()
+        image.save(output, pil_format, quality=80, **({"method": 4} if pil_format == "WEBP" else {"optimize": True}))
+        return output.getvalue()
+
+
+def store_image(root, data, sizes):
+    """Store an image by content and render its variants
+    Identical images share one directory, so re-storing a known image only renders missing variants.
+    Args:
+        root (str): Thumbnail directory
+        data (bytes): Original image
+        sizes (dict): Variant name -> maximum width and height in pixels
+    Returns:
+        str: SHA-256 digest of the image (raises PIL.UnidentifiedImageError if it can't be decoded,
+            PIL.Image.DecompressionBombError if it has more than MAX_PIXELS pixels)
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    image_dir = _image_dir(root, digest)
+    os.makedirs(image_dir, exist_ok=True)
+    for size, width in sizes.items():
+        for fmt, (_, _, extension) in FORMATS.items():
+            path = os.path.join(image_dir, f"{size}.{extension}")
+            if not os.path.exists(path):
+                _write_atomic(path, _render_variant(data, width, fmt))
+    # The original is written last: its presence marks a complete entry
+    original_path = os.path.join(image_dir, ORIGINAL)
+    if not os.path.exists(original_path):
+        _write_atomic(original_path, data)
+    return digest
+
+
+def variant_path(root, digest, size, sizes, fmt):
+    """Path of a stored variant, rendering it from the original if it is missing (e.g. a new size)
+    Args:
+        root (str): Thumbnail directory
+        digest (str): Image digest
+        size (str): Variant name
+        sizes (dict): Variant name -> maximum width and height in pixels
+        fmt (str): "webp" or "jpeg"
+    Returns:
+        str: Path of the variant file, or None if the image or the size is unknown
+    """
+    if not is_digest(digest) or size not in sizes or not has_image(root, digest):
+        return None
+    image_dir = _image_dir(root, digest)
+    path = os.path.join(image_dir, f"{size}.{FORMATS[fmt][2]}")
+    if not os.path.exists(path):
+        with open(os.path.join(image_dir, ORIGINAL), "rb") as f:
+            _write_atomic(path, _render_variant(f.read(), sizes[size], fmt))
+    return path
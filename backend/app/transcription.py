@@ -0,0 +1,404 @@
+"""Video Transcription"""
+import os
+import multiprocessing
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from flask import json, current_app
+import ffmpeg
+from vosk import Model, KaldiRecognizer
+from app import logging
+from app.http_client import get_session, settings as http_settings
+
+
+SAMPLE_RATE = 16000
+
+# Vosk model registry: one model per process, shared by every recognizer
+_model = None
+_model_lock = threading.Lock()
+_model_stats = {
+    "path": None,
+    "load_seconds": None,
+    "rss_bytes": None,
+    "rss_delta_bytes": None,
+    "recognizers_created": 0,
+}
+
+
+def _rss_bytes():
+    """Current resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 # peak RSS, in KB on Linux
+
+
+def get_model(model_path):
+    """Get the Vosk model, loading it on first use
+    Args:
+        model_path (str): Path to the Vosk model directory
+    Returns:
+        Model: Vosk model shared by this process
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                logging.info(f"Loading Vosk model: {model_path}")
+                rss_before = _rss_bytes()
+                start = time.perf_counter()
+                _model = Model(model_path)
+                _model_stats["path"] = model_path
+                _model_stats["load_seconds"] = round(time.perf_counter() - start, 3)
+                _model_stats["rss_bytes"] = _rss_bytes()
+                _model_stats["rss_delta_bytes"] = _model_stats["rss_bytes"] - rss_before
+                logging.info(
+                    f"Vosk model loaded in {_model_stats['load_seconds']}s, "
+                    f"RSS +{_model_stats['rss_delta_bytes'] // (1024 * 1024)} MB"
+                )
+    return _model
+
+
+def create_recognizer(model_path, sample_rate=SAMPLE_RATE):
+    """Create a recognizer for one transcription on the shared model
+    Args:
+        model_path (str): Path to the Vosk model directory
+        sample_rate (int): Sample rate of the audio fed to the recognizer
+    Returns:
+        KaldiRecognizer: New recognizer
+    """
+    recognizer = KaldiRecognizer(get_model(model_path), sample_rate)
+    _model_stats["recognizers_created"] += 1
+    return recognizer
+
+
+def model_stats():
+    """Vosk model load time and memory for logs and metrics
+    Returns:
+        dict: Model statistics of this process
+    """
+    return {"loaded": _model is not None, **_model_stats}
+
+
+def _recognize(recognizer, chunks):
+    """Feed 16-bit mono PCM chunks to a recognizer
+    Args:
+        recognizer (KaldiRecognizer): Recognizer for this transcription
+        chunks (iterable): PCM byte chunks
+    Returns:
+        str: Transcript
+    """
+    texts = []
+    for data in chunks:
+        if recognizer.AcceptWaveform(data):
+            texts.append(json.loads(recognizer.Result())["text"])
+    texts.append(json.loads(recognizer.FinalResult())["text"])
+    return " ".join(text for text in texts if text)
+
+
+@contextmanager
+def _stage(profile, name):
+    """Add the wall time of a block to profile["<name>_seconds"]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile[f"{name}_seconds"] = round(profile.get(f"{name}_seconds", 0) + time.perf_counter() - start, 3)
+
+
+def transcribe_video(video_url, model_path=None, mode=None, profile=None):
+    """Transcribes a video file to text using Vosk
+    Args:
+        video_url (str): URL of the video
+        model_path (str): Path to the Vosk model directory (VOSK_MODEL_PATH by default)
+        mode (str): "file", "stream" or "parallel" (TRANSCRIPTION_MODE by default)
+        profile (dict): Filled with the mode, the wall time of each stage (download, extract,
+            recognize and the whole transcription), the bytes downloaded, the audio duration and
+            the real-time factor (transcription time / audio duration), also for failed transcriptions.
+            In stream mode the stages overlap, so extraction is not timed separately, and the mode is
+            recorded with its source ("stream:pipe" or "stream:url"). With the "url" source ffmpeg
+            downloads the video itself, so neither the bytes nor the download time are known: only
+            the whole pipeline (recognize), the audio duration and the real-time factor are recorded.
+    Returns:
+        str: Transcript, or None if the transcription failed
+    """
+    model_path = model_path or current_app.config.get('VOSK_MODEL_PATH')
+    mode = mode or current_app.config.get('TRANSCRIPTION_MODE')
+    profile = {} if profile is None else profile
+    profile["mode"] = mode
+    try:
+        with _stage(profile, "transcribe"):
+            if mode == "stream":
+                source = current_app.config.get('TRANSCRIPTION_STREAM_SOURCE')
+                profile["mode"] = f"stream:{source}"
+                return _transcribe_stream(video_url, model_path, source, profile)
+            if mode == "parallel":
+                return _transcribe_file(video_url, model_path, lambda audio_file: _recognize_parallel(
+                    audio_file,
+                    model_path,
+                    int(current_app.config.get('TRANSCRIPTION_PARALLELISM')),
+                    float(current_app.config.get('TRANSCRIPTION_SEGMENT_SECONDS')),
+                    float(current_app.config.get('TRANSCRIPTION_SEGMENT_OVERLAP_SECONDS'))
+                ), profile)
+            return _transcribe_file(video_url, model_path, profile=profile)
+    finally:
+        if profile.get("audio_seconds"):
+            profile["real_time_factor"] = round(profile["transcribe_seconds"] / profile["audio_seconds"], 3)
+        logging.info(f"Transcription profile: {profile}")
+
+
+def _transcribe_stream(video_url, model_path, source="pipe", profile=None):
+    """Transcribe without temporary files: video -> ffmpeg -> PCM -> recognizer
+    With the "pipe" source the HTTP response body is written to ffmpeg's stdin while
+    recognition consumes its stdout, so recognition starts before the download finishes.
+    The "url" source lets ffmpeg fetch the video itself, which also handles MP4 files
+    whose index (moov atom) is at the end and needs seeking.
+    """
+    profile = {} if profile is None else profile
+    process = None
+    feeder = None
+    started = time.perf_counter()
+    try:
+        output_args = dict(format='s16le', acodec='pcm_s16le', ac=1, ar=str(SAMPLE_RATE))
+        if source == "url":
+            logging.info("Streaming video to transcribe from URL...")
+            # rw_timeout (microseconds) gives ffmpeg's own HTTP reads the shared client's read timeout
+            rw_timeout = int(http_settings["read_timeout"] * 1000000)
+            process = ffmpeg.input(video_url, rw_timeout=rw_timeout).output('pipe:', **output_args).run_async(pipe_stdout=True)
+        else:
+            logging.info("Streaming video to transcribe through ffmpeg...")
+            video_response = get_session().get(video_url, stream=True)
+            if video_response.status_code != 200:
+                video_response.close()
+                raise Exception("Failed to download the video file")
+            process = ffmpeg.input('pipe:').output('pipe:', **output_args).run_async(pipe_stdin=True, pipe_stdout=True)
+
+            def feed():
+                downloaded = 0
+                try:
+                    for chunk in video_response.iter_content(chunk_size=64 * 1024):
+                        if chunk:
+                            process.stdin.write(chunk)
+                            downloaded += len(chunk)
+                except (BrokenPipeError, ValueError):
+                    pass # ffmpeg exited early, its return code reports why
+                finally:
+                    profile["bytes_downloaded"] = downloaded
+                    profile["download_seconds"] = round(time.perf_counter() - started, 3)
+                    video_response.close()
+                    try:
+                        process.stdin.close()
+                    except BrokenPipeError:
+                        pass
+
+            feeder = threading.Thread(target=feed, name="transcribe-feeder", daemon=True)
+            feeder.start()
+
+        logging.info("Generating transcript from the audio stream...")
+        pcm_bytes = 0
+
+        def pcm_chunks():
+            nonlocal pcm_bytes
+            for data in iter(lambda: process.stdout.read(8000), b""):
+                pcm_bytes += len(data)
+                yield data
+
+        # Recognition runs alongside the download and the decoding, so it is timed from the start
+        with _stage(profile, "recognize"):
+            rec = create_recognizer(model_path)
+            transcript = _recognize(rec, pcm_chunks())
+        profile["audio_seconds"] = round(pcm_bytes / (2 * SAMPLE_RATE), 3) # 16-bit mono
+
+        if process.wait() != 0:
+            raise Exception(f"ffmpeg exited with code {process.returncode}")
+        return transcript.strip()
+
+    except Exception as e:
+        logging.exception(f"Error transcribing video: {e}")
+        return None
+
+    finally:
+        if process and process.poll() is None:
+            process.kill()
+            process.wait()
+        if feeder:
+            feeder.join()
+
+
+def _transcribe_file(video_url, model_path, recognize=None, profile=None):
+    """Transcribe through temporary video and WAV files
+    Args:
+        video_url (str): URL of the video
+        model_path (str): Path to the Vosk model directory
+        recognize (callable): Turns the WAV file path into a transcript (sequential by default)
+        profile (dict): Filled with the stage timings and sizes (see `transcribe_video`)
+    """
+    profile = {} if profile is None else profile
+
+    temp_dir = tempfile.mkdtemp(prefix="transcribe-")
+    video_file = os.path.join(temp_dir, "video.mp4")
+    audio_file = os.path.join(temp_dir, "audio.wav")
+
+    try:
+        # Download the video
+        logging.info("Downloading video to transcribe...")
+        with _stage(profile, "download"), get_session().get(video_url, stream=True) as video_response:
+            if video_response.status_code != 200:
+                raise Exception("Failed to download the video file")
+
+            # Save the video content to temporary file
+            logging.info("Creating temporary video file...")
+            profile["bytes_downloaded"] = 0
+            with open(video_file, "wb") as f:
+                for chunk in video_response.iter_content(chunk_size=64 * 1024):
+                    if chunk:
+                        f.write(chunk)
+                        profile["bytes_downloaded"] += len(chunk)
+
+        # Extract audio from the video (converts to WAV format)
+        logging.info("Extracting audio from the video file...")
+        with _stage(profile, "extract"):
+            ffmpeg.input(video_file).output(audio_file, format='wav', ac=1, ar=str(SAMPLE_RATE)).run()
+        with wave.open(audio_file, "rb") as wf:
+            profile["audio_seconds"] = round(wf.getnframes() / wf.getframerate(), 3)
+
+        # Perform transcription with the shared Vosk model
+        logging.info("Generating transcript from the audio file...")
+        with _stage(profile, "recognize"):
+            if recognize:
+                transcript = recognize(audio_file)
+            else:
+                with wave.open(audio_file, "rb") as wf:
+                    rec = create_recognizer(model_path, wf.getframerate())
+                    transcript = _recognize(rec, iter(lambda: wf.readframes(4000), b""))
+
+        return transcript.strip()
+
+    except Exception as e:
+        logging.exception(f"Error transcribing video: {e}")
+        return None
+
+    finally:
+        # Cleanup temporary files
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        logging.info("Temporary files removed.")
+
+
+def _find_silence(wf, start, end, window):
+    """Frame offset of the quietest window between two frame offsets of a 16-bit mono WAV"""
+    wf.setpos(start)
+    samples = array('h', wf.readframes(end - start))
+    if len(samples) < window:
+        return start + len(samples) // 2
+    quietest, quietest_energy = 0, None
+    for offset in range(0, len(samples) - window + 1, window):
+        energy = sum(abs(sample) for sample in samples[offset:offset + window])
+        if quietest_energy is None or energy < quietest_energy:
+            quietest, quietest_energy = offset, energy
+    return start + quietest + window // 2
+
+
+def plan_segments(total_frames, sample_rate, segment_seconds, overlap_seconds, find_silence=None):
+    """Split audio into segments cut at (preferably silent) boundaries
+    Each segment owns the frames [start, end) and is recognized over [start - overlap, end + overlap),
+    so words crossing a boundary are heard whole by at least one segment.
+    Args:
+        total_frames (int): Length of the audio in frames
+        sample_rate (int): Frames per second
+        segment_seconds (float): Target segment length
+        overlap_seconds (float): Audio added on each side of a segment
+        find_silence (callable): (start, end) -> quietest frame, used to move each boundary
+    Returns:
+        list: (start, end, read_start, read_end) frame offsets per segment
+    """
+    segment_frames = max(int(segment_seconds * sample_rate), 1)
+    overlap_frames = int(overlap_seconds * sample_rate)
+    boundaries = [0]
+    nominal = segment_frames
+    while nominal < total_frames - overlap_frames:
+        boundary = nominal
+        if find_silence and overlap_frames:
+            boundary = find_silence(
+                max(nominal - overlap_frames, boundaries[-1] + 1),
+                min(nominal + overlap_frames, total_frames)
+            )
+        boundaries.append(boundary)
+        nominal = boundary + segment_frames
+    boundaries.append(total_frames)
+    return [
+        (start, end, max(start - overlap_frames, 0), min(end + overlap_frames, total_frames))
+        for start, end in zip(boundaries, boundaries[1:])
+    ]
+
+
+def _recognize_segment(audio_file, model_path, start, end, read_start, read_end):
+    """Recognize one segment of a WAV file (runs in a pool process)
+    Returns:
+        list: (start time, word) of the words whose midpoint falls inside [start, end)
+    """
+    with wave.open(audio_file, "rb") as wf:
+        sample_rate = wf.getframerate()
+        rec = create_recognizer(model_path, sample_rate)
+        rec.SetWords(True)
+        wf.setpos(read_start)
+        remaining = read_end - read_start
+        words = []
+
+        def collect(result):
+            for word in json.loads(result).get("result", []):
+                midpoint = read_start / sample_rate + (word["start"] + word["end"]) / 2
+                if start / sample_rate <= midpoint < end / sample_rate:
+                    words.append((read_start / sample_rate + word["start"], word["word"]))
+
+        while remaining > 0:
+            data = wf.readframes(min(4000, remaining))
+            if not data:
+                break
+            remaining -= len(data) // wf.getsampwidth()
+            if rec.AcceptWaveform(data):
+                collect(rec.Result())
+        collect(rec.FinalResult())
+    return words
+
+
+def stitch_segments(segments):
+    """Join per-segment words in order
+    Overlapping audio is recognized twice, but each word is kept only by the segment
+    that owns its midpoint, so no de-duplication by text is needed.
+    Args:
+        segments (list): Per segment lists of (start time, word), in segment order
+    Returns:
+        str: Transcript
+    """
+    words = sorted((word for segment in segments for word in segment), key=lambda word: word[0])
+    return " ".join(text for _, text in words)
+
+
+def _recognize_parallel(audio_file, model_path, parallelism, segment_seconds, overlap_seconds):
+    """Recognize a WAV file in segments across a process pool
+    Pool processes are forked where possible, so they share the already loaded model pages.
+    """
+    with wave.open(audio_file, "rb") as wf:
+        sample_rate = wf.getframerate()
+        segments = plan_segments(
+            wf.getnframes(), sample_rate, segment_seconds, overlap_seconds,
+            lambda start, end: _find_silence(wf, start, end, sample_rate // 50) # 20 ms windows
+        )
+    logging.info(f"Recognizing {len(segments)} segments with {parallelism} processes...")
+    if len(segments) == 1 or parallelism <= 1:
+        results = [_recognize_segment(audio_file, model_path, *segment) for segment in segments]
+        return stitch_segments(results)
+
+    get_model(model_path) # load before forking so the pool shares it
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    with ProcessPoolExecutor(max_workers=min(parallelism, len(segments)), mp_context=context) as pool:
+        futures = [pool.submit(_recognize_segment, audio_file, model_path, *segment) for segment in segments]
+        return stitch_segments([future.result() for future in futures])
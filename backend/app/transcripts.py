@@ -0,0 +1,142 @@
+"""Out-of-Row Transcript Store"""
+import codecs
+import hashlib
+import os
+import tempfile
+import time
+import zlib
+from flask import current_app
+
+try:
+    import zstandard # optional, for the "zstd" codec
+except ImportError:
+    zstandard = None
+
+
+class FileTranscriptStore:
+    """Content-addressed, compressed transcript files on local disk
+    A transcript is stored once per distinct text under its SHA-256, compressed with zlib
+    (or zstd when the zstandard package is installed). Its reference, "<codec>:<sha256>",
+    names the codec it was written with, so changing the codec keeps older files readable.
+    Files are written before the session that references them commits, so a rolled back write
+    leaves an orphan file; `sweep` (run by `flask search-reindex`) removes them.
+    """
+
+    CODECS = ("zlib", "zstd")
+    EXTENSIONS = {"zlib": "z", "zstd": "zst"}
+
+    def __init__(self, root, codec="zlib", level=6):
+        if codec not in self.CODECS:
+            raise ValueError(f"Unknown transcript codec: {codec}")
+        if codec == "zstd" and zstandard is None:
+            raise RuntimeError("The zstd transcript codec requires the zstandard package")
+        self.root = root
+        self.codec = codec
+        self.level = level
+
+    def _path(self, codec, digest):
+        return os.path.join(self.root, digest[:2], f"{digest}.{self.EXTENSIONS[codec]}")
+
+    def _parse(self, ref):
+        codec, _, digest = ref.partition(":")
+        if codec not in self.CODECS or len(digest) != 64:
+            raise ValueError(f"Invalid transcript reference: {ref}")
+        return codec, digest
+
+    def put(self, text):
+        """Store a transcript
+        Args:
+            text (str): Transcript
+        Returns:
+            tuple: (reference, length in characters, SHA-256 of the UTF-8 text)
+        """
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(self.codec, digest)
+        if not os.path.exists(path): # identical transcripts share one file
+            if self.codec == "zstd":
+                compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+            else:
+                compressed = zlib.compress(data, self.level)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(compressed)
+                os.replace(temp_path, path) # readers never see a partial file
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        return f"{self.codec}:{digest}", len(text), digest
+
+    def iter_text(self, ref, chunk_size=64 * 1024):
+        """Decompress a transcript incrementally
+        Args:
+            ref (str): Transcript reference
+            chunk_size (int): Compressed bytes read at a time
+        Returns:
+            generator: Text chunks
+        """
+        codec, digest = self._parse(ref)
+        with open(self._path(codec, digest), "rb") as f:
+            if codec == "zstd":
+                reader = zstandard.ZstdDecompressor().stream_reader(f)
+                chunks = iter(lambda: reader.read(chunk_size), b"")
+            else:
+                decompressor = zlib.decompressobj()
+                chunks = (decompressor.decompress(chunk) for chunk in iter(lambda: f.read(chunk_size), b""))
+            decoder = codecs.getincrementaldecoder("utf-8")() # characters may be split across chunks
+            for chunk in chunks:
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            text = decoder.decode(b"", final=True)
+            if text:
+                yield text
+
+    def sweep(self, refs, min_age=3600):
+        """Remove the files no reference points to
+        Args:
+            refs (set): References still in use
+            min_age (int): Seconds a file is kept regardless, so a transcript whose row is not
+                committed yet is not removed
+        Returns:
+            int: Number of files removed
+        """
+        kept = {self._path(*self._parse(ref)) for ref in refs}
+        cutoff = time.time() - min_age
+        removed = 0
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                if path not in kept and os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    removed += 1
+        return removed
+
+    def get(self, ref):
+        """Args:
+            ref (str): Transcript reference
+        Returns:
+            str: Transcript
+        """
+        return "".join(self.iter_text(ref))
+
+
+STORES = {
+    "file": lambda config: FileTranscriptStore(
+        config.get('TRANSCRIPT_DIR'), config.get('TRANSCRIPT_CODEC'), int(config.get('TRANSCRIPT_COMPRESSION_LEVEL'))
+    ),
+}
+
+
+def get_transcript_store():
+    """Transcript store of the current app, created from TRANSCRIPT_STORE on first use
+    Returns:
+        FileTranscriptStore: Store with put(text), get(ref) and iter_text(ref)
+    """
+    store = current_app.extensions.get('transcript_store')
+    if store is None:
+        store = STORES[current_app.config.get('TRANSCRIPT_STORE')](current_app.config)
+        current_app.extensions['transcript_store'] = store
+    return store
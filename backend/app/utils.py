@@ -1,75 +1,73 @@
-import os
-import wave
-from flask import json
-import requests
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import ffmpeg
-from vosk import Model, KaldiRecognizer
-from app import logging
+from urllib.parse import urlparse
+from flask import Response, json, stream_with_context
+from app import db
+from app.replicas import get_read_session
 
 
-def create_db_session(uri):
-    """Create DB Session
+def get_db_session(read_only=False):
+    """Get DB Session
+    The engine (and its connection pool) is created once per process by `db.init_app`
+    using `SQLALCHEMY_ENGINE_OPTIONS`; the session is scoped to the current request and
+    removed by Flask-SQLAlchemy's app context teardown hook.
     Args:
-        uri (str): SQLAlchemy URI
+        read_only (bool): The request only reads, so it may be served by a read replica
     Returns:
-        Session: DB Session
+        Session: Request-scoped DB Session
     """
-    engine = create_engine(uri, pool_pre_ping=True, pool_recycle=280)
-    Session = sessionmaker(bind=engine, autocommit=False) #pylint:disable=invalid-name
-    return Session()
+    if read_only:
+        return get_read_session()
+    return db.session
 
-def transcribe_video(video_url):
-    """Transcribes a video file to text using Vosk"""
 
-    video_file = os.path.join(os.getcwd(), "app/toolkit/temp_video.mp4")
-    audio_file = os.path.join(os.getcwd(), "app/toolkit/temp_audio.wav")
-    model_file = os.path.join(os.getcwd(), "app/toolkit/vosk-model-en-us-0.22")
+def is_valid_url(url):
+    """Whether a URL has both a scheme and a host (nothing is fetched)"""
+    parsed_url = urlparse(url)
+    return all([parsed_url.scheme, parsed_url.netloc])
 
-    try:
-        # Download the video
-        logging.info("Downloading video to transcribe...")
-        video_response = requests.get(video_url, stream=True)
-        if video_response.status_code != 200:
-            raise Exception("Failed to download the video file")
-        
-        # Save the video content to temporary file
-        logging.info("Creating temporary video file...")
-        with open(video_file, "wb") as f:
-            for chunk in video_response.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
 
-        # Extract audio from the video (converts to WAV format)
-        logging.info("Extracting audio from the video file...")
-        ffmpeg.input(video_file).output(audio_file, format='wav', ac=1, ar='16000').run()
+def get_stream_format(args, accept):
+    """Streaming format requested by a listing request
+    Args:
+        args (MultiDict): Query parameters, "stream" may be "json" or "ndjson"
+        accept (MIMEAccept): Accept header, "application/x-ndjson" selects "ndjson"
+    Returns:
+        str: "json", "ndjson" or None for a regular response (raises ValueError for other values)
+    """
+    stream = args.get("stream")
+    if stream is None and accept.best == "application/x-ndjson":
+        stream = "ndjson"
+    if stream not in (None, "json", "ndjson"):
+        raise ValueError("stream must be json or ndjson")
+    return stream
 
-        # Load Vosk model and perform transcription
-        logging.info("Generating transcript from the audio file...")
-        model = Model(model_file)
-        wf = wave.open(audio_file, "rb")
-        rec = KaldiRecognizer(model, wf.getframerate())
-        
-        transcript = ""
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0:
-                break
-            if rec.AcceptWaveform(data):
-                result = json.loads(rec.Result())
-                transcript += result["text"] + " "
 
-        return transcript.strip()
-    
-    except Exception as e:
-        logging.exception(f"Error transcribing video: {e}")
-        return None
+def stream_query(db_session, qry, serialize, stream_format, batch_size=500):
+    """Stream query results as they are fetched
+    Rows are fetched in batches with `yield_per` and written as soon as they are serialized,
+    so memory stays flat whatever the number of rows.
+    Args:
+        db_session (Session): DB Session, closed when the stream ends
+        qry (Query): Query to stream
+        serialize (callable): Turns a row into a JSON-serializable dict
+        stream_format (str): "json" for a chunked {"data": [...]} body, "ndjson" for one row per line
+        batch_size (int): Rows fetched per round-trip
+    Returns:
+        Response: Streamed response
+    """
+    def generate():
+        try:
+            if stream_format == "ndjson":
+                for record in qry.yield_per(batch_size):
+                    yield json.dumps(serialize(record)) + "\n"
+            else:
+                yield '{"data": ['
+                separator = ""
+                for record in qry.yield_per(batch_size):
+                    yield separator + json.dumps(serialize(record))
+                    separator = ","
+                yield "]}"
+        finally:
+            db_session.close()
 
-    finally:
-        # Cleanup temporary files
-        if os.path.exists(video_file):
-            os.remove(video_file)
-        if os.path.exists(audio_file):
-            os.remove(audio_file)
-        logging.info("Temporary files removed.")
+    mimetype = "application/x-ndjson" if stream_format == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
@@ -0,0 +1 @@
+"""API Benchmarks (see benchmarks/run.py)"""
@@ -0,0 +1,316 @@
+"""API Benchmark Runner
+
+Seeds a synthetic dataset (see benchmarks/seed.py), runs fixed request scenarios against the
+app in-process and over HTTP with concurrent clients, and reports throughput, latency
+percentiles and SQL statements per request as JSON, to compare across commits.
+
+    cd backend
+    python -m benchmarks.run --messages 10000 --output before.json
+    python -m benchmarks.run --messages 10000 --output after.json --baseline before.json
+
+The dataset is seeded once per --data-dir and reused by later runs with the same directory. Runs
+never write to it: every run (mode) starts from a fresh scratch copy of the seeded database, so
+the write scenarios don't change the dataset the next run measures (the write scenarios store no
+transcripts, so the transcript directory is shared). With --url the server's own database is used.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import requests
+from sqlalchemy import event
+from werkzeug.serving import make_server
+from app import create_app, db
+from benchmarks.seed import is_seeded, seed
+
+
+class Scenario:
+    """A named request, built per call so writes don't repeat (unique titles, random ids)"""
+
+    def __init__(self, name, method, build):
+        self.name = name
+        self.method = method
+        self.build = build # (rng, counter) -> (path, JSON body or None)
+
+
+def scenarios(messages, tags):
+    """The fixed scenarios, for a dataset of the given size"""
+    def message_id(rng):
+        return rng.randint(1, messages)
+
+    def tag_names(rng, k=2):
+        return [f"tag{rng.randint(1, min(tags, 20))}" for _ in range(k)]
+
+    return [
+        Scenario("messages_page", "GET", lambda rng, n: ("/messages?limit=20", None)),
+        Scenario("messages_deep_page", "GET", lambda rng, n: (f"/messages?limit=20&after={message_id(rng)}", None)),
+        Scenario("messages_by_id", "GET", lambda rng, n: (f"/messages?id={message_id(rng)},{message_id(rng)}", None)),
+        Scenario("messages_by_title", "GET", lambda rng, n: (f"/messages?title=Message {message_id(rng)}", None)),
+        Scenario("messages_by_tag", "GET", lambda rng, n: (f"/messages?limit=20&tag={','.join(tag_names(rng))}", None)),
+        Scenario("messages_fields", "GET", lambda rng, n: ("/messages?limit=20&fields=id,title,tags", None)),
+        Scenario("messages_facets", "GET", lambda rng, n: (f"/messages?limit=20&tag={tag_names(rng, 1)[0]}&facets=tags", None)),
+        Scenario("search", "GET", lambda rng, n: ("/messages/search?q=water people", None)),
+        Scenario("tags", "GET", lambda rng, n: ("/tags", None)),
+        Scenario("tag_messages", "GET", lambda rng, n: (f"/tags/{rng.randint(1, tags)}/messages?limit=20", None)),
+        Scenario("add_message", "POST", lambda rng, n: ("/messages", {
+            "title": f"Benchmark {uuid.uuid4().hex[:12]} {n}", "description": "Added by the benchmark", "tags": tag_names(rng),
+        })),
+        Scenario("update_message", "PUT", lambda rng, n: (f"/messages?id={message_id(rng)}", {
+            "description": f"Updated by the benchmark {n}", "tags": tag_names(rng),
+        })),
+        Scenario("link_message_tags", "POST", lambda rng, n: ("/message_tags", {
+            "message_ids": [message_id(rng) for _ in range(10)], "tag_ids": [rng.randint(1, tags) for _ in range(3)],
+        })),
+    ]
+
+
+class QueryCounter:
+    """Counts the SQL statements executed by the app's engines"""
+
+    def __init__(self, engines):
+        self.engines = engines
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _increment(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._increment)
+        return self
+
+    def __exit__(self, *exc_info):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._increment)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))]
+
+
+def run_scenario(scenario, send, requests_count, concurrency, counter, seed_value):
+    """Send a scenario's requests from concurrent clients
+    Args:
+        scenario (Scenario): Scenario
+        send (callable): (method, path, body) -> HTTP status code
+        requests_count (int): Requests in total
+        concurrency (int): Concurrent clients
+        counter (QueryCounter): Statement counter, or None when the server is not in this process
+        seed_value (int): Random seed
+    Returns:
+        dict: Result of the scenario
+    """
+    rng = random.Random(seed_value)
+    calls = [scenario.build(rng, n) for n in range(requests_count)] # built up front, off the clock
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    numbers = itertools.count()
+
+    def worker():
+        nonlocal errors
+        while (n := next(numbers)) < requests_count:
+            path, body = calls[n]
+            start = time.perf_counter()
+            try:
+                status = send(scenario.method, path, body)
+            except requests.RequestException:
+                status = None
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if status is None or status >= 400:
+                    errors += 1
+
+    queries_before = counter.count if counter else 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    duration = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests_count / duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries_per_request": round((counter.count - queries_before) / requests_count, 2) if counter else None,
+    }
+
+
+def in_process_sender(app):
+    """Requests through the Flask test client (no network, one client per thread)"""
+    local = threading.local()
+
+    def send(method, path, body):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        return local.client.open(path, method=method, json=body).status_code
+    return send
+
+
+def http_sender(base_url, concurrency):
+    """Requests over HTTP through one pooled session"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def send(method, path, body):
+        return session.request(method, base_url + path, json=body, timeout=60).status_code
+    return send
+
+
+def copy_database(source, target):
+    """Copy a SQLite database with the backup API (consistent even with open connections or a WAL)"""
+    with closing(sqlite3.connect(source)) as source_db, closing(sqlite3.connect(target)) as target_db:
+        source_db.backup(target_db)
+
+
+def restore_dataset(seeded_path, scratch_path, engines):
+    """Reset the scratch database to the seeded dataset, before a run"""
+    for engine in engines:
+        engine.dispose() # no pooled connection keeps the replaced database open
+    copy_database(seeded_path, scratch_path)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, report):
+    """Print the change of each result against a baseline report"""
+    previous = {(result["mode"], result["scenario"]): result for result in baseline["results"]}
+    print(f"{'mode':10} {'scenario':20} {'rps':>16} {'p95 ms':>18} {'queries':>10}")
+    for result in report["results"]:
+        before = previous.get((result["mode"], result["scenario"]))
+        if not before:
+            continue
+        change = (result["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100 if before["throughput_rps"] else 0
+        print(
+            f"{result['mode']:10} {result['scenario']:20} "
+            f"{before['throughput_rps']:>7} {change:>+7.1f}% "
+            f"{before['p95_ms']:>8} → {result['p95_ms']:<7} "
+            f"{before['queries_per_request'] or '-':>4} → {result['queries_per_request'] or '-'}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--messages", type=int, default=10000, help="Messages in the dataset (e.g. 10000, 100000, 1000000)")
+    parser.add_argument("--tags", type=int, default=200, help="Tags in the dataset")
+    parser.add_argument("--transcript-ratio", type=float, default=0.1, help="Share of the messages with a transcript")
+    parser.add_argument("--transcript-words", type=int, default=5000, help="Words per transcript")
+    parser.add_argument("--data-dir", default=None, help="Dataset directory, reused when already seeded and never written by the runs (temporary by default)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients over HTTP")
+    parser.add_argument("--mode", choices=("in-process", "http", "both"), default="both")
+    parser.add_argument("--url", default=None, help="Benchmark a running server instead (HTTP only, no query counts)")
+    parser.add_argument("--scenario", action="append", help="Only run these scenarios (repeatable)")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the dataset and the requests")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file (stdout by default)")
+    parser.add_argument("--baseline", default=None, help="JSON report of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="cms-bench-")
+    os.makedirs(data_dir, exist_ok=True)
+    seeded_path = os.path.join(os.path.abspath(data_dir), "bench.db")
+    scratch_dir = tempfile.mkdtemp(prefix="cms-bench-run-")
+    scratch_path = os.path.join(scratch_dir, "bench.db")
+    if os.path.exists(seeded_path):
+        copy_database(seeded_path, scratch_path)
+    app = create_app(config_type="default", config={
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{scratch_path}",
+        "TRANSCRIPT_DIR": os.path.join(data_dir, "transcripts"),
+        "RESPONSE_CACHE_ENABLED": args.cache,
+        "THUMBNAIL_STORE_ENABLED": False,
+    })
+    for logger in (logging.getLogger(), logging.getLogger("werkzeug")):
+        logger.setLevel(logging.WARNING) # the per-request INFO logs would dominate the timings
+
+    dataset = None
+    with app.app_context():
+        db.create_all()
+        if not is_seeded(db.session):
+            start = time.perf_counter()
+            dataset = seed(
+                db.session, args.messages, tags=args.tags, transcript_ratio=args.transcript_ratio,
+                transcript_words=args.transcript_words, seed_value=args.seed
+            )
+            dataset["seconds"] = round(time.perf_counter() - start, 1)
+            db.engine.dispose()
+            copy_database(scratch_path, seeded_path) # seeded in the scratch copy, kept for later runs
+        engines = [db.engine] + list(getattr(app.extensions.get("replicas"), "engines", []))
+
+    selected = [s for s in scenarios(args.messages, args.tags) if not args.scenario or s.name in args.scenario]
+    report = {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "dataset": {"messages": args.messages, "tags": args.tags, "data_dir": data_dir, "seeded": dataset},
+        "results": [],
+    }
+
+    counter = QueryCounter(engines)
+    server = None
+    with counter:
+        runs = []
+        if args.url:
+            runs.append(("http", http_sender(args.url.rstrip("/"), args.concurrency), args.concurrency, None))
+        else:
+            if args.mode in ("in-process", "both"):
+                runs.append(("in-process", in_process_sender(app), 1, counter))
+            if args.mode in ("http", "both"):
+                server = make_server("127.0.0.1", 0, app, threaded=True)
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                runs.append(("http", http_sender(f"http://127.0.0.1:{server.server_port}", args.concurrency), args.concurrency, counter))
+        for mode, send, concurrency, mode_counter in runs:
+            if not args.url:
+                restore_dataset(seeded_path, scratch_path, engines)
+            for scenario in selected:
+                result = run_scenario(scenario, send, args.requests, concurrency, mode_counter, args.seed)
+                report["results"].append({"mode": mode, **result})
+    if server:
+        server.shutdown()
+    for engine in engines:
+        engine.dispose()
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            compare(json.load(file), report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
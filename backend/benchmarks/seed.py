@@ -0,0 +1,76 @@
+"""Synthetic Benchmark Dataset"""
+import random
+from sqlalchemy import insert
+from app.cache import bump_data_version
+from app.models import Message, Tag, message_tags
+from app.search import rebuild_index
+from app.transcripts import get_transcript_store
+
+
+WORDS = (
+    "the of and to in is you that it he was for on are as with his they at be this have from or one had by word "
+    "but not what all were we when your can said there use an each which she do how their if will up other about "
+    "out many then them these so some her would make like him into time has look two more write go see number no "
+    "way could people my than first water been call who oil its now find long down day did get come made may part"
+).split()
+
+
+def _text(rng, words):
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def seed(db_session, messages, tags=200, max_tags_per_message=5, transcript_ratio=0.1, transcript_words=5000,
+         batch_size=5000, seed_value=0):
+    """Fill an empty database with a reproducible synthetic dataset
+    Tag popularity follows a Zipf distribution (a few tags on most messages, a long tail of rare
+    ones), and a share of the messages get a large transcript, written to the transcript store.
+    Args:
+        db_session (Session): DB Session
+        messages (int): Number of messages
+        tags (int): Number of tags
+        max_tags_per_message (int): Each message gets 0 to this many distinct tags
+        transcript_ratio (float): Share of the messages with a transcript
+        transcript_words (int): Words per transcript
+        batch_size (int): Rows inserted per statement
+        seed_value (int): Random seed, so the same arguments give the same dataset
+    Returns:
+        dict: Row counts of the dataset
+    """
+    rng = random.Random(seed_value)
+    store = get_transcript_store()
+    db_session.execute(insert(Tag), [{"name": f"tag{i}"} for i in range(1, tags + 1)])
+    tag_ids = list(range(1, tags + 1))
+    weights = [1 / rank for rank in tag_ids] # Zipf, s = 1
+
+    links = 0
+    for start in range(1, messages + 1, batch_size):
+        rows, pairs = [], []
+        for message_id in range(start, min(start + batch_size, messages + 1)):
+            row = {
+                "id": message_id,
+                "title": f"Message {message_id}",
+                "description": _text(rng, rng.randint(20, 200)),
+                "thumbnail": None, "thumbnail_hash": None, "video": None,
+                "transcript_ref": None, "transcript_length": None, "transcript_hash": None,
+            }
+            if rng.random() < transcript_ratio:
+                row["video"] = f"https://example.com/videos/{message_id}.mp4"
+                ref, length, digest = store.put(_text(rng, transcript_words))
+                row.update(transcript_ref=ref, transcript_length=length, transcript_hash=digest)
+            rows.append(row)
+            chosen = set(rng.choices(tag_ids, weights=weights, k=rng.randint(0, max_tags_per_message)))
+            pairs.extend({"message_id": message_id, "tag_id": tag_id} for tag_id in chosen)
+        db_session.execute(insert(Message.__table__), rows) # core insert: the search index is rebuilt once below
+        if pairs:
+            db_session.execute(message_tags.insert(), pairs)
+        links += len(pairs)
+        db_session.commit()
+
+    rebuild_index(db_session, batch_size=batch_size)
+    bump_data_version(db_session)
+    db_session.commit()
+    return {"messages": messages, "tags": tags, "message_tags": links}
+
+
+def is_seeded(db_session):
+    return db_session.query(Message.id).limit(1).first() is not None
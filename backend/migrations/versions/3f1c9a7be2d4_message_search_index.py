@@ -0,0 +1,37 @@
+"""message search index
+
+Revision ID: 3f1c9a7be2d4
+Revises: e49094e51389
+Create Date: 2026-10-18 18:42:10.215306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7be2d4'
+down_revision = 'e49094e51389'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Search table kept in sync by the application (app/search.py), not part of the model metadata
+    if op.get_bind().dialect.name == "mysql":
+        op.execute(
+            "CREATE TABLE message_fts ("
+            "rowid INTEGER NOT NULL PRIMARY KEY, title VARCHAR(80), description TEXT, transcript LONGTEXT, "
+            "FULLTEXT INDEX ix_message_fts_fulltext (title, description, transcript)"
+            ") ENGINE=InnoDB"
+        )
+    else:
+        op.execute("CREATE VIRTUAL TABLE message_fts USING fts5(title, description, transcript)")
+    op.execute(
+        "INSERT INTO message_fts (rowid, title, description, transcript) "
+        "SELECT id, title, description, transcript FROM message"
+    )
+
+
+def downgrade():
+    op.execute("DROP TABLE message_fts")
@@ -0,0 +1,42 @@
+"""contentless search table
+
+Revision ID: 42cdb258894c
+Revises: db0ff83a3cd0
+Create Date: 2026-10-18 18:47:00.722602
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.transcripts import get_transcript_store
+
+
+# revision identifiers, used by Alembic.
+revision = '42cdb258894c'
+down_revision = 'db0ff83a3cd0'
+branch_labels = None
+depends_on = None
+
+
+def _recreate(columns):
+    # SQLite only: an FTS5 table's options can't be altered, so it is dropped, recreated and refilled
+    connection = op.get_bind()
+    op.execute("DROP TABLE IF EXISTS message_fts")
+    op.execute(f"CREATE VIRTUAL TABLE message_fts USING fts5({columns})")
+    store = get_transcript_store()
+    rows = connection.execute(sa.text("SELECT id, title, description, transcript_ref FROM message")).all()
+    for message_id, title, description, ref in rows:
+        connection.execute(
+            sa.text("INSERT INTO message_fts (rowid, title, description, transcript) VALUES (:id, :title, :description, :transcript)"),
+            {"id": message_id, "title": title, "description": description, "transcript": store.get(ref) if ref else None}
+        )
+
+
+def upgrade():
+    # Index only: the transcripts stay (compressed) in the transcript store
+    if op.get_bind().dialect.name == "sqlite":
+        _recreate("title, description, transcript, content=''")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        _recreate("title, description, transcript")
@@ -0,0 +1,28 @@
+"""mysql long descriptions
+
+Revision ID: 4ef7c8e397da
+Revises: 221be6edc401
+Create Date: 2026-10-18 18:29:09.362384
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '4ef7c8e397da'
+down_revision = '221be6edc401'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MySQL only: TEXT is limited to 64 KB there, other databases have no such limit
+    if op.get_bind().dialect.name == "mysql":
+        op.alter_column('message', 'description', existing_type=sa.Text(), type_=mysql.LONGTEXT(), existing_nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "mysql":
+        op.alter_column('message', 'description', existing_type=mysql.LONGTEXT(), type_=sa.Text(), existing_nullable=False)
@@ -0,0 +1,26 @@
+"""mysql long search descriptions
+
+Revision ID: db0ff83a3cd0
+Revises: 9f2e857e412e
+Create Date: 2026-10-18 18:43:42.446045
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'db0ff83a3cd0'
+down_revision = '9f2e857e412e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MySQL only: the search table copies message descriptions, which are LONGTEXT there since 4ef7c8e397da
+    if op.get_bind().dialect.name == "mysql":
+        op.execute("ALTER TABLE message_fts MODIFY description LONGTEXT")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "mysql":
+        op.execute("ALTER TABLE message_fts MODIFY description TEXT")
@@ -0,0 +1,30 @@
+import os
+import pytest
+from app import create_app, db  # Import your Flask app
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Creates test apps on a database and a transcript directory of the test's tmp_path
+    Keyword arguments override the config; create_tables=False leaves the database empty (e.g. for migrations).
+    """
+    def make(create_tables=True, **config):
+        app = create_app(config_type="test", config={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp_path, 'test.db')}",
+            "TRANSCRIPT_DIR": os.path.join(tmp_path, "transcripts"),
+            **config,
+        })
+        app.testing = True
+        if create_tables:
+            with app.app_context():
+                db.create_all()
+        return app
+    return make
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+@pytest.fixture
+def client(app):
+    with app.test_client() as client:
+        yield client
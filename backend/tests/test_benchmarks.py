@@ -0,0 +1,21 @@
+import json
+import sqlite3
+from benchmarks.run import main
+
+def test_benchmark_suite_runs(tmp_path):
+    output = tmp_path / "report.json"
+    args = ["--messages", "50", "--tags", "10", "--transcript-words", "50", "--requests", "3", "--mode", "in-process",
+            "--data-dir", str(tmp_path / "data"), "--output", str(output)]
+    main(args)
+    report = json.loads(output.read_text())
+    assert report["dataset"]["seeded"]["messages"] == 50
+    assert len(report["results"]) == 13
+    assert all(result["errors"] == 0 and result["queries_per_request"] > 0 for result in report["results"])
+
+    main(args + ["--baseline", str(output), "--scenario", "tags"]) # dataset reused
+    assert json.loads(output.read_text())["dataset"]["seeded"] is None
+
+    # The write scenarios ran on a scratch copy: the seeded dataset is unchanged
+    with sqlite3.connect(tmp_path / "data" / "bench.db") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM message").fetchone()[0] == 50
+        assert connection.execute("SELECT COUNT(*) FROM message WHERE description LIKE 'Updated by the benchmark%'").fetchone()[0] == 0
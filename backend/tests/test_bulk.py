@@ -0,0 +1,100 @@
+import json
+import pytest
+from app import db
+from app.models import Message, Tag, TranscriptionJob
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        db.session.add(Message(title="Existing", description="Already there"))
+        db.session.add(Tag(name="news"))
+        db.session.commit()
+    return app
+
+def test_bulk_import_reports_row_errors(app):
+    lines = [
+        {"title": "One", "description": "First", "tags": ["news", "sports"]},
+        {"title": "Existing", "description": "Duplicate of the database"},
+        "not json",
+        {"title": "Two", "description": "Second", "tags": "sports, weather"},
+        {"title": "One", "description": "Duplicate within the import"},
+        {"description": "No title"},
+        {"title": "Three", "description": "Third", "video": "http://example.com/video.mp4", "gen_transcript": True},
+    ]
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+    with app.test_client() as client:
+        response = client.post('/messages/bulk?batch_size=2', data=body, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    assert response.json['imported'] == 3
+    assert [error['line'] for error in response.json['errors']] == [2, 3, 5, 6]
+
+    with app.app_context():
+        assert sorted(tag.name for tag in db.session.query(Tag)) == ["news", "sports", "weather"]
+        two = db.session.query(Message).filter_by(title="Two").one()
+        assert sorted(tag.name for tag in two.tags) == ["sports", "weather"]
+        assert db.session.query(TranscriptionJob).count() == 1
+
+def test_rows_of_the_wrong_type_are_reported(app):
+    lines = [
+        {"title": "One", "description": "First"},
+        {"title": "Numeric tags", "description": "D", "tags": [1]},
+        {"title": "Scalar tags", "description": "D", "tags": 5},
+        {"title": ["x"], "description": "D"},
+        {"title": "List description", "description": ["D"]},
+        {"title": "Numeric video", "description": "D", "video": 5},
+        ["not", "an", "object"],
+        {"title": "x" * 81, "description": "Title too long"},
+        {"title": "Long tag", "description": "D", "tags": ["x" * 81]},
+        {"title": "Two", "description": "Second"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines)
+    with app.test_client() as client:
+        response = client.post('/messages/bulk?batch_size=2', data=body, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    assert response.json['imported'] == 2
+    assert [error['line'] for error in response.json['errors']] == [2, 3, 4, 5, 6, 7, 8, 9]
+
+def test_failed_batch_is_retried_row_by_row(app):
+    from sqlalchemy import create_engine, event
+    with app.app_context():
+        engine = db.engine
+        def concurrent_writer(conn, cursor, statement, *args):
+            # Another writer adds "Race" after the batch checked its titles
+            if statement.startswith("INSERT INTO message ") and not concurrent_writer.done:
+                concurrent_writer.done = True
+                other = create_engine(engine.url)
+                with other.begin() as connection:
+                    connection.execute(Message.__table__.insert(), {"title": "Race", "description": "Elsewhere"})
+                other.dispose()
+        concurrent_writer.done = False
+        event.listen(engine, "before_cursor_execute", concurrent_writer)
+        lines = [{"title": title, "description": "D"} for title in ("One", "Race", "Two")]
+        body = "\n".join(json.dumps(line) for line in lines)
+        try:
+            with app.test_client() as client:
+                response = client.post('/messages/bulk?batch_size=3', data=body, content_type="application/x-ndjson")
+        finally:
+            event.remove(engine, "before_cursor_execute", concurrent_writer)
+        assert response.json['imported'] == 2
+        assert [error['line'] for error in response.json['errors']] == [2]
+        assert sorted(title for (title,) in db.session.query(Message.title)) == ["Existing", "One", "Race", "Two"]
+
+def test_import_command(app, tmp_path):
+    path = tmp_path / "messages.ndjson"
+    path.write_text("\n".join(json.dumps({"title": f"M{i}", "description": "D"}) for i in range(5)))
+    result = app.test_cli_runner().invoke(args=["import-messages", str(path), "--batch-size", "2"])
+    assert "Imported: 5, failed: 0" in result.output
+
+def test_tag_resolution_is_set_based(app):
+    from sqlalchemy import event
+    with app.app_context():
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", listener)
+        tags = Tag.resolve(db.session, [" news", "art", "music", "art", ""])
+        event.remove(db.engine, "before_cursor_execute", listener)
+        assert [tag.name for tag in tags] == ["news", "art", "music"]
+        assert len(statements) == 3 # existing tags, one multi-row insert, inserted tags
+        db.session.commit()
+        assert [tag.id for tag in Tag.resolve(db.session, ["music", "news"])] == [tags[2].id, tags[0].id]
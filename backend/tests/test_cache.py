@@ -0,0 +1,41 @@
+def test_etag_revalidation(client):
+    response = client.get('/tags?name=a,b&id=1')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    # Same query in another order is the same resource
+    response = client.get('/tags?id=1&name=a,b', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert client.get('/messages', headers={'If-None-Match': etag}).status_code == 200
+
+def test_writes_invalidate_cache(client):
+    etag = client.get('/tags').headers['ETag']
+    assert client.get('/tags').json['data'] == []
+    assert client.post('/tags', json={"tags": ["news"]}).status_code == 201
+    response = client.get('/tags', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [tag['name'] for tag in response.json['data']] == ["news"]
+
+def test_dates_dont_confirm_stale_copies(client):
+    # Two writes within one second: a date with second precision can't tell the versions apart
+    assert client.post('/tags', json={"tags": ["news"]}).status_code == 201
+    response = client.get('/tags')
+    assert "Last-Modified" not in response.headers
+    assert client.post('/tags', json={"tags": ["sports"]}).status_code == 201
+    response = client.get('/tags', headers={'If-Modified-Since': "Thu, 01 Jan 2099 00:00:00 GMT"})
+    assert response.status_code == 200
+    assert len(response.json['data']) == 2
+
+def test_repeated_reads_are_served_from_cache(client):
+    client.get('/messages?limit=5')
+    client.get('/messages?limit=5')
+    cache = client.application.extensions['response_cache']
+    assert cache.hits == 1
+
+def test_streamed_listings_bypass_cache(client):
+    response = client.get('/messages')
+    assert response.mimetype == "application/json"
+    assert "Accept" in response.headers['Vary']
+    response = client.get('/messages', headers={'Accept': 'application/x-ndjson', 'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert "Accept" in response.headers['Vary']
@@ -0,0 +1,44 @@
+import os
+import pytest
+from sqlalchemy import text
+from app import create_app, db  # Import your Flask app
+from app.config import mysql_uri
+
+def pragmas(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            return tuple(connection.execute(text(f"PRAGMA {name}")).scalar() for name in ("journal_mode", "synchronous", "busy_timeout"))
+
+def test_sqlite_profile_enables_wal(tmp_path):
+    app = create_app(config_type="sqlite", config={"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp_path, 'test.db')}"})
+    assert pragmas(app) == ("wal", 1, 5000) # synchronous 1 is NORMAL
+
+def test_test_profile_keeps_sqlite_defaults(tmp_path):
+    app = create_app(config_type="test", config={"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp_path, 'test.db')}"})
+    assert pragmas(app)[0] == "delete"
+
+@pytest.mark.parametrize("config_type", ["default", "test"])
+def test_in_memory_sqlite(config_type):
+    app = create_app(config_type=config_type, config={"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    with app.app_context():
+        db.create_all()
+        assert db.engine.pool.__class__.__name__ == "StaticPool"
+    with app.test_client() as client:
+        assert client.post('/tags', json={"tags": ["news"]}).status_code == 201
+        assert client.get('/tags').json['data'][0]['name'] == "news"
+
+def test_production_profile_uses_mysql(monkeypatch):
+    monkeypatch.setenv("MYSQL_USER", "user")
+    monkeypatch.setenv("MYSQL_PASSWORD", "p@ss")
+    monkeypatch.setenv("MYSQL_HOST", "db")
+    monkeypatch.setenv("MYSQL_DATABASE", "cms")
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    uri = mysql_uri()
+    assert uri == "mysql+pymysql://user:p%40ss@db:3306/cms?charset=utf8mb4"
+
+    app = create_app(config_type="production", config={"SQLALCHEMY_DATABASE_URI": uri}) # no connection is made
+    with app.app_context():
+        assert db.engine.dialect.name == "mysql"
+        assert db.engine.pool.size() == app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size']
+        from app.models import Message
+        assert Message.__table__.c.description.type.dialect_impl(db.engine.dialect).__class__.__name__ == "LONGTEXT"
@@ -0,0 +1,22 @@
+from sqlalchemy import event
+from app import db
+
+def test_engine_is_reused_across_requests(app):
+    with app.app_context():
+        engine = db.engine
+    connections = []
+    event.listen(engine, "connect", lambda *args: connections.append(args))
+    with app.test_client() as client:
+        for _ in range(3):
+            assert client.get('/messages').status_code == 200
+            assert client.get('/tags').status_code == 200
+    with app.app_context():
+        assert db.engine is engine
+    print(f"New connections: {len(connections)}", flush=True)
+    assert len(connections) <= 1
+
+def test_validation_error_closes_session(app):
+    with app.test_client() as client:
+        response = client.post('/messages', json={"description": "No title"})
+    assert response.status_code == 400
+    assert response.json['msg'] == "Title is required"
@@ -0,0 +1,150 @@
+from datetime import timedelta
+import pytest
+from app import db
+from app.jobs import claim_next_job, enqueue_transcription, process_job, requeue_stale_jobs, start_worker_pool
+from app.models import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, Message, TranscriptionJob, utcnow
+
+VIDEO = "http://example.com/video.mp4"
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        message = Message(title="Video", description="With video", video=VIDEO)
+        db.session.add(message)
+        db.session.flush()
+        enqueue_transcription(db.session, message)
+        db.session.commit()
+    return app
+
+def test_job_lifecycle(app, monkeypatch):
+    monkeypatch.setattr("app.transcription.transcribe_video", lambda url, profile=None: "hello world")
+    with app.app_context():
+        job = claim_next_job(db.session)
+        assert job.status == JOB_RUNNING
+        assert job.attempts == 1
+        assert claim_next_job(db.session) is None
+        process_job(db.session, job)
+        assert job.status == JOB_DONE
+        assert db.session.get(Message, job.message_id).transcript == "hello world"
+
+    with app.test_client() as client:
+        response = client.get('/jobs/1')
+        assert response.status_code == 200
+        assert response.json['data']['status'] == JOB_DONE
+        assert response.json['data']['run_seconds'] is not None
+        response = client.get('/messages/1/transcript/status')
+        assert response.status_code == 200
+        assert response.json['data']['id'] == 1
+        assert client.get('/jobs/2').status_code == 404
+
+def test_failed_transcription(app, monkeypatch):
+    monkeypatch.setattr("app.transcription.transcribe_video", lambda url, profile=None: None)
+    with app.app_context():
+        job = claim_next_job(db.session)
+        process_job(db.session, job)
+        assert job.status == JOB_FAILED
+        assert job.error
+
+def test_job_profiles_and_stats(app, monkeypatch):
+    def transcribe(url, profile=None):
+        profile.update(mode="file", bytes_downloaded=1000, audio_seconds=60.0, download_seconds=1.5,
+                       extract_seconds=2.0, recognize_seconds=26.5, transcribe_seconds=30.0, real_time_factor=0.5)
+        return "hello world"
+    monkeypatch.setattr("app.transcription.transcribe_video", transcribe)
+    with app.app_context():
+        process_job(db.session, claim_next_job(db.session))
+
+    with app.test_client() as client:
+        assert client.get('/jobs/1').json['data']['profile']['recognize_seconds'] == 26.5
+        stats = client.get('/jobs/stats?days=1').json['data']
+        assert len(stats) == 1
+        assert stats[0]['mode'] == "file"
+        assert stats[0]['jobs'] == stats[0]['done'] == 1
+        assert stats[0]['real_time_factor'] == 0.5
+        assert stats[0]['avg_recognize_seconds'] == 26.5
+        assert client.get('/jobs/stats?days=0').status_code == 400
+
+def test_stale_job_is_requeued(app):
+    with app.app_context():
+        job = claim_next_job(db.session)
+        assert requeue_stale_jobs(db.session, timeout=-1, max_attempts=3) == 1
+        db.session.refresh(job)
+        assert job.status == JOB_QUEUED
+
+class FakeProcess:
+    def __init__(self, name):
+        self.name = name
+        self.alive = True
+        self.exitcode = None
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+def test_supervisor_restarts_dead_workers_and_requeues_their_job(app, monkeypatch):
+    with app.app_context():
+        job_id = claim_next_job(db.session).id # running, but far from TRANSCRIPTION_JOB_TIMEOUT
+        db.session.remove()
+
+    started = []
+    def start_worker_process(target, args, name):
+        process = FakeProcess(name)
+        if not started: # the first worker is killed while processing the job
+            args[3].value = job_id
+            process.alive, process.exitcode = False, -9
+        started.append(process)
+        return process
+    monkeypatch.setattr("app.jobs.start_worker_process", start_worker_process)
+    app.config["TRANSCRIPTION_SUPERVISE_INTERVAL"] = 0
+
+    start_worker_pool(app, 2, max_checks=2)
+    assert [process.name for process in started] == ["transcription-worker-0", "transcription-worker-1", "transcription-worker-0"]
+    assert not any(process.alive for process in started) # stopped with the pool
+    with app.app_context():
+        job = db.session.get(TranscriptionJob, job_id)
+        assert job.status == JOB_QUEUED
+        assert job.attempts == 1
+
+def test_supervisor_leaves_long_jobs_of_live_workers_running(app, monkeypatch):
+    with app.app_context():
+        job_id = claim_next_job(db.session).id
+        db.session.remove()
+
+    def start_worker_process(target, args, name):
+        if name.endswith("-0"): # the first worker is still transcribing, for longer than the timeout
+            args[3].value = job_id
+            with app.app_context():
+                db.session.get(TranscriptionJob, job_id).started_at = utcnow() - timedelta(hours=2)
+                db.session.commit()
+                db.session.remove()
+        return FakeProcess(name)
+    monkeypatch.setattr("app.jobs.start_worker_process", start_worker_process)
+    app.config["TRANSCRIPTION_SUPERVISE_INTERVAL"] = 0
+
+    start_worker_pool(app, 2, max_checks=2)
+    with app.app_context():
+        assert db.session.get(TranscriptionJob, job_id).status == JOB_RUNNING
+
+def test_worker_that_lost_its_claim_writes_nothing(app, monkeypatch):
+    monkeypatch.setattr("app.transcription.transcribe_video", lambda url, profile=None: "first worker")
+    with app.app_context():
+        job = claim_next_job(db.session)
+        db.session.expunge(job)
+        # Requeued as stale while the first worker still ran it, then claimed and failed by a second worker
+        assert requeue_stale_jobs(db.session, timeout=-1, max_attempts=3) == 1
+        second = claim_next_job(db.session)
+        assert second.attempts == 2
+        second.status, second.error = JOB_FAILED, "Second attempt failed"
+        db.session.commit()
+
+        process_job(db.session, job)
+        db.session.remove()
+        job = db.session.get(TranscriptionJob, job.id)
+        assert (job.status, job.error) == (JOB_FAILED, "Second attempt failed")
+        assert db.session.get(Message, job.message_id).transcript == "" # still pending
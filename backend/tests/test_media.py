@@ -0,0 +1,98 @@
+import threading
+from types import SimpleNamespace
+import pytest
+import requests
+from app import http_client, media
+
+FORMATS = ["image/png", "image/jpeg"]
+MB = 1024 * 1024
+
+class FakeImageResponse:
+    def __init__(self, size, content_type="image/png", content_length=True):
+        self.status_code = 200
+        self.size = size
+        self.read = 0
+        self.headers = {'Content-Type': content_type}
+        if content_length:
+            self.headers['Content-Length'] = str(size)
+
+    def iter_content(self, chunk_size):
+        while self.read < self.size:
+            chunk = min(chunk_size, self.size - self.read)
+            self.read += chunk
+            yield b"x" * chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+@pytest.fixture
+def fetch(monkeypatch):
+    media.thumbnail_cache.clear()
+    responses = []
+    def get(url, stream):
+        response = responses.pop(0)
+        fetch.calls.append((url, response))
+        return response
+    fetch.calls = []
+    monkeypatch.setattr(media, "get_session", lambda: SimpleNamespace(get=get))
+    fetch.responses = responses
+    return fetch
+
+def test_declared_size_is_trusted(fetch):
+    fetch.responses.append(FakeImageResponse(50 * MB))
+    assert media.validate_thumbnail("http://example.com/a.png", FORMATS, 5) == "Image size must be less than 5 MB."
+    assert fetch.calls[0][1].read == 0
+
+def test_undeclared_size_reads_at_most_limit(fetch):
+    fetch.responses.append(FakeImageResponse(50 * MB, content_length=False))
+    assert media.validate_thumbnail("http://example.com/a.png", FORMATS, 5) == "Image size must be less than 5 MB."
+    assert fetch.calls[0][1].read <= 5 * MB + 64 * 1024
+
+def test_valid_urls_are_cached(fetch):
+    fetch.responses.append(FakeImageResponse(MB, content_type="image/jpeg", content_length=False))
+    assert media.validate_thumbnail("http://example.com/b.jpg", FORMATS, 5) is None
+    assert media.validate_thumbnail("http://example.com/b.jpg", FORMATS, 5) is None
+    assert len(fetch.calls) == 1
+    assert media.validate_thumbnail("http://example.com/b.jpg", ["image/png"], 5) == "Only ['image/png'] formats are allowed."
+
+def test_thumbnail_and_video_are_validated_concurrently(monkeypatch):
+    media.thumbnail_cache.clear()
+    both_started = threading.Barrier(2, timeout=5) # breaks unless the two fetches overlap
+    def get(url, stream):
+        both_started.wait()
+        return FakeImageResponse(MB)
+    def head(url):
+        both_started.wait()
+        return SimpleNamespace(status_code=200, headers={'Content-Type': "video/mp4"})
+    monkeypatch.setattr(media, "get_session", lambda: SimpleNamespace(get=get, head=head))
+    config = {'ALLOWED_IMAGE_FORMATS': FORMATS, 'MAX_IMAGE_SIZE_MB': 5, 'ALLOWED_VIDEO_FORMATS': ["video/webm"]}
+    assert media.validate_media("http://example.com/c.png", "http://example.com/c.mp4", config) == ("Only ['video/webm'] formats are allowed.", None)
+
+def test_timeouts_fail_validation(monkeypatch):
+    def head(url):
+        raise requests.Timeout("read timed out")
+    monkeypatch.setattr(media, "get_session", lambda: SimpleNamespace(head=head))
+    assert media.validate_video("http://example.com/slow.mp4", ["video/mp4"]) == "Failed to fetch video from URL"
+
+def test_shared_session_applies_pool_and_timeouts(monkeypatch):
+    http_client.configure({
+        'HTTP_CONNECT_TIMEOUT': 1, 'HTTP_READ_TIMEOUT': 2, 'HTTP_RETRIES': 3, 'HTTP_RETRY_BACKOFF': 0,
+        'HTTP_POOL_CONNECTIONS': 4, 'HTTP_POOL_MAXSIZE': 6,
+    })
+    session = http_client.get_session()
+    assert http_client.get_session() is session
+    adapter = session.get_adapter("https://example.com/")
+    assert adapter.max_retries.total == 3
+    assert adapter._pool_maxsize == 6 and adapter._pool_block
+    sent = {}
+    def send(request, **kwargs):
+        sent.update(kwargs)
+        raise requests.ConnectionError("not sent")
+    monkeypatch.setattr(adapter, "send", send)
+    with pytest.raises(requests.ConnectionError):
+        session.head("https://example.com/video.mp4")
+    assert sent["timeout"] == (1, 2)
+    http_client.reset()
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import create_engine, event
+from app import db
+from app.models import Message, Tag, link_message_tags, message_tags
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        tags = [Tag(name=f"tag{i}") for i in range(10)]
+        for i in range(50):
+            db.session.add(Message(title=f"Message {i}", description="Description"))
+        db.session.add_all(tags)
+        db.session.flush()
+        db.session.execute(message_tags.insert(), [{"message_id": 1, "tag_id": 1}, {"message_id": 2, "tag_id": 2}])
+        db.session.commit()
+    return app
+
+def count_links(client):
+    with client.application.app_context():
+        return db.session.query(message_tags).count()
+
+def test_bulk_link_and_unlink(client):
+    with client.application.app_context():
+        engine = db.engine
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    response = client.post('/message_tags', json={"message_ids": list(range(1, 51)), "tag_ids": list(range(1, 11))})
+    event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 201
+    assert response.json['msg'].endswith(": 498")
+    assert len([s for s in statements if "message_tags" in s]) == 2 # existing pairs + one executemany
+    assert count_links(client) == 500
+
+    response = client.delete('/message_tags', json={"message_ids": [1, 2, 3], "tag_ids": ["1", "2"]})
+    assert response.status_code == 200
+    assert response.json['msg'].endswith(": 6")
+    assert count_links(client) == 494
+
+def test_invalid_ids(client):
+    assert client.post('/message_tags', json={"message_ids": ["x"], "tag_ids": [1]}).status_code == 400
+    assert client.delete('/message_tags', json={"message_ids": [], "tag_ids": [1]}).status_code == 400
+
+def test_tag_counts_and_paginated_messages(client):
+    client.post('/message_tags', json={"message_ids": list(range(1, 26)), "tag_ids": [1]})
+    with client.application.app_context():
+        engine = db.engine
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    tags = client.get('/tags').json['data']
+    event.remove(engine, "before_cursor_execute", listener)
+    assert [tag['message_count'] for tag in tags[:3]] == [25, 1, 0]
+    assert 'messages' not in tags[0]
+    assert len([s for s in statements if "data_version" not in s]) == 1 # tags and counts in one query
+
+    tag = client.get('/tags?id=1&messages=10').json['data'][0]
+    assert tag['messages'] == [f"Message {i}" for i in range(10)]
+    page = client.get(f"/tags/1/messages?limit=10&after={tag['messages_next_cursor']}").json
+    assert [message['id'] for message in page['data']] == list(range(11, 21))
+    page = client.get(f"/tags/1/messages?limit=10&after={page['next_cursor']}").json
+    assert len(page['data']) == 5 and page['next_cursor'] is None
+    assert client.get('/tags/99/messages').status_code == 404
+    assert client.get('/tags?messages=5&stream=ndjson').status_code == 400
+
+def test_links_made_concurrently_are_skipped(app):
+    with app.app_context():
+        engine = db.engine
+        def concurrent_writer(conn, cursor, statement, *args):
+            # Another writer links message 3 to tag 1 after the existing pairs were read
+            if statement.startswith("INSERT INTO message_tags") and not concurrent_writer.done:
+                concurrent_writer.done = True
+                other = create_engine(engine.url)
+                with other.begin() as connection:
+                    connection.execute(message_tags.insert(), {"message_id": 3, "tag_id": 1})
+                other.dispose()
+        concurrent_writer.done = False
+        event.listen(engine, "before_cursor_execute", concurrent_writer)
+        try:
+            assert link_message_tags(db.session, [1, 2, 3], [1, 2]) == 3 # (1, 2), (2, 1) and (3, 2)
+            db.session.commit()
+        finally:
+            event.remove(engine, "before_cursor_execute", concurrent_writer)
+        assert db.session.query(message_tags).count() == 6
@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import patch
+import requests
+from app import db
+from app import http_client
+from app.metrics import registry
+from app.models import Message
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(RESPONSE_CACHE_ENABLED=False)
+    with app.app_context():
+        db.session.add(Message(title="Message", description="Description"))
+        db.session.commit()
+    registry.clear()
+    return app
+
+def test_requests_and_statements_per_endpoint(client):
+    for _ in range(3):
+        assert client.get('/messages').status_code == 200
+    assert client.get('/messages?limit=abc').status_code == 400
+    assert client.get('/missing').status_code == 404
+
+    endpoint = {"endpoint": "/messages", "method": "GET"}
+    assert registry.value("http_requests_total", {**endpoint, "status": 200}) == 3
+    assert registry.value("http_requests_total", {**endpoint, "status": 400}) == 1
+    assert registry.value("http_requests_total", {"endpoint": "unmatched", "method": "GET", "status": 404}) == 1
+    assert registry.value("http_request_duration_seconds", endpoint) == 4
+    assert registry.value("db_statements_total", {"endpoint": "/messages"}) == 6 # page + tags, no queries on a 400
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_requests_total{endpoint="/messages",method="GET",status="200"} 3' in body
+    assert 'db_statements_per_request_bucket{endpoint="/messages",le="2"} 4' in body
+    assert 'db_statements_per_request_bucket{endpoint="/messages",le="+Inf"} 4' in body
+
+def test_outbound_requests(client):
+    session = http_client.TimeoutSession()
+    with patch("requests.Session.request", return_value=type("Response", (), {"status_code": 200})()):
+        session.request("HEAD", "https://user@videos.example.com/a.mp4")
+    with patch("requests.Session.request", side_effect=requests.ConnectionError()):
+        with pytest.raises(requests.ConnectionError):
+            session.request("GET", "https://images.example.com/a.png")
+    assert registry.value("http_client_request_duration_seconds", {"method": "HEAD", "status": "2xx"}) == 1
+    assert registry.value("http_client_request_duration_seconds", {"method": "GET", "status": "error"}) == 1
+
+def test_outbound_series_dont_grow_with_hosts(client):
+    session = http_client.TimeoutSession()
+    with patch("requests.Session.request", return_value=type("Response", (), {"status_code": 404})()):
+        for i in range(50):
+            session.request("GET", f"https://host{i}.example.com/a.png")
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_client_request_duration_seconds_count{method="GET",status="4xx"} 50' in body
+    assert len([line for line in body.splitlines() if line.startswith("http_client_request_duration_seconds_count")]) == 1
+
+def test_success_and_failure_of_the_same_method(client):
+    session = http_client.TimeoutSession()
+    with patch("requests.Session.request", return_value=type("Response", (), {"status_code": 200})()):
+        session.request("GET", "https://cdn.example.com/a.png")
+    with patch("requests.Session.request", side_effect=requests.Timeout()):
+        with pytest.raises(requests.Timeout):
+            session.request("GET", "https://cdn.example.com/b.png")
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'http_client_request_duration_seconds_count{method="GET",status="2xx"} 1' in body
+    assert 'http_client_request_duration_seconds_count{method="GET",status="error"} 1' in body
+
+def test_metrics_can_be_disabled(make_app):
+    app = make_app(METRICS_ENABLED=False)
+    assert app.test_client().get('/metrics').status_code == 404
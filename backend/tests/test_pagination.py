@@ -0,0 +1,98 @@
+import json
+import pytest
+from app import db
+from app.models import Message, Tag
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(MESSAGES_MAX_PAGE_SIZE=4)
+    with app.app_context():
+        red, blue = Tag(name="red"), Tag(name="blue")
+        for i in range(10):
+            message = Message(title=f"Message {i}", description="Description")
+            message.tags = [red, blue] if i % 2 else [red]
+            db.session.add(message)
+        db.session.commit()
+    return app
+
+def fetch_all(client, query):
+    ids, after = [], None
+    while True:
+        url = f"/messages?{query}" + (f"&after={after}" if after else "")
+        response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json['data']) <= 4
+        ids += [message['id'] for message in response.json['data']]
+        after = response.json['next_cursor']
+        if not after:
+            return ids
+
+def test_keyset_pages(client):
+    assert fetch_all(client, "limit=3") == list(range(1, 11))
+    assert fetch_all(client, "limit=100") == list(range(1, 11))
+
+def test_pages_with_tag_join_have_no_duplicates(client):
+    assert fetch_all(client, "limit=2&tag=red,blue") == list(range(1, 11))
+    assert fetch_all(client, "limit=2&tag=blue") == [2, 4, 6, 8, 10]
+
+def test_invalid_limit(client):
+    assert client.get('/messages?limit=abc').status_code == 400
+
+def test_sparse_fieldsets(client):
+    response = client.get('/messages?fields=id,title,tags')
+    assert response.status_code == 200
+    assert set(response.json['data'][0]) == {'id', 'title', 'tags'}
+    assert response.json['data'][1]['tags'] == ['red', 'blue']
+    assert client.get('/messages?fields=id,secret').status_code == 400
+
+def test_listing_query_count(client):
+    from sqlalchemy import event
+    statements = []
+    with client.application.app_context():
+        engine = db.engine
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.get('/messages?limit=4&fields=id,title,tags')
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len(response.json['data']) == 4
+    statements = [statement for statement in statements if "data_version" not in statement]
+    assert len(statements) == 2 # page + batched tags, no N+1
+    assert "transcript" not in statements[0]
+
+def test_streamed_listings(client):
+    response = client.get('/messages?stream=ndjson&fields=id,tags&tag=blue')
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['id'] for line in lines] == [2, 4, 6, 8, 10] # not capped by MESSAGES_MAX_PAGE_SIZE
+
+    response = client.get('/messages?stream=json&limit=7')
+    assert [message['id'] for message in response.json['data']] == list(range(1, 8))
+
+    response = client.get('/tags', headers={'Accept': 'application/x-ndjson'})
+    assert [json.loads(line)['name'] for line in response.get_data(as_text=True).splitlines()] == ["red", "blue"]
+    assert client.get('/tags?stream=xml').status_code == 400
+
+def test_streams_close_the_session_once_done(client, monkeypatch):
+    from sqlalchemy.orm import Session
+    events = []
+    close, to_dict = Session.close, Message.to_dict
+    monkeypatch.setattr(Session, "close", lambda self: (events.append("close"), close(self))[1])
+    monkeypatch.setattr(Message, "to_dict", lambda self, *args: (events.append("row"), to_dict(self, *args))[1])
+    response = client.get('/messages?stream=ndjson')
+    assert len(response.get_data(as_text=True).splitlines()) == 10
+    assert events[:10] == ["row"] * 10 and "close" in events # closed by the stream, not before it starts
+
+def test_tag_facets_cover_all_pages(client):
+    response = client.get('/messages?tag=blue&limit=2&facets=tags')
+    assert len(response.json['data']) == 2
+    assert response.json['facets']['tags'] == [
+        {"id": 2, "name": "blue", "count": 5},
+        {"id": 1, "name": "red", "count": 5},
+    ]
+    facets = client.get('/messages?facets=tags').json['facets']['tags']
+    assert [(tag['name'], tag['count']) for tag in facets] == [("red", 10), ("blue", 5)]
+    assert 'facets' not in client.get('/messages').json
+    assert client.get('/messages?facets=title').status_code == 400
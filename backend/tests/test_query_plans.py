@@ -0,0 +1,59 @@
+import os
+import re
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import event
+from app import db
+from app.models import Message, Tag, message_tags
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(create_tables=False, RESPONSE_CACHE_ENABLED=False)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS) # the schema the migrations build, not create_all()
+        tags = [Tag(name=f"tag{i}") for i in range(20)]
+        db.session.add_all(tags)
+        db.session.add_all(Message(title=f"Message {i}", description="Description") for i in range(200))
+        db.session.flush()
+        db.session.execute(message_tags.insert(), [
+            {"message_id": m, "tag_id": t} for m in range(1, 201) for t in range(1, 21) if m % t == 0
+        ])
+        db.session.commit()
+        db.session.execute(db.text("ANALYZE"))
+    return app
+
+def query_plans(app, url):
+    """EXPLAIN QUERY PLAN of every statement a request runs"""
+    with app.app_context():
+        engine = db.engine
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, context, executemany: statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with app.test_client() as client:
+            assert client.get(url).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    with engine.connect() as connection:
+        return [
+            (statement, [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)])
+            for statement, parameters in statements if statement.lstrip().upper().startswith("SELECT")
+        ]
+
+@pytest.mark.parametrize("url", [
+    "/messages?tag=tag3",
+    "/messages?tag=tag3,tag5&facets=tags",
+    "/messages?id=1,2,3&fields=id,title,tags",
+    "/messages?title=Message 1,Message 2",
+    "/messages?after=100&limit=20",
+    "/tags?id=1,2",
+    "/tags?name=tag1,tag2&messages=5",
+    "/tags/3/messages?after=10",
+])
+def test_listing_filters_use_indexes(app, url):
+    for statement, plan in query_plans(app, url):
+        # "SCAN <table>" reads every row (or every index entry, with USING COVERING INDEX); "SEARCH" uses a key
+        full_scans = [step for step in plan if re.match(r"SCAN (message|tag|message_tags)\b", step)]
+        assert not full_scans, f"{url} scans a table: {full_scans}\n{statement}"
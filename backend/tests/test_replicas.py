@@ -0,0 +1,80 @@
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Message
+from app.replicas import READ_YOUR_WRITES_COOKIE
+
+def make_primary(make_app, replicas, **config):
+    app = make_app(SQLALCHEMY_REPLICA_URIS=replicas, RESPONSE_CACHE_ENABLED=False, **config)
+    with app.app_context():
+        db.session.add(Message(title="On the primary", description="Description"))
+        db.session.commit()
+    return app
+
+def make_replica(path, title):
+    """A replica database whose only message tells which database served the read"""
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Message(title=title, description="Description"))
+        session.commit()
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+def titles(client):
+    return [message['title'] for message in client.get('/messages').json['data']]
+
+def test_reads_round_robin_over_replicas(make_app, tmp_path):
+    replicas = [make_replica(os.path.join(tmp_path, f"replica{i}.db"), f"On replica {i}") for i in range(2)]
+    app = make_primary(make_app, replicas)
+    with app.test_client() as client:
+        assert [titles(client) for _ in range(3)] == [["On replica 0"], ["On replica 1"], ["On replica 0"]]
+
+def test_failing_replica_is_skipped(make_app, tmp_path):
+    replica = make_replica(os.path.join(tmp_path, "replica.db"), "On replica")
+    missing = f"sqlite:///{os.path.join(tmp_path, 'missing', 'replica.db')}" # directory doesn't exist
+    app = make_primary(make_app, [missing, replica])
+    with app.test_client() as client:
+        assert [titles(client) for _ in range(3)] == [["On replica"]] * 3
+
+    app = make_primary(make_app, [missing], SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tmp_path, 'no_replica.db')}")
+    with app.test_client() as client:
+        assert titles(client) == ["On the primary"]
+
+def test_reads_after_a_write_use_the_primary(make_app, tmp_path):
+    replica = make_replica(os.path.join(tmp_path, "replica.db"), "On replica")
+    app = make_primary(make_app, [replica])
+    with app.test_client() as client:
+        assert titles(client) == ["On replica"]
+        response = client.post('/tags', json={"tags": ["news"]})
+        assert response.status_code == 201
+        assert client.get_cookie(READ_YOUR_WRITES_COOKIE)
+        assert titles(client) == ["On the primary"]
+        assert client.get('/tags').json['data'][0]['name'] == "news"
+
+def test_cross_origin_frontend_can_send_the_cookie(make_app, tmp_path):
+    app = make_primary(make_app, [make_replica(os.path.join(tmp_path, "replica.db"), "On replica")])
+    with app.test_client() as client:
+        preflight = client.options('/tags', headers={
+            "Origin": "http://localhost:4000", "Access-Control-Request-Method": "POST",
+        })
+        assert preflight.headers["Access-Control-Allow-Origin"] == "http://localhost:4000"
+        assert preflight.headers["Access-Control-Allow-Credentials"] == "true"
+        response = client.post('/tags', json={"tags": ["news"]}, headers={"Origin": "http://localhost:4000"})
+        assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:4000"
+        assert response.headers["Access-Control-Allow-Credentials"] == "true"
+        assert READ_YOUR_WRITES_COOKIE in response.headers["Set-Cookie"]
+
+def test_other_origins_get_no_credentialed_access(make_app):
+    app = make_primary(make_app, [])
+    with app.test_client() as client:
+        response = client.get('/tags', headers={"Origin": "http://evil.example.com"})
+        assert "Access-Control-Allow-Origin" not in response.headers
+        assert "Access-Control-Allow-Credentials" not in response.headers
+
+    app = make_app(CORS_ORIGINS=["*"])
+    with app.test_client() as client:
+        response = client.get('/tags', headers={"Origin": "http://evil.example.com"})
+        assert "Access-Control-Allow-Origin" in response.headers
+        assert "Access-Control-Allow-Credentials" not in response.headers
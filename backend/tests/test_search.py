@@ -0,0 +1,70 @@
+import pytest
+from app import db
+from app.models import Message
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        db.session.add(Message(title="Bunny", description="A big bunny wakes up in the forest"))
+        db.session.add(Message(title="Forest", description="Trees", video="http://example.com/video.mp4"))
+        db.session.add(Message(title="City", description="Streets and cars"))
+        db.session.commit()
+    return app
+
+def test_search_ranks_and_snippets(client):
+    response = client.get('/messages/search?q=bunny')
+    assert response.status_code == 200
+    data = response.json['data']
+    assert [message['title'] for message in data] == ["Bunny"]
+    assert "<b>bunny</b>" in data[0]['snippet'].lower()
+    assert 'transcript' not in data[0]
+
+def test_search_requires_all_terms(client):
+    titles = lambda q: [message['title'] for message in client.get(f'/messages/search?q={q}').json['data']]
+    assert sorted(titles("forest")) == ["Bunny", "Forest"]
+    assert titles("bunny forest") == ["Bunny"]
+    assert titles('"unbalanced OR') == []
+
+def test_index_follows_updates(client):
+    with client.application.app_context():
+        message = db.session.query(Message).filter_by(title="Forest").first()
+        message.transcript = "the narrator talks about a waterfall"
+        db.session.commit()
+    titles = [message['title'] for message in client.get('/messages/search?q=waterfall').json['data']]
+    assert titles == ["Forest"]
+
+def test_search_requires_query(client):
+    assert client.get('/messages/search').status_code == 400
+
+def test_index_keeps_no_copy_of_the_text(client):
+    with client.application.app_context():
+        message = db.session.query(Message).filter_by(title="Forest").first()
+        message.transcript = "the narrator talks about a waterfall"
+        db.session.commit()
+        message.title = "Jungle"
+        message.transcript = "the narrator talks about a river"
+        db.session.commit()
+        tables = db.session.execute(db.text("SELECT name FROM sqlite_master WHERE name LIKE 'message_fts%'")).scalars().all()
+    assert "message_fts_content" not in tables
+    titles = lambda q: [message['title'] for message in client.get(f'/messages/search?q={q}').json['data']]
+    assert titles("waterfall") == []
+    assert titles("jungle") == ["Jungle"]
+    assert titles("forest") == ["Bunny"]
+    data = client.get('/messages/search?q=river').json['data']
+    assert [message['title'] for message in data] == ["Jungle"]
+    assert "<b>river</b>" in data[0]['snippet']
+
+def test_hits_are_loaded_once(client):
+    from sqlalchemy import event
+    with client.application.app_context():
+        engine = db.engine
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        data = client.get('/messages/search?q=forest').json['data']
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert sorted(message['title'] for message in data) == ["Bunny", "Forest"]
+    assert len([s for s in statements if "FROM message " in s or "FROM message\n" in s]) == 1
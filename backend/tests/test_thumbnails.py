@@ -0,0 +1,84 @@
+import io
+import os
+from types import SimpleNamespace
+import pytest
+from PIL import Image
+from app import db, media
+from app.models import Message
+
+def png(width, height):
+    output = io.BytesIO()
+    Image.new("RGBA", (width, height), (255, 0, 0, 128)).save(output, "PNG")
+    return output.getvalue()
+
+class FakeImageResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self.body = body
+        self.headers = {'Content-Type': "image/png", 'Content-Length': str(len(body))}
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+@pytest.fixture
+def client(make_app, tmp_path, monkeypatch):
+    app = make_app(
+        THUMBNAIL_DIR=os.path.join(tmp_path, "thumbnails"),
+        THUMBNAIL_SIZES="small:100,large:400",
+        ALLOWED_IMAGE_FORMATS=["image/png"],
+    )
+    media.thumbnail_cache.clear()
+    fetched, images = [], {}
+    def get(url, stream):
+        fetched.append(url)
+        return FakeImageResponse(images.get(url) or png(800, 400))
+    monkeypatch.setattr(media, "get_session", lambda: SimpleNamespace(get=get))
+    with app.test_client() as test_client:
+        test_client.fetched = fetched
+        test_client.images = images
+        yield test_client
+
+def test_thumbnail_is_stored_and_served_resized(client):
+    response = client.post("/messages", json={"title": "A", "description": "D", "thumbnail": "http://example.com/a.png"})
+    assert response.status_code == 201
+    digest = db.session.query(Message.thumbnail_hash).scalar()
+    assert len(digest) == 64
+
+    response = client.get(f"/thumbnails/{digest}/small", headers={"Accept": "image/webp,image/*"})
+    assert response.status_code == 200
+    assert response.mimetype == "image/webp"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert Image.open(io.BytesIO(response.data)).size == (100, 50)
+
+    response = client.get(f"/thumbnails/{digest}/large", headers={"Accept": "image/jpeg"})
+    assert response.mimetype == "image/jpeg"
+    assert Image.open(io.BytesIO(response.data)).size == (400, 200)
+
+    assert client.get(f"/thumbnails/{digest}/huge").status_code == 404
+    assert client.get("/thumbnails/../small").status_code == 404
+
+def test_stored_thumbnail_urls_are_not_fetched_again(client):
+    for title in ("A", "B"):
+        client.post("/messages", json={"title": title, "description": "D", "thumbnail": "http://example.com/a.png"})
+    assert client.fetched == ["http://example.com/a.png"]
+    assert len({digest for (digest,) in db.session.query(Message.thumbnail_hash)}) == 1
+
+def bilevel_png(width, height):
+    """Tiny file, huge image: a blank 1-bit PNG compresses to a few KB"""
+    output = io.BytesIO()
+    Image.new("1", (width, height)).save(output, "PNG")
+    return output.getvalue()
+
+@pytest.mark.parametrize("width, height", [(10000, 5000), (20000, 20000)]) # above the limit, above twice the limit
+def test_decompression_bombs_are_rejected(client, width, height):
+    client.images["http://example.com/bomb.png"] = bilevel_png(width, height)
+    response = client.post("/messages", json={"title": "Bomb", "description": "D", "thumbnail": "http://example.com/bomb.png"})
+    assert response.status_code == 400
+    assert response.json['msg'] == "Thumbnail image could not be processed"
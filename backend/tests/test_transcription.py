@@ -0,0 +1,190 @@
+import json
+import os
+import subprocess
+import wave
+from types import SimpleNamespace
+import pytest
+from app import transcription
+
+class FakeModel:
+    instances = 0
+
+    def __init__(self, path):
+        FakeModel.instances += 1
+        self.path = path
+
+class FakeRecognizer:
+    def __init__(self, model, sample_rate):
+        self.model = model
+        self.sample_rate = sample_rate
+
+@pytest.fixture
+def registry(monkeypatch):
+    FakeModel.instances = 0
+    monkeypatch.setattr(transcription, "Model", FakeModel)
+    monkeypatch.setattr(transcription, "KaldiRecognizer", FakeRecognizer)
+    monkeypatch.setattr(transcription, "_model", None)
+    monkeypatch.setitem(transcription._model_stats, "recognizers_created", 0)
+
+def test_model_is_loaded_once(registry):
+    first = transcription.create_recognizer("model-path")
+    second = transcription.create_recognizer("model-path")
+    assert FakeModel.instances == 1
+    assert first is not second
+    assert first.model is second.model
+    stats = transcription.model_stats()
+    assert stats["loaded"]
+    assert stats["load_seconds"] is not None
+    assert stats["recognizers_created"] == 2
+
+class EchoFFmpeg:
+    """Stands in for ffmpeg-python: the "conversion" is `cat`, so PCM out == bytes in"""
+    def input(self, *args, **kwargs):
+        return self
+
+    def output(self, *args, **kwargs):
+        return self
+
+    def run_async(self, pipe_stdin=False, pipe_stdout=False):
+        return subprocess.Popen(["cat"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+class ByteCountingRecognizer:
+    def __init__(self, model, sample_rate):
+        self.received = 0
+
+    def AcceptWaveform(self, data):
+        self.received += len(data)
+        return False
+
+    def FinalResult(self):
+        return json.dumps({"text": str(self.received)})
+
+def test_stream_pipeline_feeds_all_bytes(registry, monkeypatch):
+    body = os.urandom(300 * 1024)
+    monkeypatch.setattr(transcription, "ffmpeg", EchoFFmpeg())
+    monkeypatch.setattr(transcription, "KaldiRecognizer", ByteCountingRecognizer)
+    monkeypatch.setattr(transcription, "get_session", lambda: SimpleNamespace(get=lambda url, stream: FakeResponse(body)))
+    profile = {}
+    transcript = transcription._transcribe_stream("http://example.com/video.mp4", "model-path", source="pipe", profile=profile)
+    assert transcript == str(len(body))
+    assert profile["bytes_downloaded"] == len(body)
+    assert profile["audio_seconds"] == round(len(body) / (2 * transcription.SAMPLE_RATE), 3)
+    assert profile["download_seconds"] is not None and profile["recognize_seconds"] is not None
+
+def test_segments_cover_audio_at_silences():
+    sample_rate = 100
+    silences = [590, 1230]
+    segments = transcription.plan_segments(
+        1800, sample_rate, segment_seconds=6, overlap_seconds=1,
+        find_silence=lambda start, end: next((s for s in silences if start <= s < end), start)
+    )
+    assert [(start, end) for start, end, _, _ in segments] == [(0, 590), (590, 1230), (1230, 1800)]
+    assert segments[1][2:] == (490, 1330)
+    assert transcription.plan_segments(300, sample_rate, 6, 1) == [(0, 300, 0, 300)]
+
+# Words spoken in the synthetic audio as (start, end, word), in seconds
+WORDS = [(i * 0.7, i * 0.7 + 0.5, f"w{i}") for i in range(100)]
+
+class TimelineRecognizer:
+    """Recognizes the words of WORDS that were fully heard, timed from the first frame it was fed"""
+    def __init__(self, model, sample_rate):
+        self.sample_rate = sample_rate
+        self.frames = 0
+
+    def SetWords(self, enabled):
+        pass
+
+    def AcceptWaveform(self, data):
+        self.frames += len(data) // 2
+        return False
+
+    def FinalResult(self):
+        offset = self.offset / self.sample_rate
+        heard = self.frames / self.sample_rate
+        return json.dumps({"result": [
+            {"word": word, "start": start - offset, "end": end - offset}
+            for start, end, word in WORDS if offset <= start and end <= offset + heard
+        ]})
+
+def test_parallel_segments_match_sequential(registry, monkeypatch, tmp_path):
+    sample_rate = 1000
+    audio_file = str(tmp_path / "audio.wav")
+    with wave.open(audio_file, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(b"\x00\x00" * 70 * sample_rate)
+
+    recognizers = []
+    def recognizer(model, rate):
+        rec = TimelineRecognizer(model, rate)
+        recognizers.append(rec)
+        return rec
+    monkeypatch.setattr(transcription, "KaldiRecognizer", recognizer)
+    real_setpos = wave.Wave_read.setpos
+    def setpos(wf, pos):
+        if recognizers:
+            recognizers[-1].offset = pos
+        real_setpos(wf, pos)
+    monkeypatch.setattr(wave.Wave_read, "setpos", setpos)
+
+    segments = transcription.plan_segments(70 * sample_rate, sample_rate, segment_seconds=15, overlap_seconds=2)
+    assert len(segments) > 1
+    results = [transcription._recognize_segment(audio_file, "model-path", *segment) for segment in segments]
+    assert transcription.stitch_segments(results) == " ".join(word for _, _, word in WORDS)
+
+class MidpointRecognizer:
+    """Hears one word in the middle of the audio it is fed"""
+    def __init__(self, model, sample_rate):
+        self.sample_rate = sample_rate
+        self.frames = 0
+
+    def SetWords(self, enabled):
+        pass
+
+    def AcceptWaveform(self, data):
+        self.frames += len(data) // 2
+        return False
+
+    def FinalResult(self):
+        middle = self.frames / self.sample_rate / 2
+        return json.dumps({"result": [{"word": "w", "start": middle, "end": middle}]})
+
+def recognize_parallel_in_worker(audio_file, results):
+    """Runs in a transcription worker process, like `jobs.run_worker`"""
+    transcription.Model = FakeModel
+    transcription.KaldiRecognizer = MidpointRecognizer
+    results.put(transcription._recognize_parallel(audio_file, "model-path", 2, segment_seconds=15, overlap_seconds=2))
+
+def test_parallel_mode_runs_in_worker_processes(tmp_path):
+    import multiprocessing
+    from app.jobs import start_worker_process, stop_worker_processes
+    sample_rate = 1000
+    audio_file = str(tmp_path / "audio.wav")
+    with wave.open(audio_file, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(b"\x00\x00" * 70 * sample_rate)
+
+    results = multiprocessing.get_context("spawn").Queue()
+    worker = start_worker_process(recognize_parallel_in_worker, (audio_file, results), "transcription-worker-test")
+    try:
+        transcript = results.get(timeout=30)
+    finally:
+        stop_worker_processes([worker])
+    words = transcript.split()
+    assert len(words) > 1 and set(words) == {"w"} # one word per segment, recognized by the pool
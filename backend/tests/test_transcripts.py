@@ -0,0 +1,69 @@
+import os
+import pytest
+from app import db
+from app.models import Message
+from app.search import rebuild_index, search_messages
+from app.transcripts import FileTranscriptStore
+
+TRANSCRIPT = "ünïcode words " * 2000
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        message = Message(title="Talk", description="A talk", video="http://example.com/video.mp4")
+        message.transcript = TRANSCRIPT
+        db.session.add(message)
+        db.session.add(Message(title="Pending", description="No transcript yet", video="http://example.com/video.mp4"))
+        db.session.commit()
+    return app
+
+def test_store_is_compressed_and_content_addressed(tmp_path):
+    store = FileTranscriptStore(str(tmp_path))
+    ref, length, digest = store.put(TRANSCRIPT)
+    assert store.put(TRANSCRIPT)[0] == ref
+    assert length == len(TRANSCRIPT) and ref == f"zlib:{digest}"
+    files = [os.path.join(root, name) for root, _, names in os.walk(tmp_path) for name in names]
+    assert len(files) == 1 and os.path.getsize(files[0]) < len(TRANSCRIPT) // 10
+    assert "".join(store.iter_text(ref, chunk_size=7)) == TRANSCRIPT # multi-byte characters split across chunks
+
+def test_rows_keep_only_a_reference(app):
+    with app.app_context():
+        row = db.session.execute(db.text("SELECT * FROM message WHERE title = 'Talk'")).mappings().one()
+        assert "transcript" not in row
+        assert row["transcript_length"] == len(TRANSCRIPT)
+        assert db.session.query(Message).filter_by(title="Pending").one().transcript == ""
+
+def test_transcript_endpoint_streams_with_etag(app):
+    with app.test_client() as client:
+        listing = client.get('/messages').json['data']
+        assert "transcript" not in listing[0] and listing[0]["transcript_length"] == len(TRANSCRIPT)
+
+        response = client.get('/messages/1/transcript')
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.get_data(as_text=True) == TRANSCRIPT
+        assert client.get('/messages/1/transcript', headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+        assert client.get('/messages/2/transcript').status_code == 404
+        assert client.get('/messages/9/transcript').status_code == 404
+
+def test_rebuilt_index_reads_the_store(app):
+    with app.app_context():
+        assert rebuild_index(db.session) == 2
+        assert [message.id for message, _, _ in search_messages(db.session, "unicode", 10)] == [1]
+
+def test_reindex_sweeps_orphan_files(app, tmp_path):
+    with app.app_context():
+        message = db.session.query(Message).filter_by(title="Pending").one()
+        message.transcript = "never committed"
+        orphan = message.transcript_ref
+        db.session.rollback()
+    root = tmp_path / "transcripts"
+    files = lambda: sorted(os.path.join(directory, name) for directory, _, names in os.walk(root) for name in names)
+    assert len(files()) == 2
+    app.test_cli_runner().invoke(args=["search-reindex"])
+    assert len(files()) == 2 # too recent: its row may not be committed yet
+    for path in files():
+        os.utime(path, (0, 0))
+    app.test_cli_runner().invoke(args=["search-reindex"])
+    assert len(files()) == 1 and orphan.split(":")[1] not in files()[0]
@@ -1,8 +1,9 @@
 """Web Server Gateway Interface (WSGI): Entry Point"""
+import os
 from app import create_app
 
 
-app = create_app()
+app = create_app(os.getenv("APP_CONFIG", "default")) # "default" (SQLite app.db) or "production" (MySQL)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000)
@@ -7,15 +7,24 @@ import { Card, CardContent, Typography, Box, Chip, Badge, Stack, Dialog, DialogT
 import Tooltip, { tooltipClasses } from '@mui/material/Tooltip';
 import { Add, Close, Edit, Check, PlayArrow } from '@mui/icons-material';
 import { styled } from '@mui/material/styles';
-import { DEFAULT_IMAGE } from "@/constants";
+import { API_BASE_URL, API_ROUTES, DEFAULT_IMAGE } from "@/constants";
 import { useMessageStore } from "@/redux/stores/messageStore";
 
+// Locally stored resized copy when the server has one, the original URL otherwise
+const thumbnailSrc = (message, size) => {
+    if (message?.thumbnail_hash) {
+        return `${API_BASE_URL}${API_ROUTES.THUMBNAILS}/${message.thumbnail_hash}/${size}`;
+    }
+    return message?.thumbnail ?? DEFAULT_IMAGE;
+}
+
 const MessageTile = ({ message, assigningTags, setSelectedMessageIds } ) => {
 
     const {
         handleValidateMessage,
         handleUpdateMessage,
         handleFetchMessages,
+        handleFetchTranscript,
     } = useMessageStore();
 
     const [isLoading, setIsLoading] = useState(false);
@@ -30,6 +39,16 @@ const MessageTile = ({ message, assigningTags, setSelectedMessageIds } ) => {
     const [elevated, setElevated] = useState(false);
     const [openView, setOpenView] = useState(false);
 
+    // Transcripts are not part of the listing, they are fetched when the message is opened
+    const [transcript, setTranscript] = useState(null);
+    useEffect(() => {
+        if (openView && message?.transcript_length > 0) {
+            handleFetchTranscript(message.id).then(setTranscript);
+        } else {
+            setTranscript(null);
+        }
+    }, [openView, message])
+
     const descriptionElementRef = React.useRef(null);
     useEffect(() => {
         if (openView) {
@@ -173,7 +192,7 @@ const MessageTile = ({ message, assigningTags, setSelectedMessageIds } ) => {
                     <div style={{position: 'relative'}}>
                         <Box
                             component="img"
-                            src={message?.thumbnail ?? DEFAULT_IMAGE}
+                            src={thumbnailSrc(message, "medium")}
                             alt="Thumbnail"
                             sx={{ width: '100%', height: '148px', objectFit: 'cover', my: 1 }}
                         />
@@ -238,7 +257,7 @@ const MessageTile = ({ message, assigningTags, setSelectedMessageIds } ) => {
                     <Box sx={{ position: 'relative', display: 'block', margin: '0 auto' }}>
                         <Box
                             component="img"
-                            src={message?.thumbnail ?? DEFAULT_IMAGE}
+                            src={thumbnailSrc(message, "large")}
                             alt="Thumbnail"
                             sx={{ height: '300px', margin: '0 auto', display: 'block', padding: '8px' }}
                         />
@@ -267,12 +286,12 @@ const MessageTile = ({ message, assigningTags, setSelectedMessageIds } ) => {
                     >
                         <Typography variant="body2">
                             {message?.description}
-                            {message?.transcript && (
+                            {transcript && (
                                 <>
                                     <br/><br/>
                                     -------- Transcript ---------
                                     <br /><br/>
-                                        {message.transcript}
+                                        {transcript}
                                     <br/><br/>
                                 </>
                             )}
@@ -344,8 +363,8 @@ const MessageTile = ({ message, assigningTags, setSelectedMessageIds } ) => {
                             }
                         }, 300)} // Debounce to avoid excessive re-renders
                     />
-                    {message?.transcript && <>Transcript exists</>}
-                    {((updatedMessage?.video !== message?.video) || (updatedMessage?.video && !message?.transcript))&& // if video link is changed or transcript is absent
+                    {message?.transcript_length > 0 && <>Transcript exists</>}
+                    {((updatedMessage?.video !== message?.video) || (updatedMessage?.video && !message?.transcript_length))&& // if video link is changed or transcript is absent
                     <FormControlLabel 
                         control={
                             <Switch 
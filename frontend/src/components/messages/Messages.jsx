@@ -14,6 +14,7 @@ const Messages = () => {
 
     const { 
         handleFetchMessages,
+        handleFetchMoreMessages,
         handleFetchAllTags,
         handleValidateMessage,
         handleAddMessage,
@@ -22,6 +23,7 @@ const Messages = () => {
     } = useMessageStore()
 
     const messages = useSelector((state) => state?.messageReducer?.messages);
+    const nextCursor = useSelector((state) => state?.messageReducer?.nextCursor);
     const allTags = useSelector((state) => state?.messageReducer?.allTags);
 
     const [filteredMessages, setFilteredMessages] = useState([]);
@@ -43,6 +45,17 @@ const Messages = () => {
         setFilteredMessages(messages);
     }, [messages])
 
+    const [loadingMore, setLoadingMore] = useState(false);
+
+    const handleLoadMore = async () => {
+        setLoadingMore(true);
+        try {
+            await handleFetchMoreMessages(nextCursor);  // next page only, the list is never fetched whole
+        } finally {
+            setLoadingMore(false);
+        }
+    }
+
     const [openAdd, setOpenAdd] = useState(false);
     const MESSAGE_PAYLOAD = {
         "title": null,
@@ -292,6 +305,12 @@ const Messages = () => {
                         <MessageTile key={index} message={message} assigningTags={assigningTags} setSelectedMessageIds={setSelectedMessageIds}/>
                     ))}
                 </Grid2>
+                {nextCursor &&
+                <div style={{display: 'flex', justifyContent: 'center', padding: '24px'}}>
+                    <Button onClick={() => handleLoadMore()} variant="outlined" size="small" disabled={loadingMore}>
+                        {loadingMore ? <CircularProgress size="20px" /> : "Load More"}
+                    </Button>
+                </div>}
             </Container>
             
             {openAdd &&
@@ -2,8 +2,10 @@ export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
 export const API_ROUTES = {
     MESSAGES: "/messages",
     TAGS: "/tags",
-    MESSAGE_TAGS: "/message_tags"
+    MESSAGE_TAGS: "/message_tags",
+    THUMBNAILS: "/thumbnails"
 }
+export const MESSAGES_PAGE_SIZE = 200;  // Server caps pages at MESSAGES_MAX_PAGE_SIZE
 export const MAX_IMAGE_SIZE_MB = import.meta.env.VITE_MAX_IMAGE_SIZE_MB;  // Set the maximum size limit in MB
 export const ALLOWED_IMAGE_FORMATS = import.meta.env.VITE_ALLOWED_IMAGE_FORMATS;  // Only allow PNG and JPEG images
 export const DEFAULT_IMAGE = import.meta.env.VITE_DEFAULT_IMAGE;
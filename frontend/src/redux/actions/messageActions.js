@@ -1,15 +1,19 @@
 import { createAsyncThunk } from '@reduxjs/toolkit';
-import { API_BASE_URL, API_ROUTES } from "@/constants";
+import { API_BASE_URL, API_ROUTES, MESSAGES_PAGE_SIZE } from "@/constants";
 import axios from 'axios';
 
-export const fetchMessages = createAsyncThunk ('messages/fetchMessages', async() => {
+export const fetchMessages = createAsyncThunk ('messages/fetchMessages', async(after = null) => {
   try {
     const api = `${API_BASE_URL}${API_ROUTES.MESSAGES}`;
     
-    console.log('Calling', api)
+    // One keyset page; the next one is requested with its next_cursor when more messages are needed
+    const params = { limit: MESSAGES_PAGE_SIZE, ...(after ? { after: after } : {}) };
+    console.log('Calling', api, params)
     const response = await axios({
       method: 'GET',
       url: api,
+      withCredentials: true, // carries the read-your-writes cookie to the API origin
+      params: params,
       headers: { 'Content-Type': 'application/json' },
     });
     
@@ -18,9 +22,9 @@ export const fetchMessages = createAsyncThunk ('messages/fetchMessages', async()
     }
     
     const result = await response?.data;
-    let data = await result?.data ?? [];
+    const data = result?.data ?? [];
     console.log("Successfully fetched messages", data?.length)
-    return data
+    return { data: data, nextCursor: result?.next_cursor ?? null }
   } catch (error) {
     console.error('Error fetching messages:', error);
     return null;
@@ -35,6 +39,7 @@ export const fetchAllTags = createAsyncThunk ('messages/fetchAllTags', async() =
     const response = await axios({
       method: 'GET',
       url: api,
+      withCredentials: true,
       headers: { 'Content-Type': 'application/json' },
     });
     
@@ -52,6 +57,26 @@ export const fetchAllTags = createAsyncThunk ('messages/fetchAllTags', async() =
   }
 });
 
+export const fetchTranscript = createAsyncThunk ('messages/fetchTranscript', async(messageId) => {
+  try {
+    const api = `${API_BASE_URL}${API_ROUTES.MESSAGES}/${messageId}/transcript`;
+    
+    console.log('Calling', api)
+    const response = await axios.get(api, { responseType: 'text', withCredentials: true });
+    
+    if (response.status !== 200) {
+      throw new Error(`Failed to fetch transcript: ${response.status}`);
+    }
+    
+    const data = await response?.data;
+    console.log("Successfully fetched transcript", data?.length)
+    return data
+  } catch (error) {
+    console.error('Error fetching transcript:', error);
+    return null;
+  }
+});
+
 export const fetchThumbnail = createAsyncThunk ('messages/fetchThumbnail', async(thumbnail) => {
   try {
     console.log('Calling', thumbnail) 
@@ -110,6 +135,7 @@ export const addMessage = createAsyncThunk('messages/addMessage', async (message
     const response = await axios({
       method: 'POST',
       url: api,
+      withCredentials: true,
       data: payload,
       headers: {
         'Content-Type': 'application/json',
@@ -155,6 +181,7 @@ export const editMessage = createAsyncThunk('messages/editMessage', async (messa
     const response = await axios({
       method: 'PUT',
       url: api,
+      withCredentials: true,
       data: payload,
       headers: {
         'Content-Type': 'application/json',
@@ -190,6 +217,7 @@ export const addTags = createAsyncThunk('messages/addTags', async (tags, { rejec
     const response = await axios({
       method: 'POST',
       url: api,
+      withCredentials: true,
       data: payload,
       headers: {
         'Content-Type': 'application/json',
@@ -227,6 +255,7 @@ export const assignTags = createAsyncThunk('messages/assignTags', async ({messag
     const response = await axios({
       method: 'POST',
       url: api,
+      withCredentials: true,
       data: payload,
       headers: {
         'Content-Type': 'application/json',
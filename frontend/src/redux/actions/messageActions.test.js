@@ -12,10 +12,10 @@ describe('fetchMessages thunk', () => {
     { id: 2, text: 'Message 2' }
   ];
 
-  it('should fetch messages successfully and return data', async () => {
+  it('should fetch one page of messages and return it with its cursor', async () => {
     axios.mockResolvedValue({
       status: 200,
-      data: { data: mockMessages }
+      data: { data: mockMessages, next_cursor: 2 }
     });
 
     const thunk = fetchMessages();
@@ -25,8 +25,22 @@ describe('fetchMessages thunk', () => {
     const result = await thunk(dispatch, getState, undefined);
 
     expect(result.type).toBe('messages/fetchMessages/fulfilled');
-    expect(result.payload).toEqual(mockMessages);
-    expect(axios).toHaveBeenCalled();
+    expect(result.payload).toEqual({ data: mockMessages, nextCursor: 2 });
+    expect(axios).toHaveBeenCalledTimes(1);  // the next page is only fetched on demand
+  });
+
+  it('should fetch the page after a cursor', async () => {
+    axios.mockReset();
+    axios.mockResolvedValue({ status: 200, data: { data: [mockMessages[1]], next_cursor: null } });
+
+    const thunk = fetchMessages(1);
+    const dispatch = vi.fn();
+    const getState = vi.fn();
+
+    const result = await thunk(dispatch, getState, undefined);
+
+    expect(result.payload).toEqual({ data: [mockMessages[1]], nextCursor: null });
+    expect(axios).toHaveBeenCalledWith(expect.objectContaining({ params: expect.objectContaining({ after: 1 }) }));
   });
 
   it('should handle non-200 response and throw error', async () => {
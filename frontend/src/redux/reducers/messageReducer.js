@@ -3,6 +3,7 @@ import { addMessage } from "@/redux/actions/messageActions";
 
 const initialState = {
   messages: [],
+  nextCursor: null,  // cursor of the next page of messages, null after the last one
   allTags: [],
   loading: false,
   error: null,
@@ -18,6 +19,15 @@ const messageSlice = createSlice({
       console.log("setMessages", current(state).messages);
     },
 
+    appendMessages: (state, action) => {
+      state.messages = state.messages.concat(action.payload);
+      console.log("appendMessages", action.payload?.length);
+    },
+
+    setNextCursor: (state, action) => {
+      state.nextCursor = action.payload;
+    },
+
     setAllTags: (state, action) => {
       state.allTags = action.payload;
       console.log("setAllTags", current(state).allTags);
@@ -42,6 +52,8 @@ const messageSlice = createSlice({
 
 export const { 
   setMessages,
+  appendMessages,
+  setNextCursor,
   setAllTags,
 } = messageSlice.actions;
 
@@ -1,6 +1,6 @@
 import { useDispatch } from "react-redux";
-import { fetchMessages, fetchAllTags, fetchThumbnail, fetchVideo, addMessage, editMessage, addTags, assignTags } from "@/redux/actions/messageActions";
-import { setMessages, setAllTags } from "@/redux/reducers/messageReducer";
+import { fetchMessages, fetchAllTags, fetchTranscript, fetchThumbnail, fetchVideo, addMessage, editMessage, addTags, assignTags } from "@/redux/actions/messageActions";
+import { setMessages, appendMessages, setNextCursor, setAllTags } from "@/redux/reducers/messageReducer";
 import { MAX_IMAGE_SIZE_MB, ALLOWED_IMAGE_FORMATS, ALLOWED_VIDEO_FORMATS } from "@/constants";
 import { isValidURL } from "@/utils/common";
 
@@ -9,8 +9,20 @@ export const useMessageStore = () => {
 
     const handleFetchMessages = async () => {
         try {
-            let data = await dispatch(fetchMessages()).unwrap()
-            dispatch(setMessages(data));
+            let page = await dispatch(fetchMessages()).unwrap()
+            dispatch(setMessages(page?.data ?? []));
+            dispatch(setNextCursor(page?.nextCursor ?? null));
+        } catch(error) {
+            console.error(error);
+        }
+    }
+
+    const handleFetchMoreMessages = async (after) => {
+        try {
+            let page = await dispatch(fetchMessages(after)).unwrap()
+            if(!page) return;
+            dispatch(appendMessages(page.data));
+            dispatch(setNextCursor(page.nextCursor));
         } catch(error) {
             console.error(error);
         }
@@ -25,6 +37,15 @@ export const useMessageStore = () => {
         }
     }
 
+    const handleFetchTranscript = async (messageId) => {
+        try {
+            return await dispatch(fetchTranscript(messageId)).unwrap()
+        } catch(error) {
+            console.error(error);
+            return null
+        }
+    }
+
     const handleValidateMessage = async (message) => {
         if(!message?.title){
             return {valid: false, attribute: "title", note: "Message Title is required"}
@@ -126,7 +147,9 @@ export const useMessageStore = () => {
 
     return { 
         handleFetchMessages,
+        handleFetchMoreMessages,
         handleFetchAllTags,
+        handleFetchTranscript,
         handleValidateMessage,
         handleAddMessage,
         handleUpdateMessage,